@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import Lasso
@@ -5,13 +7,16 @@ from sklearn.linear_model import Lasso
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "VectorAutoRegression"))
+from PWTCache import PWTCache, PWT_SHEET_NAME
+
 #CONSTANTS
 #TODO: Implement
 TARGET =  ["rgdpna"]
 
 #FUNCTIONS
 def load_penn_world_table():
-    return(pd.read_excel("../../Data/pwt1001.xlsx", sheet_name="Data"))
+    return PWTCache.load_pwt(sheet_name=PWT_SHEET_NAME)
 
 def generate_train_test_data(pwt: pd.DataFrame, predictors: list[str], target: str =TARGET) -> tuple:
     """TODO: If we want to use this function in future we should look into returning a specific dataclass type instead of tuple for clarity"""
@@ -58,7 +63,8 @@ def lasso_regression(X_train, y_train, X_test, y_test, a=1.3) -> float:
 
 def rmse(predictions, real):
     
-    residuals =   real - predictions
+    # real is a (n x 1) column, flattened so the residuals are not broadcast to a n x n matrix
+    residuals =   np.ravel(real) - np.ravel(predictions)
     #residuals = abs(residuals)
 
     sum_resid_squared = np.sum(residuals ** 2)
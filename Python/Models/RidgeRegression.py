@@ -2,12 +2,17 @@
 independent variable rgdpna and varying dependent variables
 #TODO: Refactor
 """
+import os
+import sys
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import Ridge
 from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "VectorAutoRegression"))
+from PWTCache import PWTCache, PWT_SHEET_NAME
+
 #CONSTANTS
 #TODO: Implement
 PREDICTORS = ["hc", "pop"]
@@ -15,7 +20,7 @@ TARGET =  ["rgdpna"]
 
 #FUNCTIONS
 def load_penn_world_table():
-    return(pd.read_excel("../../Data/pwt1001.xlsx", sheet_name="Data"))
+    return PWTCache.load_pwt(sheet_name=PWT_SHEET_NAME)
 
 def generate_train_test_data(pwt: pd.DataFrame, predictors: list[str] = PREDICTORS, target: str =TARGET) -> tuple:
     """TODO: If we want to use this function in future we should look into returning a specific dataclass type instead of tuple for clarity"""
@@ -0,0 +1,31 @@
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+class AtomicWrite:
+    """
+    Writes files through a temporary file next to them, which replaces them once it is complete.
+    Readers never see a partially written file and concurrent writers never write into or replace each others temporary files.
+    """
+    def create_tmp_path(path: str) -> str:
+        """Unique empty temporary file in the directory of `path`, the caller moves it to `path` or removes it"""
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        return tmp_path
+
+    @contextmanager
+    def replacing(path: str):
+        """Yields a temporary path which replaces `path` when the block completes, it is removed when the block raises and `path` is left as it was"""
+        tmp_path = AtomicWrite.create_tmp_path(path)
+        try:
+            yield tmp_path
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def write_json(path: str, obj) -> None:
+        with AtomicWrite.replacing(path) as tmp_path:
+            with open(tmp_path, "w") as f:
+                json.dump(obj, f)
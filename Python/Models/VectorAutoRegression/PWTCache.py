@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from AtomicWrite import AtomicWrite
+
+PWT_XLSX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Data", "pwt1001.xlsx")
+# Sheet of pwt1001.xlsx with the data, the loader reads the first sheet unless a sheet is given
+PWT_SHEET_NAME = "Data"
+CACHE_DIR_NAME = ".cache"
+
+class PWTCache:
+    """Converts the Penn World Table workbook once into a columnar Parquet cache and serves column selective reads from it"""
+    def load_pwt(columns: list[str] = None, xlsx_path: str = PWT_XLSX_PATH, year_index: bool = False, filters: list[tuple] = None, sheet_name: str | int = 0) -> pd.DataFrame:
+        """
+        Loads the Penn World Table from the Parquet cache, (re)building the cache from the workbook when it is missing or stale.
+
+        Parameters
+        ----------
+        columns : list[str], optional
+            the columns to read, reads every column when None.
+        xlsx_path : str
+            location of the PWT workbook, the cache is stored in a `.cache` directory next to it.
+        year_index : bool
+            when True, parses `year` to datetimes and uses it as index (equal to `read_excel(parse_dates = ['year'], index_col = 3)`).
+        filters : list[tuple], optional
+            row predicates pushed down to the Parquet reader, e.g. `[("country", "in", ["Aruba"]), ("year", ">=", 1995)]`. Rows that do not match are never materialized.
+        sheet_name : str | int
+            the sheet of the workbook to load (name or position, as `read_excel`), the first sheet by default. Every sheet has its own cache.
+
+        Returns
+        -------
+        pandas.DataFrame
+            the (column subset of the) Penn World Table
+        """
+        cache_path = PWTCache.get_cache_path(xlsx_path, sheet_name)
+        if not PWTCache.__cache_is_valid(xlsx_path, cache_path):
+            PWTCache.__build_cache(xlsx_path, cache_path, sheet_name)
+
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys(["year", *columns] if year_index else columns))
+        pwt = pd.read_parquet(cache_path, columns=read_columns, filters=filters)
+
+        if year_index:
+            pwt["year"] = pd.to_datetime(pwt["year"].astype(str), format="%Y")
+            pwt = pwt.set_index("year")
+        return pwt
+
+    def get_cache_path(xlsx_path: str = PWT_XLSX_PATH, sheet_name: str | int = 0) -> str:
+        """Returns the location of the Parquet cache belonging to sheet `sheet_name` of the workbook at `xlsx_path`"""
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(xlsx_path)), CACHE_DIR_NAME)
+        file_name = os.path.splitext(os.path.basename(xlsx_path))[0]
+        return os.path.join(cache_dir, f"{file_name}.{sheet_name}.parquet")
+
+    def __get_meta_path(cache_path: str) -> str:
+        # Only the extension is replaced, directories of the cache path may contain ".parquet" as well
+        return os.path.splitext(cache_path)[0] + ".meta.json"
+
+    def __hash_file(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def __cache_is_valid(xlsx_path: str, cache_path: str) -> bool:
+        """The cache is keyed by size, mtime and hash of the workbook. A changed size or mtime only triggers a rebuild when the hash changed as well"""
+        meta_path = PWTCache.__get_meta_path(cache_path)
+        if not os.path.exists(cache_path) or not os.path.exists(meta_path):
+            return False
+
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        stat = os.stat(xlsx_path)
+        if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+            return True
+
+        if meta["size"] != stat.st_size or meta["sha256"] != PWTCache.__hash_file(xlsx_path):
+            return False
+
+        # Same content, only touched: refresh the key so the next load skips hashing
+        PWTCache.__write_meta(meta_path, stat, meta["sha256"])
+        return True
+
+    def __write_meta(meta_path: str, stat: os.stat_result, sha256: str) -> None:
+        AtomicWrite.write_json(meta_path, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256})
+
+    def __build_cache(xlsx_path: str, cache_path: str, sheet_name: str | int) -> None:
+        print(f"Building Penn World Table cache from sheet {sheet_name!r} of {xlsx_path}...")
+        stat = os.stat(xlsx_path)
+        sha256 = PWTCache.__hash_file(xlsx_path)
+        pwt = pd.read_excel(xlsx_path, sheet_name=sheet_name)
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Write to a temporary file first so an interrupted build never leaves a corrupt cache behind
+        with AtomicWrite.replacing(cache_path) as tmp_path:
+            # Small row groups keep per group min/max statistics selective, so filters on country or year can skip whole groups
+            pwt.to_parquet(tmp_path, index=False, row_group_size=2048)
+        PWTCache.__write_meta(PWTCache.__get_meta_path(cache_path), stat, sha256)
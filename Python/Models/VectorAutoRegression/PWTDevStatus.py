@@ -1,5 +1,9 @@
+import os
 from enum import Enum
 import pandas as pd
+from PWTCache import PWTCache, PWT_XLSX_PATH, PWT_SHEET_NAME
+from PWTFeatures import PWTFeatures, FeatureSpec, FeatureKind
+from VARProfiler import VARProfiler
 
 class DevStatusLevel(Enum):
     ALL = 1
@@ -7,23 +11,27 @@ class DevStatusLevel(Enum):
     MERGED_SUBSET = 3
     ONLY_DEVELOPED = 4
 
+DEV_STATUS_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "Data", "dev_status.csv")
+
 class PWTDevStatusGenerator:
-    def subset_pwt_by_dev_stat(dev_stat_level: DevStatusLevel, indep_vars: list[str], gdptype:str = 'rgdpna'):
+    def subset_pwt_by_dev_stat(dev_stat_level: DevStatusLevel, indep_vars: list[str], gdptype:str = 'rgdpna', xlsx_path: str = PWT_XLSX_PATH, dev_status_path: str = DEV_STATUS_CSV_PATH):
+        """Returns a dataframe per development status, `xlsx_path` and `dev_status_path` can point to other (e.g. synthetic) data"""
         print("Importing Penn World Table...")
-        pwt = pd.read_excel('../../../Data/pwt1001.xlsx',
-                        sheet_name = 'Data',
-                        parse_dates = ['year'],
-                        index_col = 3)
+        with VARProfiler.stage("load_pwt"):
+            pwt = PWTCache.load_pwt(columns = [*indep_vars, gdptype, "countrycode"], xlsx_path = xlsx_path, year_index = True, sheet_name = PWT_SHEET_NAME)
+        country_dev_status_df = pd.read_csv(dev_status_path)
+        return PWTDevStatusGenerator.subset_df_by_dev_stat(pwt, country_dev_status_df, dev_stat_level, indep_vars, gdptype)
+
+    def subset_df_by_dev_stat(pwt: pd.DataFrame, country_dev_status_df: pd.DataFrame, dev_stat_level: DevStatusLevel, indep_vars: list[str], gdptype:str = 'rgdpna'):
+        """`subset_pwt_by_dev_stat` on an already loaded PWT (indexed on `year` like `PWTCache.load_pwt(year_index = True)`) and dev status dataframe"""
         gdp_type = gdptype #'cgdpo'
         dependent_var = "gdp_growth"
-        pwt[f'{gdp_type}_lag'] = pwt.groupby(['countrycode'])[gdp_type].shift(1)
-        pwt[dependent_var] = pwt.apply(lambda row : (row[gdp_type] - row[f'{gdp_type}_lag']) / row[f'{gdp_type}_lag'], axis = 1)
+        with VARProfiler.stage("derive_features"):
+            pwt = PWTFeatures.derive(pwt, [FeatureSpec(dependent_var, FeatureKind.GROWTH, gdp_type)])
         indep_vars.extend([dependent_var, "countrycode"])
         pwt = pwt[indep_vars]
         pwt = pwt.dropna()
 
-        country_dev_status_df = pd.read_csv('../../../Data/dev_status.csv')
-
         match dev_stat_level:
             case dev_stat_level.ALL: 
                 pass #Default data         
@@ -41,6 +49,7 @@ class PWTDevStatusGenerator:
 
         return PWTDevStatusGenerator.__create_pwt_dev_status_subset(unique_eco_statuses, country_dev_status_df, pwt)
         
+    @VARProfiler.timed("dev_status_join")
     def __create_pwt_dev_status_subset(dev_statuses: list[str], dev_status_df: pd.DataFrame, pwt: pd.DataFrame) -> list[pd.DataFrame]:
         """For each dev status create a subset dataframe using pwt, return all the dataframes in a list"""
         dev_stat_df_list = []
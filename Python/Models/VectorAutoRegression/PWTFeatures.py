@@ -0,0 +1,125 @@
+from enum import Enum
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+class FeatureKind(Enum):
+    GROWTH = 1
+    LOG_DIFF = 2
+    LAG = 3
+    LEAD = 4
+    RATIO = 5
+    FORWARD_GROWTH = 6
+    FORWARD_GROWTH_SUM = 7
+    CUMULATIVE_GROWTH = 8
+
+@dataclass
+class FeatureSpec:
+    """
+    Declares one derived column. `other` is the denominator for RATIO, `periods` the amount of years (the horizon) for the other kinds.
+    Forward kinds look ahead from year t:
+    FORWARD_GROWTH is x[t+k] / x[t] - 1, FORWARD_GROWTH_SUM sums x[t+h] / x[t] - 1 over h = 1..k and CUMULATIVE_GROWTH sums the annual growth of t+1..t+k.
+    """
+    name: str
+    kind: FeatureKind
+    column: str
+    other: str = None
+    periods: int = 1
+    scale: float = 1.0
+
+class PWTFeatures:
+    """Derives growth rates, log differences, lags, leads and ratios for a (country, year) panel using grouped NumPy operations"""
+    def derive(df: pd.DataFrame, specs: list[FeatureSpec], country_col: str = "countrycode") -> pd.DataFrame:
+        """
+        Adds a column to `df` for every spec and returns it.
+        Values are looked up by (country, year - periods), a missing year therefore results in NaN instead of being treated as a one year step.
+        Forward kinds are NaN when any year of their horizon is missing.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            long dataframe with `country_col` and a `year` DatetimeIndex (or `year` column), rows may be in any order.
+        specs : list[FeatureSpec]
+            the columns to derive, evaluated in order so later specs can use earlier derived columns.
+        country_col : str
+            name of the column containing the country codes.
+
+        Returns
+        -------
+        pandas.DataFrame
+            `df` with the derived columns
+        """
+        country_pos, year_pos, pos_grid = PWTFeatures.__build_position_grid(df, country_col)
+
+        for spec in specs:
+            values = df[spec.column].to_numpy(dtype=np.float64)
+            # Division by zero and logs of non positive values end up as inf/NaN, like the pandas arithmetic they replace
+            with np.errstate(divide="ignore", invalid="ignore"):
+                match spec.kind:
+                    case FeatureKind.GROWTH:
+                        prev = PWTFeatures.__shift(values, country_pos, year_pos, pos_grid, spec.periods)
+                        derived = (values - prev) / prev
+                    case FeatureKind.LOG_DIFF:
+                        prev = PWTFeatures.__shift(values, country_pos, year_pos, pos_grid, spec.periods)
+                        derived = np.log(values) - np.log(prev)
+                    case FeatureKind.LAG:
+                        derived = PWTFeatures.__shift(values, country_pos, year_pos, pos_grid, spec.periods)
+                    case FeatureKind.LEAD:
+                        derived = PWTFeatures.__shift(values, country_pos, year_pos, pos_grid, -spec.periods)
+                    case FeatureKind.RATIO:
+                        derived = values / df[spec.other].to_numpy(dtype=np.float64)
+                    case FeatureKind.FORWARD_GROWTH:
+                        window = PWTFeatures.__forward_window(values, country_pos, year_pos, pos_grid, spec.periods)
+                        derived = window[:, -1] / window[:, 0] - 1
+                    case FeatureKind.FORWARD_GROWTH_SUM:
+                        window = PWTFeatures.__forward_window(values, country_pos, year_pos, pos_grid, spec.periods)
+                        derived = (window[:, 1:] / window[:, [0]] - 1).sum(axis=1)
+                    case FeatureKind.CUMULATIVE_GROWTH:
+                        window = PWTFeatures.__forward_window(values, country_pos, year_pos, pos_grid, spec.periods)
+                        derived = (window[:, 1:] / window[:, :-1] - 1).sum(axis=1)
+                    case _:
+                        raise ValueError(f"unsupported feature kind: {spec.kind!r}")
+            df[spec.name] = derived * spec.scale
+        return df
+
+    def get_years(df: pd.DataFrame) -> np.ndarray:
+        """Returns the year of every row as integers, taken from a DatetimeIndex or the `year` column"""
+        if isinstance(df.index, pd.DatetimeIndex):
+            return df.index.year.to_numpy()
+        return df["year"].to_numpy(dtype=np.int64)
+
+    def __build_position_grid(df: pd.DataFrame, country_col: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Maps every (country, year) to its row position in a dense grid, -1 marks combinations without a row"""
+        country_pos, countries = pd.factorize(df[country_col])
+        years = PWTFeatures.get_years(df)
+        first_year = years.min() if len(years) > 0 else 0
+        year_pos = years - first_year
+
+        pos_grid = np.full((len(countries), year_pos.max() + 1 if len(years) > 0 else 0), -1, dtype=np.int64)
+        pos_grid[country_pos, year_pos] = np.arange(len(df))
+        return country_pos, year_pos, pos_grid
+
+    def __shift(values: np.ndarray, country_pos: np.ndarray, year_pos: np.ndarray, pos_grid: np.ndarray, periods: int) -> np.ndarray:
+        """Returns the value of the same country `periods` years earlier (later when negative), NaN when that year has no row"""
+        shifted = np.full(len(values), np.nan)
+        source_year = year_pos - periods
+        in_range = (source_year >= 0) & (source_year < pos_grid.shape[1])
+
+        source_row = np.full(len(values), -1, dtype=np.int64)
+        source_row[in_range] = pos_grid[country_pos[in_range], source_year[in_range]]
+        found = source_row >= 0
+        shifted[found] = values[source_row[found]]
+        return shifted
+
+    def __forward_window(values: np.ndarray, country_pos: np.ndarray, year_pos: np.ndarray, pos_grid: np.ndarray, periods: int) -> np.ndarray:
+        """
+        Returns a (rows x periods + 1) matrix holding the value of years t..t+periods of the same country.
+        Rows of which the window crosses a missing year (or a NaN value) are NaN entirely.
+        """
+        value_grid = np.full((pos_grid.shape[0], pos_grid.shape[1] + periods), np.nan)
+        has_row = pos_grid >= 0
+        value_grid[:, :pos_grid.shape[1]][has_row] = values[pos_grid[has_row]]
+
+        window = value_grid[country_pos[:, None], year_pos[:, None] + np.arange(periods + 1)]
+        window[np.isnan(window).any(axis=1)] = np.nan
+        return window
@@ -0,0 +1,163 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from AtomicWrite import AtomicWrite
+
+PANEL_DIR_ENV = "PWT_PANEL_DIR"
+DEFAULT_PANEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+class PWTPanel:
+    """
+    Dense country x year x variable tensor backed by a memory mapped file.
+    Selecting the series of one country is a dictionary lookup and a zero-copy slice, processes that open the same file share its pages.
+    """
+    __slots__ = ["path", "data", "country_index", "variable_index", "years", "year_index", "content_hash"]
+
+    def __init__(self, path: str, data: np.memmap, countries: list[str], variables: list[str], years: list[int], content_hash: str = None):
+        self.path = path
+        self.data = data
+        self.content_hash = content_hash
+        self.country_index = {code: i for i, code in enumerate(countries)}
+        self.variable_index = {name: i for i, name in enumerate(variables)}
+        self.years = np.asarray(years)
+        self.year_index = pd.DatetimeIndex(pd.to_datetime(self.years.astype(str), format="%Y"), name="year")
+
+    def __reduce__(self):
+        # Worker processes reopen the memory mapped file instead of receiving a pickled copy of the tensor
+        return (PWTPanel.open, (self.path,))
+
+    def configure(panel_dir: str = None) -> None:
+        """Sets the directory `create` stores panels in (None restores the `.cache` directory next to this file)"""
+        if panel_dir is None:
+            os.environ.pop(PANEL_DIR_ENV, None)
+        else:
+            os.environ[PANEL_DIR_ENV] = os.path.abspath(panel_dir)
+
+    def get_panel_dir() -> str:
+        return os.environ.get(PANEL_DIR_ENV, DEFAULT_PANEL_DIR)
+
+    def create(df: pd.DataFrame, name: str, country_col: str = "countrycode") -> "PWTPanel":
+        """
+        Returns the panel of `df` (see `from_dataframe`) stored in the panel directory as `<name>-<content hash>.panel`.
+        A panel of the same data is opened instead of rewritten, so concurrent runs on different data never overwrite each other's panel.
+        """
+        content_hash = PWTPanel.__hash_dataframe(df, country_col)
+        file_name = re.sub(r"[^\w.-]+", "_", name)
+        path = os.path.join(PWTPanel.get_panel_dir(), f"{file_name}-{content_hash[:16]}.panel")
+        if os.path.exists(f"{path}.json"):
+            return PWTPanel.open(path)
+        return PWTPanel.from_dataframe(df, path, country_col, content_hash)
+
+    def from_dataframe(df: pd.DataFrame, path: str, country_col: str = "countrycode", content_hash: str = None) -> "PWTPanel":
+        """
+        Writes a long (country, year) dataframe to a memory mapped panel at `path` and returns it opened read-only.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            long dataframe with `country_col`, a `year` DatetimeIndex (or `year` column) and numeric variable columns.
+        path : str
+            location of the tensor file, the indexes are stored next to it in `<path>.json`.
+        country_col : str
+            name of the column containing the country codes.
+        content_hash : str, optional
+            hash of `df` when already computed, stored with the indexes and returned by `get_content_hash`.
+
+        Returns
+        -------
+        PWTPanel
+            the panel, missing (country, year) combinations are NaN
+        """
+        if isinstance(df.index, pd.DatetimeIndex):
+            year_values = df.index.year.to_numpy()
+        else:
+            year_values = df["year"].to_numpy()
+        variables = [col for col in df.columns if col not in (country_col, "year")]
+
+        countries, country_pos = np.unique(df[country_col].to_numpy(), return_inverse=True)
+        years, year_pos = np.unique(year_values, return_inverse=True)
+
+        if content_hash is None:
+            content_hash = PWTPanel.__hash_dataframe(df, country_col)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Written to temporary files first, so a process opening the panel at the same time never reads a partially written panel.
+        # The indexes are written last, a panel is complete once `<path>.json` exists
+        shape = (len(countries), len(years), len(variables))
+        with AtomicWrite.replacing(path) as tmp_path:
+            data = np.memmap(tmp_path, dtype=np.float64, mode="w+", shape=shape)
+            data[:] = np.nan
+            data[country_pos, year_pos] = df[variables].to_numpy(dtype=np.float64)
+            data.flush()
+            del data
+
+        AtomicWrite.write_json(f"{path}.json", {
+            "shape": shape,
+            "countries": countries.tolist(),
+            "variables": variables,
+            "years": years.astype(int).tolist(),
+            "content_hash": content_hash
+        })
+        return PWTPanel.open(path)
+
+    def open(path: str) -> "PWTPanel":
+        """Opens an existing panel read-only without loading it into memory"""
+        with open(f"{path}.json", "r") as f:
+            meta = json.load(f)
+        data = np.memmap(path, dtype=np.float64, mode="r", shape=tuple(meta["shape"]))
+        return PWTPanel(path, data, meta["countries"], meta["variables"], meta["years"], meta.get("content_hash"))
+
+    @property
+    def countries(self) -> list[str]:
+        return list(self.country_index)
+
+    @property
+    def variables(self) -> list[str]:
+        return list(self.variable_index)
+
+    def get_content_hash(self) -> str:
+        """Hash of the dataframe the panel was created from, equal for every panel of the same data"""
+        if self.content_hash is None:
+            # Panels written before the hash was stored with the indexes, hashed once per country so the tensor is never copied as a whole
+            sha = hashlib.sha256()
+            sha.update(json.dumps([self.countries, self.variables, self.years.tolist()]).encode())
+            for block in self.data:
+                sha.update(np.ascontiguousarray(block).tobytes())
+            self.content_hash = sha.hexdigest()
+        return self.content_hash
+
+    def get_country(self, countrycode: str) -> np.ndarray:
+        """Returns the (year x variable) view of one country, years without data are NaN"""
+        return self.data[self.country_index[countrycode]]
+
+    def get_series(self, countrycode: str, variable: str) -> np.ndarray:
+        """Returns the yearly view of one variable of one country"""
+        return self.data[self.country_index[countrycode], :, self.variable_index[variable]]
+
+    def get_country_df(self, countrycode: str) -> pd.DataFrame:
+        """
+        Returns the years of one country that have data for every variable, indexed on year.
+        When these years are consecutive the dataframe wraps a view on the panel, otherwise the rows are copied.
+        """
+        block = self.get_country(countrycode)
+        valid = ~np.isnan(block).any(axis=1)
+        valid_pos = np.flatnonzero(valid)
+        if len(valid_pos) == 0:
+            return pd.DataFrame(columns=self.variables, index=self.year_index[:0], dtype=np.float64)
+
+        first, last = valid_pos[0], valid_pos[-1] + 1
+        if last - first == len(valid_pos):
+            rows, index = block[first:last], self.year_index[first:last]
+        else:
+            rows, index = block[valid], self.year_index[valid]
+        return pd.DataFrame(rows, index=index, columns=self.variables, copy=False)
+
+    def __hash_dataframe(df: pd.DataFrame, country_col: str) -> str:
+        """Hash of the values, index and column names of `df`"""
+        sha = hashlib.sha256()
+        sha.update(json.dumps([country_col, *map(str, df.columns)]).encode())
+        sha.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return sha.hexdigest()
@@ -0,0 +1,172 @@
+import os
+import csv
+import string
+import itertools
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Development statuses of dev_status.csv with their amount of countries, synthetic countries are assigned in the same proportions
+DEV_STATUS_COUNTS = {
+    "Developed region: G7": 7,
+    "Developed region: nonG7": 33,
+    "Developing region": 78,
+    "Emerging region: BRIC": 4,
+    "Emerging region: G20": 19,
+    "Emerging region: MIKT": 4,
+    "Least developed region": 38,
+}
+
+# Mean and standard deviation of the annual growth of real GDP per development status (without suffix)
+GROWTH_BY_DEV_STATUS = {
+    "Developed region": (0.025, 0.02),
+    "Developing region": (0.035, 0.045),
+    "Emerging region": (0.045, 0.035),
+    "Least developed region": (0.035, 0.06),
+}
+
+# Share of countries without any data of a variable, as for the TFP, hours worked and human capital series of the PWT
+MISSING_VARIABLE_SHARE = {"rtfpna": 0.3, "ctfp": 0.3, "labsh": 0.2, "avh": 0.6, "hc": 0.2}
+
+# Fraction of the years after which the series of a country start and the share of countries per start
+START_FRACTIONS = [0.0, 0.15, 0.3, 0.6]
+START_PROBABILITIES = [0.35, 0.2, 0.3, 0.15]
+
+# Countries are generated in chunks, which bounds the size of the intermediate (country x year) arrays of very large panels
+CHUNK_COUNTRIES = 10_000
+
+class PWTSynthetic:
+    """
+    Seeded generator of a synthetic panel with the schema of the Penn World Table (pwt1001.xlsx) and a matching dev_status.csv.
+    Every country gets a persistent growth process depending on its development status, from which GDP, absorption, capital, employment and TFP are derived.
+    Missing data follows the PWT: series of many countries start decades after the first year and some variables are missing for whole countries.
+    """
+    def generate(countries: int = 183, years: int = 70, seed: int = 0, start_year: int = 1950, indicators: int = 0, columns: list[str] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns the (country, year) panel with the PWT columns and the dev status dataframe (countrycode, economy).
+        `indicators` adds that many extra series (`indicator_1`, ...) that follow the business cycle of their country.
+        Only `columns` (and countrycode and year) are kept when given, the generated values do not depend on it.
+        """
+        rng = np.random.default_rng(seed)
+        countrycodes = PWTSynthetic.__create_countrycodes(countries)
+        dev_status = PWTSynthetic.__assign_dev_statuses(countrycodes, rng)
+        chunks = [PWTSynthetic.__generate_panel(dev_status.iloc[first:first + CHUNK_COUNTRIES], years, start_year, indicators, columns, rng)
+                  for first in range(0, countries, CHUNK_COUNTRIES)]
+        pwt = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return pwt, dev_status
+
+    def write(directory: str, pwt: pd.DataFrame, dev_status: pd.DataFrame) -> tuple[str, str]:
+        """Writes the panel as `pwt1001.xlsx` (sheet "Data") and `dev_status.csv` into `directory` and returns both paths"""
+        os.makedirs(directory, exist_ok=True)
+        xlsx_path = os.path.join(directory, "pwt1001.xlsx")
+        dev_status_path = os.path.join(directory, "dev_status.csv")
+        pwt.to_excel(xlsx_path, sheet_name="Data", index=False)
+        dev_status.to_csv(dev_status_path, index=False, quoting=csv.QUOTE_ALL)
+        return xlsx_path, dev_status_path
+
+    def __create_countrycodes(countries: int) -> list[str]:
+        """Three letter codes like the ISO codes of the PWT, longer codes once they run out"""
+        length = 3
+        while len(string.ascii_uppercase) ** length < countries:
+            length += 1
+        return ["".join(letters) for letters in itertools.islice(itertools.product(string.ascii_uppercase, repeat=length), countries)]
+
+    def __assign_dev_statuses(countrycodes: list[str], rng: np.random.Generator) -> pd.DataFrame:
+        statuses = list(DEV_STATUS_COUNTS)
+        shares = np.array(list(DEV_STATUS_COUNTS.values())) / sum(DEV_STATUS_COUNTS.values())
+        # Every status gets its rounded share, the remainder goes to the statuses with the largest share
+        counts = np.floor(shares * len(countrycodes)).astype(int)
+        counts[np.argsort(-shares)[:len(countrycodes) - counts.sum()]] += 1
+        economies = rng.permutation(np.repeat(statuses, counts))
+        return pd.DataFrame({"countrycode": countrycodes, "economy": economies})
+
+    def __generate_panel(dev_status: pd.DataFrame, years: int, start_year: int, indicators: int, columns: list[str], rng: np.random.Generator) -> pd.DataFrame:
+        """All series are generated as (country x year) arrays and flattened into the long PWT layout"""
+        countries = len(dev_status)
+        shape = (countries, years)
+        growth = np.array([GROWTH_BY_DEV_STATUS[economy.split(":")[0]] for economy in dev_status["economy"]])
+        growth_mean = rng.normal(growth[:, 0], 0.01)[:, None]
+        growth_std = growth[:, 1][:, None]
+        per_country = lambda low, high: rng.uniform(low, high, (countries, 1))
+
+        # Persistent (AR(1)) business cycle shared by the series of a country
+        cycle = lfilter([1], [1, -0.5], rng.normal(0, 1, shape) * growth_std, axis=1)
+        gdp_growth = growth_mean + cycle
+        pop_growth = rng.normal(per_country(0.0, 0.03), 0.005, shape)
+        emp_growth = pop_growth + 0.3 * cycle + rng.normal(0, 0.01, shape)
+        tfp_growth = 0.4 * (gdp_growth - emp_growth) + rng.normal(0, 0.01, shape)
+        absorption_growth = gdp_growth + rng.normal(0, 0.02, shape)
+        capital_growth = gdp_growth + rng.normal(0, 0.01, shape)
+
+        level = lambda initial, growth: initial * np.exp(np.cumsum(growth, axis=1))
+        pop = level(rng.lognormal(2, 1.5, (countries, 1)), pop_growth)
+        emp = pop * per_country(0.3, 0.5) * np.exp(np.cumsum(emp_growth - pop_growth, axis=1))
+        rgdpna = level(rng.lognormal(11, 1.5, (countries, 1)), gdp_growth)
+        rdana = rgdpna * per_country(0.9, 1.1) * np.exp(np.cumsum(absorption_growth - gdp_growth, axis=1))
+        rnna = level(rgdpna[:, :1] * per_country(2, 4), capital_growth)
+        # Current price series follow their real counterparts with a drifting price level, so they are correlated but never collinear
+        price_level = level(per_country(0.3, 1.2), rng.normal(0, 0.02, shape))
+        consumption_share = per_country(0.6, 0.85)
+
+        series = {
+            "rgdpe": rgdpna * price_level * rng.normal(1, 0.01, shape),
+            "rgdpo": rgdpna * price_level * rng.normal(1, 0.01, shape),
+            "pop": pop,
+            "emp": emp,
+            "avh": level(per_country(1600, 2300), rng.normal(-0.003, 0.005, shape)),
+            "hc": np.minimum(level(per_country(1.1, 2.5), rng.normal(0.008, 0.002, shape)), 4.5),
+            "ccon": rdana * price_level * consumption_share,
+            "cda": rdana * price_level,
+            "cgdpe": rgdpna * price_level * rng.normal(1, 0.02, shape),
+            "cgdpo": rgdpna * price_level * rng.normal(1, 0.02, shape),
+            "cn": rnna * price_level,
+            "ck": rnna * price_level / (pop.mean(axis=1, keepdims=True) * 10),
+            "ctfp": level(per_country(0.2, 1.2), tfp_growth - tfp_growth.mean(axis=1, keepdims=True)),
+            "rgdpna": rgdpna,
+            "rconna": rdana * consumption_share,
+            "rdana": rdana,
+            "rnna": rnna,
+            "rkna": rnna / rnna[:, -1:],
+            # Relative to the last year, as the PWT is relative to 2017
+            "rtfpna": np.exp(np.cumsum(tfp_growth, axis=1) - tfp_growth.sum(axis=1, keepdims=True)),
+            "labsh": np.clip(rng.normal(0.55, 0.1, (countries, 1)) + rng.normal(0, 0.01, shape), 0.2, 0.9),
+            "delta": np.clip(rng.normal(0.04, 0.005, shape), 0.02, 0.07),
+            "xr": level(rng.lognormal(1, 2, (countries, 1)), rng.normal(0.02, 0.05, shape)),
+            "csh_c": consumption_share + rng.normal(0, 0.02, shape),
+            "csh_i": per_country(0.15, 0.35) + rng.normal(0, 0.02, shape),
+            "csh_g": per_country(0.1, 0.25) + rng.normal(0, 0.01, shape),
+            "csh_x": per_country(0.1, 0.5) + rng.normal(0, 0.02, shape),
+            "csh_m": -per_country(0.1, 0.5) + rng.normal(0, 0.02, shape),
+        }
+
+        # Series start after a delay (e.g. countries that became independent), some variables are not available at all for a country
+        starts = (rng.choice(START_FRACTIONS, countries, p=START_PROBABILITIES) * years).astype(int)
+        before_start = np.arange(years)[None, :] < starts[:, None]
+        for column, values in series.items():
+            missing = before_start
+            if column in MISSING_VARIABLE_SHARE:
+                missing = missing | (rng.random((countries, 1)) < MISSING_VARIABLE_SHARE[column])
+            series[column] = np.where(missing, np.nan, values).ravel()
+
+        # Drawn last, so the other columns are the same for any amount of indicators
+        for indicator in range(1, indicators + 1):
+            values = level(per_country(0.5, 2.0), per_country(0.0, 0.03) + 0.5 * cycle + rng.normal(0, 0.02, shape))
+            series[f"indicator_{indicator}"] = np.where(before_start, np.nan, values).ravel()
+
+        countrycodes = np.repeat(dev_status["countrycode"].to_numpy(), years)
+        pwt = pd.DataFrame({
+            "countrycode": countrycodes,
+            "year": np.tile(np.arange(start_year, start_year + years), countries),
+        })
+        if columns is None or "country" in columns:
+            pwt.insert(1, "country", np.char.add("Country ", countrycodes.astype(str)))
+        if columns is None or "currency_unit" in columns:
+            pwt.insert(len(pwt.columns) - 1, "currency_unit", np.char.add("Currency ", countrycodes.astype(str)))
+        for column, values in series.items():
+            if columns is None or column in columns:
+                pwt[column] = values
+        if columns is None or "i_cig" in columns:
+            pwt["i_cig"] = np.where(before_start.ravel(), None, "Benchmark")
+        if columns is None or "i_outlier" in columns:
+            pwt["i_outlier"] = "Regular"
+        return pwt
@@ -0,0 +1,30 @@
+import os
+import sqlite3
+from dataclasses import dataclass, field
+
+@dataclass
+class SQLiteConnection:
+    """
+    Connection to the SQLite file named by the environment variable `path_env`, shared by every (worker) process that uses the same file.
+    The file is opened in WAL mode with `schema` created, so processes can read while another one writes.
+    """
+    path_env: str
+    schema: str
+    connection: sqlite3.Connection = field(default=None, init=False, repr=False)
+    connection_key: tuple = field(default=None, init=False, repr=False)
+
+    def get(self) -> sqlite3.Connection:
+        """Opens the file configured for this process, None when the environment variable is not set"""
+        path = os.environ.get(self.path_env)
+        # A connection inherited from a forked parent process can not be used, every process opens its own
+        connection_key = (path, os.getpid())
+        if connection_key != self.connection_key:
+            self.connection = None
+            self.connection_key = connection_key
+            if path is not None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                connection = sqlite3.connect(path, timeout=30)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(self.schema)
+                self.connection = connection
+        return self.connection
@@ -0,0 +1,142 @@
+import numpy as np
+from dataclasses import dataclass
+from statsmodels.tsa.adfvalues import mackinnonp
+from statsmodels.tsa.stattools import adfuller
+
+@dataclass
+class ADFBatchResult:
+    adf_stats: np.ndarray
+    p_values: np.ndarray
+    used_lags: np.ndarray
+
+class StationaryADF:
+    """
+    Augmented Dickey-Fuller test for a batch of equal length series, equal to statsmodels `adfuller` (without storing results).
+    The lagged design of every series is built and QR decomposed once, the fit of every candidate lag order follows from the nested column prefixes.
+    All series are decomposed in a single stacked call instead of one regression per series per lag order.
+    """
+    def adfuller_batch(values: np.ndarray, maxlag: int, regression: str = 'c', autolag: str = 'AIC') -> ADFBatchResult:
+        """
+        Runs the ad fuller test on every column of `values`.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            (observations x series) matrix, a 1d array is treated as a single series.
+        maxlag : int
+            the maximum lag order of the differences that is included in the test regression.
+        regression : str
+            deterministic terms of the test regression: 'n', 'c', 'ct' or 'ctt'.
+        autolag : str
+            'AIC' or 'BIC' to select the lag order (0..maxlag) by information criterion, None always uses `maxlag`.
+
+        Returns
+        -------
+        ADFBatchResult
+            the test statistic, MacKinnon p-value and used lag order per series
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        series = np.ascontiguousarray(values.T)
+        nobs = series.shape[1]
+        regression = regression.lower()
+        ntrend = len(regression) if regression != 'n' else 0
+
+        if maxlag > nobs // 2 - ntrend - 1:
+            raise ValueError(
+                "maxlag must be less than (nobs/2 - 1 - ntrend) "
+                "where n trend is the number of included "
+                "deterministic regressors"
+            )
+        if np.any(series.max(axis=1) == series.min(axis=1)):
+            raise ValueError("Invalid input, x is constant")
+
+        if autolag is None:
+            used_lags = np.full(len(series), maxlag)
+            rank_deficient = np.zeros(len(series), dtype=bool)
+        else:
+            used_lags, rank_deficient = StationaryADF.__select_lags(series, maxlag, regression, autolag.lower())
+
+        adf_stats = np.empty(len(series))
+        for lag in np.unique(used_lags):
+            selected = used_lags == lag
+            adf_stats[selected], deficient = StationaryADF.__level_t_values(series[selected], lag, regression)
+            rank_deficient[selected] |= deficient
+
+        # Collinear and exactly fitting designs are rare, leave them to statsmodels so its rank handling is matched exactly
+        for i in np.flatnonzero(rank_deficient):
+            result = adfuller(series[i], maxlag=maxlag, regression=regression, autolag=autolag)
+            adf_stats[i], used_lags[i] = result[0], result[2]
+
+        p_values = np.array([mackinnonp(stat, regression=regression, N=1) for stat in adf_stats])
+        return ADFBatchResult(adf_stats, p_values, used_lags)
+
+    def __build_design(series: np.ndarray, lag: int, regression: str, level_last: bool) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the differences (series x obs) and the stacked test regression design (series x obs x columns) for `lag` lagged differences.
+        Columns are ordered [trend, level, lags] or, with `level_last`, [trend, lags, level].
+        """
+        xdiff = np.diff(series, axis=1)
+        nobs = xdiff.shape[1] - lag
+        trend = np.arange(1, nobs + 1, dtype=np.float64)
+        trend_cols = [np.ones(nobs), trend, trend ** 2][:len(regression) if regression != 'n' else 0]
+
+        level = series[:, lag:lag + nobs]
+        lag_cols = [xdiff[:, lag - j:lag - j + nobs] for j in range(1, lag + 1)]
+        data_cols = [*lag_cols, level] if level_last else [level, *lag_cols]
+
+        design = np.empty((len(series), nobs, len(trend_cols) + len(data_cols)))
+        for i, col in enumerate(trend_cols):
+            design[:, :, i] = col
+        for i, col in enumerate(data_cols, len(trend_cols)):
+            design[:, :, i] = col
+        return xdiff[:, lag:], design
+
+    def __qr_fit(y: np.ndarray, design: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Stacked QR least squares, returns (Q'y, R, sum of squared residuals of the full design, rank deficient per series)"""
+        q, r = np.linalg.qr(design)
+        qty = np.einsum('snk,sn->sk', q, y)
+        resid = y - np.einsum('snk,sk->sn', q, qty)
+        ssr = np.einsum('sn,sn->s', resid, resid)
+
+        r_diag = np.abs(np.diagonal(r, axis1=1, axis2=2))
+        rank_deficient = (r_diag <= 1e-9 * r_diag.max(axis=1, keepdims=True)).any(axis=1)
+        return qty, r, ssr, rank_deficient
+
+    def __select_lags(series: np.ndarray, maxlag: int, regression: str, autolag: str) -> tuple[np.ndarray, np.ndarray]:
+        """Selects the lag order with the lowest information criterion, every order is fitted on the same (maxlag trimmed) observations"""
+        y, design = StationaryADF.__build_design(series, maxlag, regression, level_last=False)
+        qty, _, ssr_full, rank_deficient = StationaryADF.__qr_fit(y, design)
+        nobs = y.shape[1]
+
+        # The residual sum of squares of the first k columns is the full residual plus the Q'y terms of the dropped columns
+        tail = np.cumsum(qty[:, ::-1] ** 2, axis=1)[:, ::-1]
+        startlag = design.shape[2] - maxlag
+        n_params = np.arange(startlag, startlag + maxlag + 1)
+        ssr = ssr_full[:, None] + np.append(tail[:, startlag:], np.zeros((len(series), 1)), axis=1)
+
+        # An exact fit has no residual, its information criterion is not finite
+        with np.errstate(divide='ignore', invalid='ignore'):
+            llf = -nobs / 2 * (np.log(2 * np.pi) + np.log(ssr / nobs) + 1)
+        match autolag:
+            case 'aic':
+                ic = -2 * llf + 2 * n_params
+            case 'bic':
+                ic = -2 * llf + np.log(nobs) * n_params
+            case _:
+                raise ValueError(f"autolag must be 'AIC', 'BIC' or None, got {autolag}")
+        # argmin takes the first minimum, the lowest lag order wins ties like in statsmodels
+        return np.argmin(ic, axis=1), rank_deficient | ~np.isfinite(ic).all(axis=1)
+
+    def __level_t_values(series: np.ndarray, lag: int, regression: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        t-value of the level coefficient, with the level as last column it only depends on the last element of Q'y and R.
+        Series without a finite t-value (an exact fit has no residual) are flagged like rank deficient ones.
+        """
+        y, design = StationaryADF.__build_design(series, lag, regression, level_last=True)
+        qty, r, ssr, rank_deficient = StationaryADF.__qr_fit(y, design)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma = np.sqrt(ssr / (y.shape[1] - design.shape[2]))
+            t_values = np.sign(r[:, -1, -1]) * qty[:, -1] / sigma
+        return t_values, rank_deficient | ~np.isfinite(t_values)
@@ -0,0 +1,94 @@
+import os
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from StationaryADF import StationaryADF
+from SQLiteConnection import SQLiteConnection
+
+PERSIST_PATH_ENV = "STATIONARY_CACHE_PATH"
+
+class StationaryCache:
+    """
+    Memoizes ad fuller results per column, keyed by a hash of the series values, the differencing order and the test settings.
+    Results are held in an in memory LRU and optionally persisted in a SQLite file that is shared by every (worker) process.
+    """
+    max_size: int = 100_000
+    hits: int = 0
+    misses: int = 0
+    __lru: OrderedDict = OrderedDict()
+    __database: SQLiteConnection = SQLiteConnection(PERSIST_PATH_ENV, "CREATE TABLE IF NOT EXISTS adf (key TEXT PRIMARY KEY, p_value REAL, used_lag INTEGER)")
+
+    def configure(persist_path: str = None, max_size: int = 100_000) -> None:
+        """Sets the LRU size and the SQLite file to persist results in (None keeps results in memory only)"""
+        StationaryCache.max_size = max_size
+        if persist_path is None:
+            os.environ.pop(PERSIST_PATH_ENV, None)
+        else:
+            os.environ[PERSIST_PATH_ENV] = os.path.abspath(persist_path)
+
+    def clear() -> None:
+        """Empties the in memory LRU and resets the hit and miss counters, persisted results are kept"""
+        StationaryCache.__lru.clear()
+        StationaryCache.hits = 0
+        StationaryCache.misses = 0
+
+    def get_adf_result(series: pd.Series, maxlag: int, diff_order: int = 0, regression: str = 'c', autolag: str = 'AIC') -> tuple[float, int]:
+        """Returns (p-value, used lags) of the ad fuller test on `series`, only running the test when this exact test was not done before"""
+        values = np.asarray(series, dtype=np.float64)[:, None]
+        return StationaryCache.get_adf_results(values, maxlag, diff_order, regression, autolag)[0]
+
+    def get_adf_results(data: pd.DataFrame, maxlag: int, diff_order: int = 0, regression: str = 'c', autolag: str = 'AIC') -> list[tuple[float, int]]:
+        """Returns (p-value, used lags) per column of `data`, the columns that were not tested before are tested together in one batch"""
+        values = np.asarray(data, dtype=np.float64)
+        keys = [StationaryCache.__create_key(np.ascontiguousarray(values[:, i]), maxlag, diff_order, regression, autolag) for i in range(values.shape[1])]
+        results = [StationaryCache.__lookup(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) > 0:
+            StationaryCache.misses += len(missing)
+            batch = StationaryADF.adfuller_batch(values[:, missing], maxlag, regression, autolag)
+            new_results = [(float(p_value), int(used_lag)) for p_value, used_lag in zip(batch.p_values, batch.used_lags)]
+            for i, result in zip(missing, new_results):
+                results[i] = result
+                StationaryCache.__remember(keys[i], result)
+            StationaryCache.__persist([(keys[i], result) for i, result in zip(missing, new_results)])
+        return results
+
+    def __lookup(key: str) -> tuple[float, int]:
+        """Returns the memoized result of `key` from the LRU or the SQLite file, None when it was never tested"""
+        result = StationaryCache.__lru.get(key)
+        if result is not None:
+            StationaryCache.__lru.move_to_end(key)
+            StationaryCache.hits += 1
+            return result
+
+        result = StationaryCache.__load_persisted(key)
+        if result is not None:
+            StationaryCache.hits += 1
+            StationaryCache.__remember(key, result)
+        return result
+
+    def __remember(key: str, result: tuple[float, int]) -> None:
+        StationaryCache.__lru[key] = result
+        while len(StationaryCache.__lru) > StationaryCache.max_size:
+            StationaryCache.__lru.popitem(last=False)
+
+    def __create_key(values: np.ndarray, maxlag: int, diff_order: int, regression: str, autolag: str) -> str:
+        sha = hashlib.sha1(values.tobytes())
+        sha.update(f"{len(values)}|{maxlag}|{diff_order}|{regression}|{autolag}".encode())
+        return sha.hexdigest()
+
+    def __load_persisted(key: str) -> tuple[float, int]:
+        connection = StationaryCache.__database.get()
+        if connection is None:
+            return None
+        row = connection.execute("SELECT p_value, used_lag FROM adf WHERE key = ?", (key,)).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def __persist(items: list[tuple[str, tuple[float, int]]]) -> None:
+        connection = StationaryCache.__database.get()
+        if connection is None:
+            return
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO adf VALUES (?, ?, ?)", [(key, result[0], result[1]) for key, result in items])
@@ -1,6 +1,7 @@
 import pandas as pd
 from dataclasses import dataclass
-from statsmodels.tsa.stattools import adfuller
+from StationaryCache import StationaryCache
+from VARProfiler import VARProfiler
 
 @dataclass
 class MakeStationaryResult:
@@ -9,6 +10,7 @@ class MakeStationaryResult:
     itas: int
 
 class Stationary:
+    @VARProfiler.timed("make_stationary")
     def make_dataframe_stationary(df: pd.DataFrame) -> MakeStationaryResult:
         """
         Attempts to make all columns from dataframe stationary by executing one or two differencing iterations. Uses the ad fuller test to verify wether the dataframe is stationary.
@@ -30,7 +32,7 @@ class Stationary:
 
         diff_pass = 1
         data_completely_stationary = False
-        while not Stationary.__are_all_col_stationary(df, True):
+        while not Stationary.__are_all_col_stationary(df, diff_pass - 1, True):
             print(f'One or more series are non-stationary, differencing... (pass = {diff_pass})')
             df = df.diff().dropna()
             diff_pass += 1
@@ -44,29 +46,30 @@ class Stationary:
             print('All series are stationary')
         return MakeStationaryResult(df, data_completely_stationary, diff_pass) 
 
-    def __are_all_col_stationary(data: pd.DataFrame, verbose = False) -> bool:
+    def __are_all_col_stationary(data: pd.DataFrame, diff_order: int, verbose = False) -> bool:
+        """ad fuller results are memoized per column by StationaryCache, so repeated tests on identical data are skipped and the other columns are tested in one batch"""
         maxlag = round(12 * pow(len(data) / 100, 1/4))
         alpha = 0.05
         results = pd.DataFrame()
         all_cols_are_stationary = True
 
-        for name, series in data.items():
-            result = adfuller(
-                series,
+        with VARProfiler.stage("adf_test"):
+            adf_results = StationaryCache.get_adf_results(
+                data,
                 maxlag     = maxlag,
+                diff_order = diff_order,
                 regression = 'c', # Constant regression
-                autolag    = 'AIC', 
-                store      = False,
-                regresults = False
+                autolag    = 'AIC'
             )
-            col_val_is_stationary = result[1] <= alpha
+        for name, result in zip(data.columns, adf_results):
+            col_val_is_stationary = result[0] <= alpha
 
             if not col_val_is_stationary:
                 all_cols_are_stationary = False
 
             results[name] = {
-                'P-Value':     round(result[1], 3),
-                'Number lags': result[2],
+                'P-Value':     round(result[0], 3),
+                'Number lags': result[1],
                 'Stationary':  'Yes' if col_val_is_stationary else 'No'
             }
 
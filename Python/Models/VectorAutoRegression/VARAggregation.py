@@ -0,0 +1,95 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from VARDataClasses import AggregatedFoldVARResults, VARHyperParams, CountryVARResult, FoldVARResults
+
+@dataclass
+class RunningFoldStats:
+    """
+    Running statistics of one fold over the countries added so far: Welford mean and sum of squared deviations of the RMSE and counters of the hyper parameters.
+    The RMSE is reduced in country order: results that arrive before the countries in front of them wait in `pending_rmse` (None for a country without a result)
+    until `next_ita` reaches them, so the mean does not depend on the order batches finish in.
+    `first_seen` holds the lowest country position per lag and trend, so ties between modes do not depend on the order countries are added in.
+    """
+    count: int = 0
+    mean_rmse: float = 0.0
+    m2_rmse: float = 0.0
+    lag_counts: Counter = field(default_factory=Counter)
+    trend_counts: Counter = field(default_factory=Counter)
+    first_seen: dict = field(default_factory=dict)
+    next_ita: int = 0
+    pending_rmse: dict = field(default_factory=dict)
+
+class VARAggregation:
+    """
+    Single pass aggregation of fold results into AggregatedFoldVARResults.
+    Country results are added as they are evaluated and not retained, every fold result is visited once.
+    Only the RMSEs of countries added ahead of their position are held back, see `RunningFoldStats`.
+    """
+    def create(folds: int) -> list[RunningFoldStats]:
+        return [RunningFoldStats() for _ in range(folds)]
+
+    def add_country_res(stats: list[RunningFoldStats], country_res: CountryVARResult, country_ita: int) -> None:
+        """Adds the fold results of the country at position `country_ita`, folds beyond `stats` are ignored"""
+        for fold_res in country_res.folds_res:
+            VARAggregation.add_fold_res(stats, fold_res, country_ita)
+        # Folds this country has no result for do not hold back the countries after it
+        for fold_stats in stats:
+            if country_ita >= fold_stats.next_ita:
+                fold_stats.pending_rmse.setdefault(country_ita, None)
+                VARAggregation.__reduce_pending(fold_stats)
+
+    def add_fold_res(stats: list[RunningFoldStats], fold_res: FoldVARResults, country_ita: int) -> None:
+        if fold_res.fold_ita >= len(stats):
+            return
+        fold_stats = stats[fold_res.fold_ita]
+        fold_stats.pending_rmse[country_ita] = fold_res.pred_res.rmse
+        VARAggregation.__reduce_pending(fold_stats)
+
+        hyper_params = fold_res.pred_res.hyper_params
+        fold_stats.lag_counts[hyper_params.lag] += 1
+        fold_stats.trend_counts[hyper_params.trend] += 1
+        for key in (("lag", hyper_params.lag), ("trend", hyper_params.trend)):
+            fold_stats.first_seen[key] = min(fold_stats.first_seen.get(key, country_ita), country_ita)
+
+    def get_rmse_variance(fold_stats: RunningFoldStats) -> float:
+        """Sample variance of the RMSE of a fold, NaN with less than two results"""
+        VARAggregation.__reduce_remaining(fold_stats)
+        return fold_stats.m2_rmse / (fold_stats.count - 1) if fold_stats.count > 1 else float('nan')
+
+    def get_results(stats: list[RunningFoldStats]) -> list[AggregatedFoldVARResults]:
+        """Number of countries, mean RMSE and the most common hyper parameters per fold, "No data" for folds without results"""
+        res_by_fold = []
+        for fold, fold_stats in enumerate(stats):
+            VARAggregation.__reduce_remaining(fold_stats)
+            mode_trend = VARAggregation.__get_mode(fold_stats, fold_stats.trend_counts, "trend")
+            mode_lag = VARAggregation.__get_mode(fold_stats, fold_stats.lag_counts, "lag")
+            mean_rmse = fold_stats.mean_rmse if fold_stats.count > 0 else "No data"
+            res_by_fold.append(AggregatedFoldVARResults((fold + 1), fold_stats.count, mean_rmse, VARHyperParams(mode_trend, mode_lag)))
+        return res_by_fold
+
+    def __reduce_pending(fold_stats: RunningFoldStats) -> None:
+        """Adds the RMSEs that are next in country order to the running mean"""
+        while fold_stats.next_ita in fold_stats.pending_rmse:
+            VARAggregation.__add_rmse(fold_stats, fold_stats.pending_rmse.pop(fold_stats.next_ita))
+            fold_stats.next_ita += 1
+
+    def __reduce_remaining(fold_stats: RunningFoldStats) -> None:
+        """Adds every held back RMSE in country order, positions that were never added are skipped"""
+        for country_ita in sorted(fold_stats.pending_rmse):
+            VARAggregation.__add_rmse(fold_stats, fold_stats.pending_rmse[country_ita])
+            fold_stats.next_ita = country_ita + 1
+        fold_stats.pending_rmse.clear()
+
+    def __add_rmse(fold_stats: RunningFoldStats, rmse: float) -> None:
+        if rmse is None:
+            return
+        fold_stats.count += 1
+        delta = rmse - fold_stats.mean_rmse
+        fold_stats.mean_rmse += delta / fold_stats.count
+        fold_stats.m2_rmse += delta * (rmse - fold_stats.mean_rmse)
+
+    def __get_mode(fold_stats: RunningFoldStats, counts: Counter, name: str):
+        """Most common value, ties go to the value seen first in country order"""
+        if len(counts) == 0:
+            return "No data"
+        return max(counts, key = lambda value: (counts[value], -fold_stats.first_seen[(name, value)]))
@@ -4,9 +4,10 @@ warnings.simplefilter(action = 'ignore', category = FutureWarning)
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.api import VAR
-from statsmodels.tsa.stattools import adfuller
 from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt 
+from PWTCache import PWTCache, PWT_SHEET_NAME
+from StationaryADF import StationaryADF
 
 def stationarity_test(data: pd.DataFrame, verbose = False) -> bool:
     maxlag = round(12 * pow(len(data) / 100, 1/4))
@@ -14,23 +15,22 @@ def stationarity_test(data: pd.DataFrame, verbose = False) -> bool:
     results = pd.DataFrame()
     all_cols_are_stationary = True
 
-    for name, series in data.items():
-        result = adfuller(
-            series,
-            maxlag     = maxlag,
-            regression = 'c', # Constant regression
-            autolag    = 'AIC', 
-            store      = False,
-            regresults = False
-        )
-        col_val_is_stationary = result[1] <= alpha
+    # Every column is tested in one batch
+    adf_result = StationaryADF.adfuller_batch(
+        data.to_numpy(dtype=np.float64),
+        maxlag     = maxlag,
+        regression = 'c', # Constant regression
+        autolag    = 'AIC'
+    )
+    for name, p_value, used_lag in zip(data.columns, adf_result.p_values, adf_result.used_lags):
+        col_val_is_stationary = p_value <= alpha
 
         if not col_val_is_stationary:
             all_cols_are_stationary = False
 
         results[name] = {
-            'P-Value':     round(result[1], 3),
-            'Number lags': result[2],
+            'P-Value':     round(p_value, 3),
+            'Number lags': used_lag,
             'Stationary':  'Yes' if col_val_is_stationary else 'No'
         }
 
@@ -150,12 +150,8 @@ def create_pwt_dev_status_subset(dev_statuses: list[str], dev_status_df: pd.Data
     return dev_stat_df_list
 
 def init_data():
-    pwt = pd.read_excel('../../../Data/pwt1001.xlsx',
-                    sheet_name = 'Data',
-                    parse_dates = ['year'],
-                    index_col = 3)
     gdp = 'cgdpo'
-    pwt = pwt[[gdp, 'ccon', 'rdana', "countrycode"]]
+    pwt = PWTCache.load_pwt(columns = [gdp, 'ccon', 'rdana', "countrycode"], year_index = True, sheet_name = PWT_SHEET_NAME)
     pwt = pwt.dropna()
 
     country_dev_status_df = pd.read_csv('../../../Data/dev_status.csv')
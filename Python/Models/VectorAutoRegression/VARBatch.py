@@ -0,0 +1,91 @@
+import numpy as np
+from collections import defaultdict
+from VAROLS import VAROLS, VAROLSResult, TRENDS
+from VARProfiler import VARProfiler
+
+class VARBatch:
+    """
+    Fits and forecasts many small VAR problems at once, e.g. the folds of every country within a development status.
+    Problems with the same shape (lag, trend and amount of observations) are stacked into 3d arrays and solved by batched `np.linalg` calls.
+    """
+    def fit(endogs: list[np.ndarray], lag: int, trend: str) -> list[VAROLSResult]:
+        """Batched `VAROLS.fit`, fits a VAR of order `lag` with trend `trend` on every (observations x neqs) array of `endogs`"""
+        designs = [VAROLS.build_design(endog, lag) for endog in endogs]
+        return [fits[0] for fits in VARBatch.fit_trends(endogs, designs, lag, [trend])]
+
+    @VARProfiler.timed("var_fit")
+    def fit_trends(endogs: list[np.ndarray], designs: list[np.ndarray], lag: int, trends: list[str] = TRENDS) -> list[list[VAROLSResult]]:
+        """Batched `VAROLS.fit_trends`, returns the results of every trend for every problem in the order of `endogs`"""
+        results = [None] * len(endogs)
+        groups = defaultdict(list)
+        for i, (endog, design) in enumerate(zip(endogs, designs)):
+            groups[(endog.shape, design.shape)].append(i)
+
+        for problem_ids in groups.values():
+            endog = np.stack([endogs[i] for i in problem_ids])
+            design = np.stack([designs[i] for i in problem_ids])
+            for i, fits in zip(problem_ids, VARBatch.__fit_group(endog, design, lag, trends)):
+                results[i] = fits
+        return results
+
+    @VARProfiler.timed("forecast")
+    def forecast(results: list[VAROLSResult], ys: list[np.ndarray], steps: list[int]) -> list[np.ndarray]:
+        """Batched `VAROLS.forecast`, forecasts `steps[i]` ahead with `results[i]` continuing from the prior observations `ys[i]`"""
+        forecasts = [None] * len(results)
+        groups = defaultdict(list)
+        for i, result in enumerate(results):
+            groups[(result.lag, result.trend, result.params.shape)].append(i)
+
+        for (lag, trend, _), problem_ids in groups.items():
+            k_trend = VAROLS.get_trend_order(trend)
+            max_steps = max(steps[i] for i in problem_ids)
+            params = np.stack([results[i].params for i in problem_ids])
+            lag_params = params[:, k_trend:]
+
+            # A recursive forecast of fewer steps is the start of a longer one, every problem is forecast `max_steps` ahead
+            trend_values = np.array([results[i].n_totobs for i in problem_ids])[:, None] + np.arange(1, max_steps + 1)
+            exog = np.stack([np.ones(trend_values.shape), trend_values, trend_values ** 2], axis=2)[:, :, :k_trend]
+
+            history = np.empty((len(problem_ids), lag + max_steps, params.shape[2]))
+            history[:, :lag] = np.stack([ys[i][len(ys[i]) - lag:] for i in problem_ids])
+            history[:, lag:] = exog @ params[:, :k_trend]
+            for h in range(max_steps):
+                prior = history[:, h:lag + h][:, ::-1].reshape(len(problem_ids), -1)
+                history[:, lag + h] += np.einsum('bj,bjk->bk', prior, lag_params)
+
+            for group_i, i in enumerate(problem_ids):
+                forecasts[i] = history[group_i, lag:lag + steps[i]]
+        return forecasts
+
+    def __fit_group(endog: np.ndarray, design: np.ndarray, lag: int, trends: list[str]) -> list[list[VAROLSResult]]:
+        """Fits a stack of same shaped problems, the columns [lags, constant, trend, squared trend] are QR decomposed once for all trends"""
+        n_problems, nobs, neqs = endog.shape
+        maxlag = (design.shape[2] - 3) // neqs
+        n_lag_cols = neqs * lag
+        k_trends = [VAROLS.get_trend_order(trend) for trend in trends]
+        columns = np.r_[0:n_lag_cols, neqs * maxlag:neqs * maxlag + max(k_trends)]
+        z = design[:, lag:][:, :, columns]
+        y = endog[:, lag:]
+
+        n_solvable = np.zeros(n_problems, dtype=np.int64)
+        if z.shape[1] >= z.shape[2]:
+            q, r = np.linalg.qr(z)
+            qty = np.swapaxes(q, 1, 2) @ y
+            r_diag = np.abs(np.diagonal(r, axis1=1, axis2=2))
+            n_solvable = np.argmin(np.append(r_diag > 1e-10 * r_diag.max(axis=1, keepdims=True), np.zeros((n_problems, 1), dtype=bool), axis=1), axis=1)
+
+        results = [[] for _ in range(n_problems)]
+        for trend, k_trend in zip(trends, k_trends):
+            k = n_lag_cols + k_trend
+            coefs = np.empty((n_problems, k, neqs))
+            solvable = n_solvable >= k
+            if solvable.any():
+                coefs[solvable] = np.linalg.solve(r[solvable, :k, :k], qty[solvable, :k])
+            # Underdetermined or (nearly) collinear problems use the minimum norm least squares of statsmodels
+            for i in np.flatnonzero(~solvable):
+                coefs[i] = np.linalg.lstsq(z[i, :, :k], y[i], rcond=1e-15)[0]
+
+            params = np.concatenate([coefs[:, n_lag_cols:], coefs[:, :n_lag_cols]], axis=1)
+            for i in range(n_problems):
+                results[i].append(VAROLSResult(params[i], lag, trend, nobs))
+        return results
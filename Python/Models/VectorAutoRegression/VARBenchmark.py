@@ -0,0 +1,193 @@
+import io
+import os
+import warnings
+import json
+import time
+import platform
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+from dataclasses import dataclass, asdict
+import numpy as np
+import pandas as pd
+import statsmodels
+from PWTSynthetic import PWTSynthetic
+from PWTDevStatus import PWTDevStatusGenerator, DevStatusLevel
+from PWTPanel import PWTPanel
+from StationaryFunctions import Stationary
+from StationaryCache import StationaryCache
+from VARCheckpoint import VARCheckpoint
+from VARParameterSelection import VARParameterSelection
+from VARModel import VARModel, VAREngine
+from VAREvaluation import VAREvaluation, KFoldSplit, GridSearchStrategy
+
+INDEP_VARS = ['rdana', 'rtfpna', 'emp', 'cda']
+DEPENDENT_NAME = "gdp_growth"
+MIN_REPEAT_TIME = 0.2
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark, every repeat runs the benchmark `number` times and `times_s` holds the seconds per call of every repeat"""
+    name: str
+    number: int
+    repeats: int
+    min_s: float
+    median_s: float
+    mean_s: float
+    stdev_s: float
+    times_s: list[float]
+
+@dataclass
+class BenchmarkReport:
+    meta: dict
+    results: list[BenchmarkResult]
+
+class VARBenchmark:
+    """
+    Micro and macro benchmarks of the VAR pipeline on a seeded synthetic Penn World Table (see `PWTSynthetic`), so runs on different commits time the same data.
+    Ad fuller results are not memoized between calls and checkpointing is disabled, every call computes its results from scratch.
+    Reports are JSON files with the timings and the commit, versions and settings they were measured with, `compare` lines up the timings of two reports.
+    """
+    def run(directory: str = "./.cache/benchmark", countries: int = 183, years: int = 70, seed: int = 0, repeats: int = 5, names: list[str] = None) -> BenchmarkReport:
+        """Runs the benchmarks in `names` (every benchmark when None) on a synthetic panel of `countries` x `years`, generated once into `directory`"""
+        StationaryCache.configure(None)
+        VARCheckpoint.configure(None)
+        xlsx_path, dev_status_path = VARBenchmark.prepare_data(directory, countries, years, seed)
+
+        results = []
+        # The pipeline output and the warnings of countries without stationary folds are not part of the report
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter(action = 'ignore', category = RuntimeWarning)
+            benchmarks = VARBenchmark.__create_benchmarks(directory, xlsx_path, dev_status_path)
+            for name, func in benchmarks.items():
+                if names is None or name in names:
+                    results.append(VARBenchmark.measure(name, func, repeats))
+        for result in results:
+            print(f"{result.name}: {result.median_s * 1000:.3f} ms per call (min {result.min_s * 1000:.3f} ms, {result.repeats} x {result.number} calls)")
+
+        meta = VARBenchmark.get_meta()
+        meta.update({"countries": countries, "years": years, "seed": seed})
+        return BenchmarkReport(meta, results)
+
+    def prepare_data(directory: str, countries: int, years: int, seed: int) -> tuple[str, str]:
+        """Writes the synthetic workbook and dev status csv of these settings once and returns their paths"""
+        data_directory = os.path.join(directory, f"synthetic_{countries}x{years}_seed{seed}")
+        xlsx_path = os.path.join(data_directory, "pwt1001.xlsx")
+        dev_status_path = os.path.join(data_directory, "dev_status.csv")
+        if not os.path.exists(xlsx_path) or not os.path.exists(dev_status_path):
+            print(f"Generating synthetic Penn World Table ({countries} countries x {years} years)...")
+            pwt, dev_status = PWTSynthetic.generate(countries, years, seed)
+            PWTSynthetic.write(data_directory, pwt, dev_status)
+        return xlsx_path, dev_status_path
+
+    def measure(name: str, func, repeats: int) -> BenchmarkResult:
+        """Times `func` like `timeit`: the amount of calls per repeat grows until a repeat takes at least MIN_REPEAT_TIME"""
+        number = 1
+        while True:
+            elapsed = VARBenchmark.__time_calls(func, number)
+            if elapsed >= MIN_REPEAT_TIME:
+                break
+            number *= 10
+
+        times = [elapsed / number] + [VARBenchmark.__time_calls(func, number) / number for _ in range(repeats - 1)]
+        return BenchmarkResult(name, number, len(times), min(times), statistics.median(times), statistics.mean(times), statistics.stdev(times) if len(times) > 1 else 0.0, times)
+
+    def get_meta() -> dict:
+        """Commit, versions and machine the timings were measured on"""
+        return {
+            "commit": VARBenchmark.__get_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "statsmodels": statsmodels.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "engine": VARModel.get_engine().name,
+        }
+
+    def save_json(report: BenchmarkReport, directory: str = "./.cache/benchmarks") -> str:
+        """Saves the report as `<commit>.json` (`<timestamp>.json` outside a git checkout) in `directory` and returns its path"""
+        os.makedirs(directory, exist_ok=True)
+        file_name = report.meta["commit"][:10] if report.meta["commit"] is not None else report.meta["timestamp"].replace(":", "-")
+        path = os.path.join(directory, f"{file_name}.json")
+        with open(path, "w") as f:
+            json.dump(asdict(report), f, indent=2)
+        return path
+
+    def compare(base_path: str, new_path: str) -> pd.DataFrame:
+        """Median seconds per call of both reports per benchmark, a ratio below 1 means the new report is faster"""
+        medians = []
+        for path in (base_path, new_path):
+            with open(path, "r") as f:
+                medians.append({res["name"]: res["median_s"] for res in json.load(f)["results"]})
+        base, new = medians
+        names = [name for name in base if name in new]
+        return pd.DataFrame({
+            "benchmark": names,
+            "base_s": [base[name] for name in names],
+            "new_s": [new[name] for name in names],
+            "ratio": [new[name] / base[name] for name in names],
+        })
+
+    def __create_benchmarks(directory: str, xlsx_path: str, dev_status_path: str) -> dict:
+        """Prepares the inputs of every benchmark and returns the functions to time by name"""
+        load_dev_status_dfs = lambda: PWTDevStatusGenerator.subset_pwt_by_dev_stat(DevStatusLevel.MERGED_SUBSET, list(INDEP_VARS), xlsx_path = xlsx_path, dev_status_path = dev_status_path)
+        # Builds the Parquet cache of the workbook, the benchmark times loading from the cache as every run but the first does
+        dev_status_dfs = load_dev_status_dfs()
+
+        # A single fold of the country with the most years in the largest development status
+        largest_df = max(dev_status_dfs, key = len).drop(columns=["economy"])
+        countrycode = largest_df["countrycode"].value_counts().index[0]
+        panel = PWTPanel.from_dataframe(largest_df, os.path.join(directory, "benchmark.panel"))
+        fold = KFoldSplit(4).split(panel.get_country_df(countrycode))[0]
+        stationary_res = Stationary.make_dataframe_stationary(fold.train.copy())
+        forecast_diff = stationary_res.df.iloc[:len(fold.test)].set_axis(fold.test.index)
+
+        country_var_res = [res[0] for res in VAREvaluation.evaluate_countries(largest_df["countrycode"].unique(), panel, [GridSearchStrategy(None, 8)], KFoldSplit(4), DEPENDENT_NAME)]
+
+        def make_dataframe_stationary():
+            StationaryCache.clear()
+            Stationary.make_dataframe_stationary(fold.train.copy())
+
+        def var_parameter_search():
+            model = VARModel.create_var_model(stationary_res.df)
+            VARParameterSelection.var_parameter_search(model, DEPENDENT_NAME, fold.train, stationary_res.df, fold.test, stationary_res.itas, 8, max_queue_length=1)
+
+        def VAR_pipeline():
+            StationaryCache.clear()
+            VAREvaluation.VAR_pipeline(dev_status_dfs, DEPENDENT_NAME, INDEP_VARS, [GridSearchStrategy(None, 8)], KFoldSplit(4), False)
+
+        return {
+            "subset_pwt_by_dev_stat": load_dev_status_dfs,
+            "make_dataframe_stationary": make_dataframe_stationary,
+            "var_parameter_search": var_parameter_search,
+            "diff_inv": lambda: VARModel.diff_inv(forecast_diff, fold.train, 2),
+            "calculate_fold_var_res": lambda: VAREvaluation.calculate_fold_var_res(country_var_res, 4),
+            "VAR_pipeline": VAR_pipeline,
+        }
+
+    def __time_calls(func, number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+
+    def __get_commit() -> str:
+        """The checked out commit, None outside a git checkout"""
+        try:
+            return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+if __name__ == "__main__":
+    # The engine VARModelTuning runs with, VAREngine.STATSMODELS measures statsmodels instead
+    VARModel.configure_engine(VAREngine.NUMPY_BATCHED)
+    report = VARBenchmark.run()
+    path = VARBenchmark.save_json(report)
+    print(f"Saved benchmark results to {path}")
+    # Set to the results of another commit (e.g. "./.cache/benchmarks/<commit>.json") to compare against
+    baseline_path = None
+    if baseline_path is not None:
+        print(VARBenchmark.compare(baseline_path, path).to_string(index=False))
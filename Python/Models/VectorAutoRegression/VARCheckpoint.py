@@ -0,0 +1,63 @@
+import os
+import json
+from dataclasses import asdict
+from VARDataClasses import CountryVARResult, FoldVARResults, MeanVARResults, VARPredictionResult, VARHyperParams
+from SQLiteConnection import SQLiteConnection
+
+CHECKPOINT_PATH_ENV = "VAR_CHECKPOINT_PATH"
+
+class VARCheckpoint:
+    """
+    Durable store of the CountryVARResult of every (development status, country, config) evaluated by VAREvaluation.
+    Results are appended to a SQLite file as soon as a batch of countries finishes, so an interrupted run keeps everything evaluated so far.
+    With `resume` a rerun loads the stored results and only evaluates the missing countries and configs.
+    """
+    resume: bool = True
+    batch_size: int = 16
+    __database: SQLiteConnection = SQLiteConnection(CHECKPOINT_PATH_ENV, "CREATE TABLE IF NOT EXISTS country_results (dev_status TEXT, countrycode TEXT, config TEXT, result TEXT, PRIMARY KEY (dev_status, countrycode, config))")
+
+    def configure(path: str = None, resume: bool = True, batch_size: int = 16) -> None:
+        """
+        Sets the SQLite file results are stored in (None disables checkpointing) and whether stored results are reused.
+        At most `batch_size` countries are evaluated per batch, which bounds the work lost on an interruption.
+        """
+        VARCheckpoint.resume = resume
+        VARCheckpoint.batch_size = batch_size
+        if path is None:
+            os.environ.pop(CHECKPOINT_PATH_ENV, None)
+        else:
+            os.environ[CHECKPOINT_PATH_ENV] = os.path.abspath(path)
+
+    def is_enabled() -> bool:
+        return os.environ.get(CHECKPOINT_PATH_ENV) is not None
+
+    def create_config_key(*settings: object) -> str:
+        """Key of an evaluation config, built from the reprs of the dataclasses (strategy, splitter) and values it depends on"""
+        return "|".join(repr(setting) for setting in settings)
+
+    def load(dev_status: str, countrycodes: list[str], config_keys: list[str]) -> dict[tuple[str, str], CountryVARResult]:
+        """Returns the stored results by (countrycode, config key), empty when checkpointing is disabled or not resuming"""
+        connection = VARCheckpoint.__database.get()
+        if connection is None or not VARCheckpoint.resume:
+            return {}
+
+        countrycodes, config_keys = set(countrycodes), set(config_keys)
+        rows = connection.execute("SELECT countrycode, config, result FROM country_results WHERE dev_status = ?", (dev_status,)).fetchall()
+        return {(countrycode, config_key): VARCheckpoint.__from_dict(json.loads(result))
+                for countrycode, config_key, result in rows if countrycode in countrycodes and config_key in config_keys}
+
+    def store(dev_status: str, countrycodes: list[str], config_keys: list[str], countrys_res: list[list[CountryVARResult]]) -> None:
+        """Stores the results per country of `countrycodes`, per config of `config_keys`, in one transaction"""
+        connection = VARCheckpoint.__database.get()
+        if connection is None:
+            return
+        rows = [(dev_status, str(countrycode), config_key, json.dumps(asdict(country_res)))
+                for countrycode, country_res_by_config in zip(countrycodes, countrys_res)
+                for config_key, country_res in zip(config_keys, country_res_by_config)]
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO country_results VALUES (?, ?, ?, ?)", rows)
+
+    def __from_dict(res: dict) -> CountryVARResult:
+        folds_res = [FoldVARResults(**{**fold_res, "pred_res": VARPredictionResult(fold_res["pred_res"]["rmse"], VARHyperParams(**fold_res["pred_res"]["hyper_params"]))})
+                     for fold_res in res["folds_res"]]
+        return CountryVARResult(folds_res, MeanVARResults(**res["mean_fold_res"]))
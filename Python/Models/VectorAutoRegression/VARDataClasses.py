@@ -1,11 +1,17 @@
 from dataclasses import dataclass
 from pandas import DataFrame
+from StationaryFunctions import MakeStationaryResult
 
 @dataclass
 class VARHyperParams:
     trend: str
     lag: int
 
+@dataclass
+class BaseModelConfig:
+    export_name: str
+    hyper_params: VARHyperParams
+
 @dataclass
 class VARPredictionResult:
     rmse: float
@@ -45,6 +51,13 @@ class TrainTestData:
     train: DataFrame
     test: DataFrame
 
+@dataclass
+class PreparedFold:
+    country_ita: int
+    fold_ita: int
+    data: TrainTestData
+    stationary_res: MakeStationaryResult
+
 @dataclass
 class DevStatusResult:
     development_status: str
@@ -0,0 +1,326 @@
+# This makes sure Pandas keeps it mouth shut
+import warnings
+warnings.simplefilter(action = 'ignore', category = FutureWarning)
+import pandas as pd
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from sklearn.model_selection import KFold
+from VARDataClasses import VARPredictionResult, FoldVARResults, MeanVARResults, TrainTestData, AggregatedFoldVARResults, VARHyperParams, DevStatusResult, CountryVARResult, VARExportClass, PreparedFold
+from StationaryFunctions import Stationary
+from VARExportResults import ExportVARResults
+from VARParameterSelection import VARParameterSelection
+from VARModel import VARModel, VAREngine
+from VAROLS import VAROLS, TRENDS
+from VARBatch import VARBatch
+from VARRecursive import VARRecursive
+from PWTPanel import PWTPanel
+from VARParallel import VARParallel
+from VARCheckpoint import VARCheckpoint
+from VARAggregation import VARAggregation
+from VARResultStore import VARResultStore, ResultStoreWriter
+from VARProfiler import VARProfiler
+
+@dataclass
+class KFoldSplit:
+    """Splits the data of a country in `folds` consecutive test blocks, each trained on all other years"""
+    folds: int = 4
+    expanding = False
+
+    def split(self, df: pd.DataFrame) -> list[TrainTestData]:
+        kf = KFold(n_splits=self.folds, random_state=None, shuffle=False)
+        return [TrainTestData(train = df.take(train_index), test = df.take(test_index)) for train_index, test_index in kf.split(df)]
+
+    def get_split_amount(self, nobs: int) -> int:
+        return self.folds
+
+@dataclass
+class RollingOriginSplit:
+    """
+    Splits the data of a country in expanding train windows of at least `min_train_length` years, each followed by a test window of `horizon` years.
+    The origin moves `step` years at a time, so no model is trained on data after its test period.
+    """
+    min_train_length: int = 30
+    horizon: int = 5
+    step: int = 1
+    expanding = True
+
+    def split(self, df: pd.DataFrame) -> list[TrainTestData]:
+        return [TrainTestData(train = df.iloc[:origin], test = df.iloc[origin:origin + self.horizon]) for origin in self.__origins(len(df))]
+
+    def get_split_amount(self, nobs: int) -> int:
+        return len(self.__origins(nobs))
+
+    def __origins(self, nobs: int) -> range:
+        return range(self.min_train_length, nobs - self.horizon + 1, self.step)
+
+@dataclass
+class VARStrategy(ABC):
+    """
+    Model selection strategy evaluated by VAREvaluation, results are written to `<export_name>_VAR dev status results.json` (`VAR dev status results.json` without name).
+    Subclasses implement `evaluate`, which scores every stationary fold it is given, a subclass without it cannot be created. The folds of expanding splits are passed in origin order per country.
+    """
+    export_name: str
+
+    def get_export_path(self) -> str:
+        return f"./{self.export_name}_VAR dev status results.json" if self.export_name is not None else "./VAR dev status results.json"
+
+    def get_config_name(self) -> str:
+        """Name of the strategy in the VARResultStore, empty for the unnamed strategy"""
+        return self.export_name if self.export_name is not None else ""
+
+    @abstractmethod
+    def evaluate(self, folds: list[PreparedFold], dependent_name: str, expanding: bool) -> list[VARPredictionResult]:
+        """Returns the VARPredictionResult of every fold in `folds`"""
+
+    def get_default_result(self) -> VARPredictionResult:
+        """Result recorded for folds that could not be made stationary"""
+        return VARPredictionResult(0, VARHyperParams("NA", -1))
+
+@dataclass
+class GridSearchStrategy(VARStrategy):
+    """Selects the lag (1..`maxlag`) and trend with the lowest test RMSE on every fold, see `VARParameterSelection`"""
+    maxlag: int = 8
+
+    def evaluate(self, folds: list[PreparedFold], dependent_name: str, expanding: bool) -> list[VARPredictionResult]:
+        if expanding:
+            lags = list(range(1, self.maxlag + 1))
+            pred_res = []
+            for fold, endog, states in VARRecursive.iter_fold_states(folds, lags):
+                candidates = [(lag, model_res.trend, VAROLS.forecast(model_res, endog[-self.maxlag:], len(fold.data.test)))
+                              for lag in lags for model_res in VARRecursive.fit_trends(states[lag], TRENDS)]
+                pred_res.append(VARParameterSelection.select_best_parameters(candidates, dependent_name, fold.data.train, fold.data.test, fold.stationary_res.itas, 1)[0][0])
+            return pred_res
+
+        if VARModel.get_engine() == VAREngine.NUMPY_BATCHED:
+            best_fit_res_list = VARParameterSelection.var_parameter_search_batch(
+                [VARModel.create_var_model(fold.stationary_res.df) for fold in folds],
+                dependent_name,
+                [fold.data.train for fold in folds],
+                [fold.stationary_res.df for fold in folds],
+                [fold.data.test for fold in folds],
+                [fold.stationary_res.itas for fold in folds],
+                self.maxlag,
+                max_queue_length=1)
+            return [best_fit_res[0][0] for best_fit_res in best_fit_res_list]
+
+        # Only the best result is used, so only its forecast dataframe is created
+        return [VARParameterSelection.var_parameter_search(VARModel.create_var_model(fold.stationary_res.df), dependent_name, fold.data.train, fold.stationary_res.df, fold.data.test, fold.stationary_res.itas, self.maxlag, max_queue_length=1)[0][0]
+                for fold in folds]
+
+@dataclass
+class FixedParamsStrategy(VARStrategy):
+    """Evaluates a VAR with the fixed `hyper_params` on every fold, e.g. a baseline model"""
+    hyper_params: VARHyperParams
+
+    def evaluate(self, folds: list[PreparedFold], dependent_name: str, expanding: bool) -> list[VARPredictionResult]:
+        lag, trend = self.hyper_params.lag, self.hyper_params.trend
+        if expanding:
+            rmses = []
+            for fold, endog, states in VARRecursive.iter_fold_states(folds, [lag]):
+                forecast = VAROLS.forecast(VARRecursive.fit_trends(states[lag], [trend])[0], endog[-lag:], len(fold.data.test))
+                rmses.append(VARModel.evaluate_forecast_batch(forecast[None], fold.data.train, fold.data.test, fold.stationary_res.itas, dependent_name)[1][0])
+        elif VARModel.get_engine() == VAREngine.NUMPY_BATCHED:
+            models = VARBatch.fit([VARModel.create_var_model(fold.stationary_res.df).endog for fold in folds], lag, trend)
+            forecasts = VARBatch.forecast(models, [fold.stationary_res.df.values[-lag:] for fold in folds], [len(fold.data.test) for fold in folds])
+            rmses = [VARModel.evaluate_forecast(forecast, fold.data.train, fold.data.test, fold.stationary_res.itas, dependent_name).rmse for forecast, fold in zip(forecasts, folds)]
+        else:
+            rmses = []
+            for fold in folds:
+                var_model = VARModel.create_var_model(fold.stationary_res.df)
+                rmses.append(VARModel.forecast_using_var_model(var_model=VARModel.fit_base_model(var_model, lag, trend),
+                                                               undiff_train_data=fold.data.train,
+                                                               undiff_test_data=fold.data.test,
+                                                               diff_train_df=fold.stationary_res.df,
+                                                               maxlag=lag,
+                                                               stationary_itas=fold.stationary_res.itas,
+                                                               dependent_name=dependent_name).rmse)
+        return [VARPredictionResult(rmse, VARHyperParams(trend, lag)) for rmse in rmses]
+
+    def get_default_result(self) -> VARPredictionResult:
+        return VARPredictionResult(0, VARHyperParams(self.hyper_params.trend, self.hyper_params.lag))
+
+class VAREvaluation:
+    """
+    Evaluation engine shared by every model selection strategy.
+    The data of every country is split and made stationary once, after which every strategy is evaluated on the same folds and aggregated into its own VARExportClass.
+    """
+    @VARProfiler.timed("prepare_folds")
+    def prepare_folds(countrycodes: list[str], panel: PWTPanel, splitter: KFoldSplit | RollingOriginSplit) -> list[PreparedFold]:
+        """Splits the data of every country with `splitter` and makes the training data of every split stationary"""
+        prepared_folds = []
+        for country_ita, countrycode in enumerate(countrycodes):
+            ctry_df = panel.get_country_df(countrycode)
+            for fold_ita, data in enumerate(splitter.split(ctry_df)):
+                prepared_folds.append(PreparedFold(country_ita, fold_ita, data, Stationary.make_dataframe_stationary(data.train.copy())))
+        return prepared_folds
+
+    def evaluate_countries(countrycodes: list[str], panel: PWTPanel, strategies: list[VARStrategy], splitter: KFoldSplit | RollingOriginSplit, dependent_name: str, plot_fold: int = None) -> list[list[CountryVARResult]]:
+        """
+        Returns per country of `countrycodes` a CountryVARResult per strategy, every strategy is evaluated on the stationary folds of all countries at once.
+        With `plot_fold` the forecast of every strategy on that (0 based) fold of every country is plotted.
+        """
+        prepared_folds = VAREvaluation.prepare_folds(countrycodes, panel, splitter)
+        stationary_folds = [fold for fold in prepared_folds if fold.stationary_res.fully_stationary]
+
+        fold_var_res_by_country = [[[] for _ in strategies] for _ in countrycodes]
+        for strategy_i, strategy in enumerate(strategies):
+            with VARProfiler.stage("evaluate_strategy"):
+                pred_res_iter = iter(strategy.evaluate(stationary_folds, dependent_name, splitter.expanding))
+            for fold in prepared_folds:
+                pred_res = next(pred_res_iter) if fold.stationary_res.fully_stationary else strategy.get_default_result()
+                if fold.fold_ita == plot_fold and fold.stationary_res.fully_stationary:
+                    VAREvaluation.plot_fold_forecast(fold, pred_res, countrycodes[fold.country_ita], dependent_name)
+                fold_var_res_by_country[fold.country_ita][strategy_i].append(FoldVARResults(
+                    fold.fold_ita,
+                    fold.stationary_res.fully_stationary,
+                    fold.stationary_res.itas,
+                    len(fold.data.train),
+                    len(fold.data.test),
+                    pred_res
+                ))
+        return [[VAREvaluation.create_country_var_res(fold_var_res) for fold_var_res in fold_var_res_by_strategy] for fold_var_res_by_strategy in fold_var_res_by_country]
+
+    def evaluate_and_store_countries(countrycodes: list[str], dev_status: str, panel: PWTPanel, strategies: list[VARStrategy], splitter: KFoldSplit | RollingOriginSplit, dependent_name: str, config_keys: list[str], plot_fold: int = None) -> list[list[CountryVARResult]]:
+        """`evaluate_countries` followed by storing the results in the VARCheckpoint, runs in the worker so results are stored as soon as a batch finishes"""
+        with VARProfiler.dev_status(dev_status):
+            countrys_res = VAREvaluation.evaluate_countries(countrycodes, panel, strategies, splitter, dependent_name, plot_fold)
+            with VARProfiler.stage("checkpoint_store"):
+                VARCheckpoint.store(dev_status, countrycodes, config_keys, countrys_res)
+        VARProfiler.flush()
+        return countrys_res
+
+    def plot_fold_forecast(fold: PreparedFold, pred_res: VARPredictionResult, countrycode: str, dependent_name: str) -> None:
+        """Refits the VAR with the hyper parameters of `pred_res` on a stationary fold and plots its forecast against the train and test data"""
+        lag, trend = pred_res.hyper_params.lag, pred_res.hyper_params.trend
+        var_model = VARModel.fit_base_model(VARModel.create_var_model(fold.stationary_res.df), lag, trend)
+        forecast_res = VARModel.forecast_using_var_model(var_model, fold.data.train, fold.data.test, fold.stationary_res.df, lag, fold.stationary_res.itas, dependent_name)
+        ExportVARResults.plot_country_results(
+            df_train=fold.data.train,
+            df_test=fold.data.test,
+            train_length=len(fold.data.train),
+            test_length=len(fold.data.test),
+            df_forecast=forecast_res.pred,
+            gdp=dependent_name,
+            rmse=forecast_res.rmse,
+            country_name=countrycode
+        )
+
+    def create_country_var_res(fold_var_res: list[FoldVARResults]) -> CountryVARResult:
+        """Summarizes the fold results of a single country (and strategy) into a CountryVARResult"""
+        fold_fully_stationary_list = [fr.is_fully_stationary for fr in fold_var_res]
+
+        stationary_fold_var_res = [fold_res for fold_res in fold_var_res if fold_res.is_fully_stationary]
+
+        fold_rmse_list = [fr.pred_res.rmse for fr in stationary_fold_var_res]
+        fold_stationary_itas_list= [fr.stationary_itas for fr in stationary_fold_var_res]
+        fold_train_length_list= [fr.train_length for fr in stationary_fold_var_res]
+        fold_test_length_list= [fr.test_length for fr in stationary_fold_var_res]
+
+        mean_rmse_folds = np.mean(fold_rmse_list)
+        mean_fully_stationary_folds = np.mean(fold_fully_stationary_list)
+        mean_stationary_itas_folds = np.mean(fold_stationary_itas_list)
+        mean_train_length_folds = np.mean(fold_train_length_list)
+        mean_test_length_folds = np.mean(fold_test_length_list)
+        mean_var_res = MeanVARResults(mean_rmse_folds, mean_stationary_itas_folds, mean_fully_stationary_folds, mean_train_length_folds, mean_test_length_folds)
+
+        return CountryVARResult(stationary_fold_var_res, mean_var_res)
+
+    def calculate_fold_var_res(country_var_res: list[CountryVARResult], folds: int) -> list[AggregatedFoldVARResults]:
+        """Aggregates the results of every fold over all countries: number of countries, mean RMSE and the most common hyper parameters"""
+        stats = VARAggregation.create(folds)
+        for country_ita, country_res in enumerate(country_var_res):
+            VARAggregation.add_country_res(stats, country_res, country_ita)
+        return VARAggregation.get_results(stats)
+
+    def get_var_res_by_dev_status(country_amount: int, dev_status: str, unique_countrycodes: list[str], panel: PWTPanel, strategies: list[VARStrategy], splitter: KFoldSplit | RollingOriginSplit, dependent_name: str, workers: int = 1, store_writer: ResultStoreWriter = None, plot_fold: int = None) -> list[DevStatusResult]:
+        """
+        Creates a DevStatusResult per strategy. Countries are evaluated in batches, one per worker, and aggregated per fold as the batches finish.
+        With a configured VARCheckpoint the results of every batch are stored as it finishes and stored (country, strategy) results are not evaluated again.
+        With `store_writer` the fold results of every country are also written to the VARResultStore.
+        With `plot_fold` the forecasts of that fold are plotted (see `evaluate_countries`), every country is then evaluated again in this process.
+        """
+        if plot_fold is not None and workers != 1:
+            print("Plotting country results is only supported with one worker, running sequentially")
+            workers = 1
+        folds = max((splitter.get_split_amount(len(panel.get_country_df(code))) for code in unique_countrycodes), default = 0)
+        stats_by_strategy = [VARAggregation.create(folds) for _ in strategies]
+        country_itas = {code: i for i, code in enumerate(unique_countrycodes)}
+        if store_writer is not None:
+            VARResultStore.add_dev_status(store_writer, dev_status, country_amount, folds)
+
+        # Stored results are only reused for the same variables, data and engine. Without checkpoint the keys only tell the strategies apart
+        if VARCheckpoint.is_enabled():
+            data_key = (sorted(panel.variables), panel.get_content_hash(), VARModel.get_engine().name)
+            config_keys = [VARCheckpoint.create_config_key(dependent_name, splitter, strategy, *data_key) for strategy in strategies]
+        else:
+            config_keys = [str(i) for i in range(len(strategies))]
+        # Stored results have no forecasts to plot
+        stored_res_by_key = VARCheckpoint.load(dev_status, unique_countrycodes, config_keys) if plot_fold is None else {}
+        if len(stored_res_by_key) > 0:
+            print(f"Resuming {dev_status}: {len(stored_res_by_key)} of {len(unique_countrycodes) * len(strategies)} country results already stored")
+        for (code, config_key), country_res in stored_res_by_key.items():
+            VARAggregation.add_country_res(stats_by_strategy[config_keys.index(config_key)], country_res, country_itas[code])
+        if store_writer is not None:
+            VARResultStore.write_country_results(store_writer, dev_status, [(country_itas[code], code, strategies[config_keys.index(config_key)].get_config_name(), country_res)
+                                                                            for (code, config_key), country_res in stored_res_by_key.items()])
+
+        # Countries missing the same strategies are evaluated together, on a fresh run that is every country with every strategy
+        pending_by_strategies = defaultdict(list)
+        for code in unique_countrycodes:
+            missing = tuple(i for i, config_key in enumerate(config_keys) if (code, config_key) not in stored_res_by_key)
+            if len(missing) > 0:
+                pending_by_strategies[missing].append(code)
+
+        max_batch_size = VARCheckpoint.batch_size if VARCheckpoint.is_enabled() else None
+        for strategy_ids, codes in pending_by_strategies.items():
+            pending_strategies = [strategies[i] for i in strategy_ids]
+            pending_keys = [config_keys[i] for i in strategy_ids]
+            for batch, countrys_res in VARParallel.imap_country_batches(VAREvaluation.evaluate_and_store_countries, codes, workers, dev_status, panel, pending_strategies, splitter, dependent_name, pending_keys, plot_fold, max_batch_size=max_batch_size):
+                for code, country_res_by_strategy in zip(batch, countrys_res):
+                    for strategy_i, country_res in zip(strategy_ids, country_res_by_strategy):
+                        VARAggregation.add_country_res(stats_by_strategy[strategy_i], country_res, country_itas[code])
+                if store_writer is not None:
+                    VARResultStore.write_country_results(store_writer, dev_status, [(country_itas[code], code, strategies[strategy_i].get_config_name(), country_res)
+                                                                                    for code, country_res_by_strategy in zip(batch, countrys_res)
+                                                                                    for strategy_i, country_res in zip(strategy_ids, country_res_by_strategy)])
+
+        return [DevStatusResult(dev_status, country_amount, VARAggregation.get_results(stats)) for stats in stats_by_strategy]
+
+    def VAR_pipeline(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], strategies: list[VARStrategy], splitter: KFoldSplit | RollingOriginSplit, export_json: bool, workers: int = 1, results_path: str = None, plot_fold: int = None) -> list[VARExportClass]:
+        """
+        Evaluates every strategy on the development status dataframes of `df_list`, the folds of every country are prepared once for all strategies.
+        Returns a VARExportClass per strategy, which is written to the export path of the strategy when `export_json` is set.
+        With `results_path` the fold results of every country and strategy are also written to a VARResultStore at that path.
+        With `plot_fold` the forecast of every strategy on that (0 based) fold of every country is plotted.
+        """
+        store_writer = VARResultStore.open(results_path, dependent_name, indep_names) if results_path is not None else None
+        dev_status_var_res_lists = [[] for _ in strategies]
+        completed = False
+        try:
+            for df in df_list:
+                dev_status = df["economy"][0]
+                df = df.drop(columns=["economy"])
+                unique_countrycodes = df["countrycode"].unique()
+                country_amt = len(unique_countrycodes)
+                with VARProfiler.dev_status(dev_status):
+                    panel = PWTPanel.create(df, dev_status)
+                    with VARProfiler.stage("dev_status_total"):
+                        dev_stat_var_res_by_strategy = VAREvaluation.get_var_res_by_dev_status(country_amt, dev_status, unique_countrycodes, panel, strategies, splitter, dependent_name, workers, store_writer, plot_fold)
+                for dev_status_var_res_list, dev_stat_var_res in zip(dev_status_var_res_lists, dev_stat_var_res_by_strategy):
+                    dev_status_var_res_list.append(dev_stat_var_res)
+            completed = True
+        finally:
+            # An interrupted run (an exception or Ctrl-C) leaves no temporary table behind and keeps the store of an earlier run
+            if store_writer is not None:
+                if completed:
+                    VARResultStore.close(store_writer)
+                else:
+                    VARResultStore.discard(store_writer)
+
+        export_results = [VARExportClass(dependent_name, indep_names, dev_status_var_res_list) for dev_status_var_res_list in dev_status_var_res_lists]
+        if export_json:
+            for strategy, export_res in zip(strategies, export_results):
+                ExportVARResults.save_json(asdict(export_res), strategy.get_export_path())
+        return export_results
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt 
 import json
+from VARProfiler import VARProfiler
 
 class ExportVARResults:
     def plot_country_results(df_train, df_test, train_length, test_length, df_forecast, gdp, rmse, country_name):  
@@ -33,6 +34,7 @@ class ExportVARResults:
         plt.title(title)
         #plt.show()
         plt.savefig(export_path, dpi=150)
+        plt.close(fig)
     
     def plot_dev_status_var_results(df) -> None:
         """TODO: Docstring"""
@@ -50,13 +52,18 @@ class ExportVARResults:
         #dev_status.pop(1)
         #rmse.pop(1)
 
-        ExportVARResults.plot_simple_bar(dev_status, rmse, "Development status", "Mean VAR RMSE", "Mean VAR RMSE by Development status")
-        ExportVARResults.plot_simple_bar(dev_status, country_amt, "Development status", "Country amount", "Country amount by Development status")
-        ExportVARResults.plot_simple_bar(dev_status, statonary_itas, "Development status", "Mean training differencing itas", "Mean differencing itas by Development status")
-        ExportVARResults.plot_simple_bar(dev_status, fully_stationary, "Development status", "% of training data stationary", "% of stationary training data by Development status")
-        ExportVARResults.plot_simple_bar(dev_status, train_length, "Development status", "Mean training length", "Mean training length by Development status")
-        ExportVARResults.plot_simple_bar(dev_status, test_length, "Development status", "Mean testing length", "Mean testing length by Development status")
+        bar_plots = [
+            (rmse, "Mean VAR RMSE", "Mean VAR RMSE by Development status"),
+            (country_amt, "Country amount", "Country amount by Development status"),
+            (statonary_itas, "Mean training differencing itas", "Mean differencing itas by Development status"),
+            (fully_stationary, "% of training data stationary", "% of stationary training data by Development status"),
+            (train_length, "Mean training length", "Mean training length by Development status"),
+            (test_length, "Mean testing length", "Mean testing length by Development status"),
+        ]
+        for y_data, y_label, title in bar_plots:
+            ExportVARResults.plot_simple_bar(dev_status, y_data, "Development status", y_label, title, f"./{title}.png")
 
+    @VARProfiler.timed("export_json")
     def save_json(obj: object, path: str) -> None:
         with open(path, "w") as f:
             json.dump(obj, f)
@@ -1,5 +1,7 @@
 from VARExportResults import ExportVARResults
 from VARDataClasses import VARExportClass
+from VARResultStore import VARResultStore
+from dataclasses import asdict
 import math
 
 class ResultByFoldDevStatus:
@@ -22,6 +24,11 @@ class ResultByFoldDevStatus:
                     res_obj["res"] = fold_res
                     return res_obj
     
+    def get_fold_by_dev_status(store_path: str, config: str, fold: int, dev_status: str) -> {}:
+        """`open_results_get_fold_by_dev_status` on a VARResultStore, only the rows of `config`, `dev_status` and `fold` are read"""
+        fold_res = VARResultStore.get_aggregated_fold(store_path, config, dev_status, fold - 1)
+        return {"development status": dev_status, "res": asdict(fold_res)}
+
     def plot_res_list(res_list: list, export_path: str) -> None:
         dev_status_list = [rs["development status"] for rs in res_list]
         rmse_list = [math.log10(rs["res"]["mean_rmse"] + 1 ) for rs in res_list]
@@ -37,10 +44,10 @@ if __name__ == "__main__":
     #res_list.append(ResultByFoldDevStatus.open_results_get_fold_by_dev_status(f"{debug_path}/Developed_VAR dev status results.json", fold,  "Developed region"))
     #res_list.append(ResultByFoldDevStatus.open_results_get_fold_by_dev_status(f"{debug_path}/Developing_VAR dev status results.json", fold,  "Developing region"))
 
-    res_list.append(ResultByFoldDevStatus.open_results_get_fold_by_dev_status("./Developing_VAR dev status results.json", fold,  "Developing region"))
-    res_list.append(ResultByFoldDevStatus.open_results_get_fold_by_dev_status("./Least developed_VAR dev status results.json", fold,  "Least developed region"))
-    res_list.append(ResultByFoldDevStatus.open_results_get_fold_by_dev_status("./Emerging_VAR dev status results.json", fold,  "Emerging region"))
-    res_list.append(ResultByFoldDevStatus.open_results_get_fold_by_dev_status("./Developed_VAR dev status results.json", fold,  "Developed region"))
+    res_list.append(ResultByFoldDevStatus.get_fold_by_dev_status("./VAR results.parquet", "Developing", fold,  "Developing region"))
+    res_list.append(ResultByFoldDevStatus.get_fold_by_dev_status("./VAR results.parquet", "Least developed", fold,  "Least developed region"))
+    res_list.append(ResultByFoldDevStatus.get_fold_by_dev_status("./VAR results.parquet", "Emerging", fold,  "Emerging region"))
+    res_list.append(ResultByFoldDevStatus.get_fold_by_dev_status("./VAR results.parquet", "Developed", fold,  "Developed region"))
     ResultByFoldDevStatus.plot_res_list(res_list, "./test_plot.png")
 
 
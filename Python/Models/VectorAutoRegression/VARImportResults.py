@@ -1,18 +1,26 @@
 from VARExportResults import ExportVARResults
 from VARDataClasses import VARExportClass
+from VARResultStore import VARResultStore
+from dataclasses import asdict
 import numpy as np
 import matplotlib.pyplot as plt
 import math
 
 class VARImportResults:
-    def load_and_plot_var_res(path: str, stat_to_plot: str, title: str, ylab: str, xlab_lambda, ylim:float, percentage:bool = False, log:bool = False):
-        res = ExportVARResults.load(path)
-        res = VARExportClass(**res)
-
-        filename = path.replace(".json", "")
+    def load_and_plot_var_res(path: str, stat_to_plot: str, title: str, ylab: str, xlab_lambda, ylim:float, percentage:bool = False, log:bool = False, config: str = None):
+        """Plots a results *.json* file, or the results of `config` when `path` is a VARResultStore *.parquet* file"""
+        res, filename = VARImportResults.load_var_res(path, config)
 
         VARImportResults.plot(res, stat_to_plot, title, ylab, xlab_lambda, ylim, percentage, filename, log)
     
+    def load_var_res(path: str, config: str = None) -> tuple[VARExportClass, str]:
+        """Returns the results of a *.json* file (or of `config` in a *.parquet* VARResultStore) and the file name plots of it are saved under"""
+        if path.endswith(".parquet"):
+            return VARExportClass(**asdict(VARResultStore.load_export(path, config))), f"{path.replace('.parquet', '')}_{config}"
+
+        res = ExportVARResults.load(path)
+        return VARExportClass(**res), path.replace(".json", "")
+
     def create_results_per_fold(folds: list, obj: VARExportClass, stat_to_plot: str, percentage: bool) -> {}:
         total_fold_res = {}
         for fold_i in range(len(folds)):
@@ -34,6 +42,15 @@ class VARImportResults:
         return total_fold_res
 
     def plot(obj: VARExportClass, stat_to_plot: str, title: str, ylab: str, xlab_lambda, ylim:float, percentage:bool, filename: str, log:bool):
+        fig, ax = plt.subplots(layout='constrained', figsize=(10,6))
+        VARImportResults.draw(ax, obj, stat_to_plot, title, ylab, xlab_lambda, ylim, percentage, log)
+        #plt.show()
+
+        plt.savefig(VARImportResults.get_export_path(filename, stat_to_plot, percentage), dpi=150)
+        plt.close(fig)
+
+    def draw(ax, obj: VARExportClass, stat_to_plot: str, title: str, ylab: str, xlab_lambda, ylim:float, percentage:bool, log:bool):
+        """Draws the bar chart of `stat_to_plot` per fold and development status on the matplotlib axes `ax`"""
         folds = [i for i in range(len(obj.dev_status_results[0]["fold_results"]))]
         dev_statuses = [xlab_lambda(ds) for ds in obj.dev_status_results]
 
@@ -43,8 +60,6 @@ class VARImportResults:
         width = 0.20  # the width of the bars
         multiplier = 0
 
-        fig, ax = plt.subplots(layout='constrained', figsize=(10,6))
-
         for attribute, measurement in total_fold_res.items():
             offset = width * multiplier
             if log:
@@ -66,60 +81,30 @@ class VARImportResults:
         ax.set_xticks(x + width, dev_statuses)
         ax.legend(loc='upper left', ncols=1)
         ax.set_ylim(0, ylim)
-        #plt.show()
 
+    def get_export_path(filename: str, stat_to_plot: str, percentage: bool) -> str:
         if percentage:
-            export_path = f"{filename} + {stat_to_plot}_percentage.png"
+            return f"{filename} + {stat_to_plot}_percentage.png"
         else:
-            export_path = f"{filename} + {stat_to_plot}.png"
-            
-        plt.savefig(export_path, dpi=150)
+            return f"{filename} + {stat_to_plot}.png"
 
 if __name__ == "__main__":
+    from VARReportRenderer import VARReportRenderer, PlotSpec
     log:bool = True
     percentage:bool = True
+    country_amount_label = "{development_status}\n(total country amount: {country_amount})"
 
-    ## Parameter tuning results export
-    # Mean RMSE per fold
-    VARImportResults.load_and_plot_var_res(
-        path="./VAR dev status results.json",
-        stat_to_plot="mean_rmse",
-        title='VAR RMSE by fold per development status',
-        ylab="RMSE",
-        xlab_lambda=lambda x: x["development_status"], 
-        ylim=0.2,
-        log=log
-    )
-    # Country amounts per fold 
-    VARImportResults.load_and_plot_var_res(
-        path="./VAR dev status results.json",
-        stat_to_plot="data_amount",
-        title='% VAR country amount by fold per development status',
-        ylab="% Data amount",
-        xlab_lambda=lambda x: f"{x['development_status']}\n(total country amount: {x['country_amount']})",
-        ylim=100,
-        percentage=percentage,
-    )
-
-    ## Baseline model results export
-    # Mean RMSE per fold
-    VARImportResults.load_and_plot_var_res(
-        path="./Baseline_VAR dev status results.json",
-        stat_to_plot="mean_rmse",
-        title='VAR RMSE by fold per development status',
-        ylab="RMSE",
-        xlab_lambda=lambda x: x["development_status"],
-        ylim=3,
-        log=log
-    )
-    
-    # Country amounts per fold 
-    VARImportResults.load_and_plot_var_res(
-        path="./Baseline_VAR dev status results.json",
-        stat_to_plot="data_amount",
-        title='VAR country amount by fold per development status',
-        ylab="Data amount",
-        xlab_lambda=lambda x: f"{x['development_status']}\n(total country amount: {x['country_amount']})",
-        ylim=100,
-        percentage=percentage,
-    )
\ No newline at end of file
+    # Every results file is loaded once, the plots are rendered in parallel on every core
+    VARReportRenderer.render([
+        ## Parameter tuning results export
+        # Mean RMSE per fold
+        PlotSpec("./VAR dev status results.json", "mean_rmse", 'VAR RMSE by fold per development status', "RMSE", "{development_status}", 0.2, log=log),
+        # Country amounts per fold
+        PlotSpec("./VAR dev status results.json", "data_amount", '% VAR country amount by fold per development status', "% Data amount", country_amount_label, 100, percentage=percentage),
+
+        ## Baseline model results export
+        # Mean RMSE per fold
+        PlotSpec("./Baseline_VAR dev status results.json", "mean_rmse", 'VAR RMSE by fold per development status', "RMSE", "{development_status}", 3, log=log),
+        # Country amounts per fold
+        PlotSpec("./Baseline_VAR dev status results.json", "data_amount", 'VAR country amount by fold per development status', "Data amount", country_amount_label, 100, percentage=percentage),
+    ])
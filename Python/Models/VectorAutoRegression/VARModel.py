@@ -1,50 +1,98 @@
+import os
 import pandas as pd
+import numpy as np
+from enum import Enum
 from statsmodels.tsa.api import VAR
-from sklearn.metrics import mean_squared_error
+from scipy.special import comb
 from dataclasses import dataclass
 from VARDataClasses import VARHyperParams
+from VAROLS import VAROLS, VAROLSModel, VAROLSResult
+from VARProfiler import VARProfiler
+
+ENGINE_ENV = "VAR_ENGINE"
 
 @dataclass
 class ForecastResult:
     rmse: float
     pred: pd.DataFrame
 
+class VAREngine(Enum):
+    STATSMODELS = 1
+    NUMPY = 2
+    NUMPY_BATCHED = 3
+
 class VARModel:
     @staticmethod
-    def create_var_model(train_df):
+    def configure_engine(engine: VAREngine) -> None:
+        """
+        Sets the engine `create_var_model` uses for this run. STATSMODELS (the default) uses statsmodels `VAR`, NUMPY estimates and forecasts with VAROLS on raw arrays.
+        NUMPY_BATCHED makes the tuning pipelines fit the folds of all countries of a development status together with VARBatch.
+        """
+        os.environ[ENGINE_ENV] = engine.name
+
+    @staticmethod
+    def get_engine() -> VAREngine:
+        return VAREngine[os.environ.get(ENGINE_ENV, VAREngine.STATSMODELS.name)]
+
+    @staticmethod
+    def create_var_model(train_df, engine: VAREngine = None):
+        """Creates an unfitted VAR model on `train_df` using `engine`, None uses the configured engine"""
+        if (engine or VARModel.get_engine()) in (VAREngine.NUMPY, VAREngine.NUMPY_BATCHED):
+            return VAROLSModel(train_df.to_numpy(dtype=np.float64))
         return VAR(train_df, freq = train_df.index.inferred_freq)
 
     @staticmethod
     def fit_var_model(model: VAR, var_params: VARHyperParams):
-        return model.fit(
-            maxlags = var_params.lag,
-            method  = 'ols',
-            ic      = None,
-            trend   = var_params.trend
-        )
+        return VARModel.fit_base_model(model, var_params.lag, var_params.trend)
     
     @staticmethod
     def fit_base_model(model: VAR, lag:int, trend_yeet:str):
-        return model.fit(
-            maxlags=lag,
-            method='ols',
-            ic=None,
-            trend=trend_yeet
-        )
+        if isinstance(model, VAROLSModel):
+            return VAROLS.fit(model, lag, trend_yeet)
+        with VARProfiler.stage("var_fit"):
+            return model.fit(
+                maxlags=lag,
+                method='ols',
+                ic=None,
+                trend=trend_yeet
+            )
 
     @staticmethod
-    def diff_inv(forecast_diff, original, passes):
-        df_temp = forecast_diff.copy()
-
-        for i in range(passes, 0, -1):
-            df_orig = original.iloc[-1]
+    def forecast(var_model, y: np.ndarray, steps: int) -> np.ndarray:
+        """Forecasts `steps` ahead from the prior observations `y` with a model fitted by either engine"""
+        if isinstance(var_model, VAROLSResult):
+            return VAROLS.forecast(var_model, y, steps)
+        with VARProfiler.stage("forecast"):
+            return var_model.forecast(y, steps = steps)
 
-            for j in range(2, i + 1):
-                df_orig = df_orig - original.iloc[-j]
+    @staticmethod
+    def diff_inv(forecast_diff, original, passes):
+        df_forecast = VARModel.diff_inv_batch(forecast_diff.to_numpy(dtype=np.float64), original.to_numpy(dtype=np.float64), passes)
+        return pd.DataFrame(df_forecast, index = forecast_diff.index, columns = forecast_diff.columns)
 
-            df_temp = df_orig + df_temp.cumsum()
+    @staticmethod
+    @VARProfiler.timed("inverse_diff")
+    def diff_inv_batch(forecasts_diff: np.ndarray, original: np.ndarray, passes: int) -> np.ndarray:
+        """
+        Vectorized `diff_inv` for a stack of forecasts (... x steps x variables), e.g. every candidate of a parameter search at once.
+        Every pass adds an initial condition c_i = x[-1] - x[-2] - ... - x[-i] of `original` to the cumulative sum of the previous pass.
+        In closed form the forecast is summed `passes` times and c_i contributes binom(h + i - 2, i - 1) at step h, which is the same for every forecast.
+        """
+        steps = forecasts_diff.shape[-2]
+        level = forecasts_diff
+        for _ in range(passes):
+            level = np.cumsum(level, axis=-2)
+        return level + VARModel.__diff_inv_offsets(original, passes, steps)
 
-        return df_temp
+    @staticmethod
+    def __diff_inv_offsets(original: np.ndarray, passes: int, steps: int) -> np.ndarray:
+        """Returns the (steps x variables) contribution of the initial conditions of all passes"""
+        if passes == 0:
+            return np.zeros((steps, original.shape[1]))
+        initial = original[-1] - np.concatenate([np.zeros((1, original.shape[1])), np.cumsum(original[-2:-passes - 1:-1], axis=0)])
+        step = np.arange(1, steps + 1)[:, None]
+        order = np.arange(passes)[None, :]
+        return comb(step + order - 1, order) @ initial
 
     @staticmethod
     def forecast_using_var_model(var_model,
@@ -56,10 +104,31 @@ class VARModel:
                                  dependent_name) -> ForecastResult:
 
         data_test_len = len(undiff_test_data)
-        forecast = var_model.forecast(diff_train_df.values[-maxlag:], steps = data_test_len)
-        df_forecast_diff = pd.DataFrame(forecast, columns = undiff_train_data.columns, index = undiff_test_data.iloc[:data_test_len].index)
-        # Reverse the differencing
+        forecast = VARModel.forecast(var_model, diff_train_df.values[-maxlag:], data_test_len)
+        return VARModel.evaluate_forecast(forecast, undiff_train_data, undiff_test_data, stationary_itas, dependent_name)
 
-        df_forecast = VARModel.diff_inv(df_forecast_diff, undiff_train_data, stationary_itas)
-        return ForecastResult(mean_squared_error(df_forecast[dependent_name], undiff_test_data[dependent_name].values[:data_test_len], squared = False),
-                              df_forecast)
+    @staticmethod
+    def evaluate_forecast(forecast: np.ndarray,
+                          undiff_train_data: pd.DataFrame,
+                          undiff_test_data: pd.DataFrame,
+                          stationary_itas: int,
+                          dependent_name) -> ForecastResult:
+        """Reverses the differencing of a (steps x variables) forecast of the differenced data and scores it on the test data"""
+        forecasts, rmses = VARModel.evaluate_forecast_batch(forecast[None], undiff_train_data, undiff_test_data, stationary_itas, dependent_name)
+        df_forecast = pd.DataFrame(forecasts[0], columns = undiff_train_data.columns, index = undiff_test_data.index)
+        return ForecastResult(rmses[0], df_forecast)
+
+    @staticmethod
+    def evaluate_forecast_batch(forecasts: np.ndarray,
+                                undiff_train_data: pd.DataFrame,
+                                undiff_test_data: pd.DataFrame,
+                                stationary_itas: int,
+                                dependent_name) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reverses the differencing of a stack of (candidates x steps x variables) forecasts at once and scores them on the test data.
+        Returns the undifferenced forecasts and the RMSE of `dependent_name` per candidate.
+        """
+        undiff_forecasts = VARModel.diff_inv_batch(forecasts, undiff_train_data.to_numpy(dtype=np.float64), stationary_itas)
+        dependent_i = undiff_train_data.columns.get_loc(dependent_name)
+        errors = undiff_forecasts[:, :, dependent_i] - undiff_test_data[dependent_name].to_numpy(dtype=np.float64)
+        return undiff_forecasts, np.sqrt(np.mean(errors ** 2, axis=1))
@@ -1,89 +1,33 @@
 # This makes sure Pandas keeps it mouth shut
 import warnings
 warnings.simplefilter(action = 'ignore', category = FutureWarning)
+import os
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.api import VAR
-from sklearn.model_selection import KFold
-from VARDataClasses import VARPredictionResult, FoldVARResults, MeanVARResults, TrainTestData, AggregatedFoldVARResults, VARHyperParams, DevStatusResult, CountryVARResult, VARExportClass
+from VARDataClasses import FoldVARResults, MeanVARResults, TrainTestData, AggregatedFoldVARResults, VARHyperParams, DevStatusResult, CountryVARResult, VARExportClass, BaseModelConfig
 from dataclasses import asdict
 from PWTDevStatus import PWTDevStatusGenerator, DevStatusLevel
-from StationaryFunctions import Stationary
+from StationaryCache import StationaryCache
+from VARCheckpoint import VARCheckpoint
 from VARExportResults import ExportVARResults
-from VARParameterSelection import VARParameterSelection
-from VARModel import VARModel
+from VARModel import VARModel, VAREngine
+from PWTPanel import PWTPanel
+from VAREvaluation import VAREvaluation, KFoldSplit, GridSearchStrategy, FixedParamsStrategy
+from VARProfiler import VARProfiler
+
+def warn_export_csv(export_csv: bool) -> None:
+    if export_csv:
+        warnings.warn("export_csv is deprecated and ignored, the results are exported as JSON", DeprecationWarning, stacklevel=3)
 
 class VARModelTuning:
     """Contains functionality to tune and compare different VAR countries using hyper parameter selection on development status, country, and fold basis"""
     def create_train_test_data(df: pd.DataFrame, folds: int)-> list[TrainTestData]: 
         """Takes data and splits it up in `folds` folds for training and testing sets"""
-        kf = KFold(n_splits=folds, random_state=None, shuffle= False)
-        train_test_list = [] 
-        for (train_index, test_index) in kf.split(df):
-            train_test_list.append(TrainTestData(
-                        train = df.take(train_index),
-                        test = df.take(test_index)))
-        return train_test_list
-
-    def get_fold_var_res(data: TrainTestData, maxlag: int, countrycode: str, dependent_name: str, fold_ita: int, plot_res: bool) -> FoldVARResults:
-        """Using a train test split `data` creates a VAR model and calculates FoldVARResults"""
-
-        df_train_copy = data.train.copy()
-        df_train_stationary_res = Stationary.make_dataframe_stationary(df_train_copy)
-        best_fit_pred_res = VARPredictionResult(0, VARHyperParams("NA", -1))
-
-        if df_train_stationary_res.fully_stationary:
-            df_train_diff = df_train_stationary_res.df
-            var_model = VAR(df_train_diff, freq = df_train_diff.index.inferred_freq) 
-            #TODO: Call var_param_search with queue length of one, maybe even deprecate ability to get bigger result if not necessary
-            best_fit_res = VARParameterSelection.var_parameter_search(var_model, dependent_name, data.train, df_train_diff, data.test, df_train_stationary_res.itas, maxlag)[0]
-            best_fit_pred_res = best_fit_res[0]
-
-            if plot_res and fold_ita == 4:#dev_status in["Developing region"]: #["Developed region"]:
-                ExportVARResults.plot_country_results(
-                    df_train=data.train, 
-                    df_test=data.test,
-                    train_length=len(data.train),
-                    test_length=len(data.test),
-                    df_forecast=best_fit_res[1],
-                    gdp=dependent_name,
-                    rmse=best_fit_pred_res.rmse,
-                    country_name=countrycode
-                )
-
-        return FoldVARResults(
-            fold_ita,
-            df_train_stationary_res.fully_stationary, 
-            df_train_stationary_res.itas, 
-            len(data.train), 
-            len(data.test),
-            best_fit_pred_res
-        )
-
-    def get_var_res_by_country(ctry_df: pd.DataFrame, maxlag: int, countrycode: str, dependent_name: str, plot_res: bool, folds: int) -> CountryVARResult:
-        """TODO: Docstring Using KFold cross validation"""
-
-        train_test_data = VARModelTuning.create_train_test_data(ctry_df, folds)
-
-        fold_var_res = [VARModelTuning.get_fold_var_res(data, maxlag, countrycode, dependent_name, i, plot_res) for i, data in enumerate(train_test_data)]
-
-        fold_fully_stationary_list = [fr.is_fully_stationary for fr in fold_var_res]
-
-        stationary_fold_var_res = [fold_res for fold_res in fold_var_res if fold_res.is_fully_stationary]
-
-        fold_rmse_list = [fr.pred_res.rmse for fr in stationary_fold_var_res]
-        fold_stationary_itas_list= [fr.stationary_itas for fr in stationary_fold_var_res]
-        fold_train_length_list= [fr.train_length for fr in stationary_fold_var_res]
-        fold_test_length_list= [fr.test_length for fr in stationary_fold_var_res]
-
-        mean_rmse_folds = np.mean(fold_rmse_list)
-        mean_fully_stationary_folds = np.mean(fold_fully_stationary_list)
-        mean_stationary_itas_folds = np.mean(fold_stationary_itas_list)
-        mean_train_length_folds = np.mean(fold_train_length_list)
-        mean_test_length_folds = np.mean(fold_test_length_list)
-        mean_var_res = MeanVARResults(mean_rmse_folds, mean_stationary_itas_folds, mean_fully_stationary_folds, mean_train_length_folds, mean_test_length_folds)
+        return KFoldSplit(folds).split(df)
 
-        return CountryVARResult(stationary_fold_var_res, mean_var_res) 
+    def create_country_var_res(fold_var_res: list[FoldVARResults]) -> CountryVARResult:
+        """Summarizes the fold results of a single country into a CountryVARResult"""
+        return VAREvaluation.create_country_var_res(fold_var_res)
 
     def calc_mean_from_country_var_res(country_var_res: CountryVARResult) -> MeanVARResults:
         """TODO: Docstring"""
@@ -102,166 +46,44 @@ class VARModelTuning:
         return MeanVARResults(mean_rmse, mean_stationary_itas, mean_fully_stationary, mean_train_length, mean_test_length)
 
     def calculate_fold_var_res(country_var_res: CountryVARResult, folds: int) -> AggregatedFoldVARResults:
-        """TODO: Docstring"""
-        res_by_fold = []
-        for fold in range(folds):
-            fold_amt = 0
-            fold_lags = []
-            fold_trends = []
-            fold_rmses = []
-            for cr in country_var_res: 
-                for fold_res in cr.folds_res:
-                    if fold_res.fold_ita == fold:
-                        fold_amt += 1
-                        fold_lags.append(fold_res.pred_res.hyper_params.lag)
-                        fold_trends.append(fold_res.pred_res.hyper_params.trend)
-                        fold_rmses.append(fold_res.pred_res.rmse)
-
-            mode_trend = max(fold_trends, key = fold_trends.count) if len(fold_trends) > 0 else "No data"
-            mode_lag = max(fold_lags, key = fold_lags.count) if len(fold_lags) > 0 else "No data"
-            mean_rmse = np.mean(fold_rmses) if len(fold_rmses) > 0 else "No data"
-
-            res_by_fold.append(
-                AggregatedFoldVARResults(
-                    (fold + 1),
-                    fold_amt,
-                    mean_rmse,
-                    VARHyperParams(
-                        mode_trend,
-                        mode_lag
-                    )
-                )
-            )
-        return res_by_fold
-
-    def extract_country_and_generate_var_res(countrycode: str, df: pd.DataFrame, maxlag: int, dependent_name: str, plot_res: bool, folds: int) -> CountryVARResult:
-        """Given a countrycode, dataframe containing multiple country data and var parameters creates CountryVARResult"""
-        ctry_df = df.loc[df['countrycode'] == countrycode]
-        ctry_df = ctry_df.drop(columns=["countrycode"])
+        """Aggregates the results of every fold over all countries"""
+        return VAREvaluation.calculate_fold_var_res(country_var_res, folds)
 
-        var_res_by_country = VARModelTuning.get_var_res_by_country(ctry_df, maxlag, countrycode, dependent_name, plot_res, folds)
-        return var_res_by_country
-
-    def get_var_res_by_dev_status(country_amount: int, dev_status: str, unique_countrycodes: list[str], df: pd.DataFrame, maxlag: int, dependent_name: str, plot_res: bool) -> DevStatusResult:
-        """TODO: Docstring"""
+    def get_var_res_by_dev_status(country_amount: int, dev_status: str, unique_countrycodes: list[str], panel: PWTPanel, maxlag: int, dependent_name: str, plot_res: bool, workers: int = 1) -> DevStatusResult:
+        """Creates the DevStatusResult of the parameter search (lag 1..`maxlag`, every trend) on 4 folds of every country, evaluated in `workers` processes"""
         folds = 4
-        countrys_res = [VARModelTuning.extract_country_and_generate_var_res(code, df, maxlag, dependent_name, plot_res, folds) for code in unique_countrycodes]
-
-        res_by_fold = VARModelTuning.calculate_fold_var_res(countrys_res, folds)
-        
-        return DevStatusResult(dev_status, country_amount, res_by_fold) 
+        # With `plot_res` the forecasts of the last fold (fold 4 in the results) are plotted
+        plot_fold = folds - 1 if plot_res else None
+        return VAREvaluation.get_var_res_by_dev_status(country_amount, dev_status, unique_countrycodes, panel, [GridSearchStrategy(None, maxlag)], KFoldSplit(folds), dependent_name, workers, plot_fold=plot_fold)[0]
 
-    def VAR_pipeline(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], plot_res: bool, export_csv: bool, export_json: bool) -> None:
-        """TODO: Docstring"""
+    def VAR_pipeline(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], plot_res: bool, export_csv: bool, export_json: bool, workers: int = 1) -> None:
+        """`export_csv` is deprecated and ignored, the development status summary it wrote was never filled. The results are in the JSON export"""
+        warn_export_csv(export_csv)
         maxlag = 8
-        res_df: pd.DataFrame = pd.DataFrame(columns = ['Development status', "Country amount", 'Mean RMSE', "Mean stationary itas", "Mean fully stationary", "Mean train length", "Mean test length"]) 
         dev_status_var_res_list = []
         for df in df_list:
             dev_status = df["economy"][0]
             df = df.drop(columns=["economy"])
             unique_countrycodes = df["countrycode"].unique()
             country_amt = len(unique_countrycodes)
+            panel = PWTPanel.create(df, dev_status)
             
-            dev_stat_var_res = VARModelTuning.get_var_res_by_dev_status(country_amt, dev_status, unique_countrycodes, df, maxlag, dependent_name, plot_res)
+            with VARProfiler.dev_status(dev_status), VARProfiler.stage("dev_status_total"):
+                dev_stat_var_res = VARModelTuning.get_var_res_by_dev_status(country_amt, dev_status, unique_countrycodes, panel, maxlag, dependent_name, plot_res, workers)
             dev_status_var_res_list.append(dev_stat_var_res)
 
-            #res_df = pd.concat([res_df, pd.DataFrame([
-            #    {
-            #        "Development status" : dev_status, 
-            #        "Country amount": country_amt, 
-            #        "Mean RMSE": dev_stat_var_res.mean_var_results.mean_rmse,
-            #        "Mean stationary itas" : dev_stat_var_res.mean_var_results.mean_stationary_itas,
-            #        "Mean fully stationary": dev_stat_var_res.mean_var_results.mean_fully_stationary,
-            #        "Mean train length" : dev_stat_var_res.mean_var_results.mean_train_length,
-            #        "Mean test length" : dev_stat_var_res.mean_var_results.mean_test_length
-            #        }])], ignore_index=True)
-
         if export_json:
             ExportVARResults.save_json(asdict(VARExportClass(dependent_name, indep_names, dev_status_var_res_list)), "./VAR dev status results.json")
 
-        if plot_res:
-            ExportVARResults.plot_dev_status_var_results(res_df)
-        
-        if export_csv:
-            res_df.to_csv("./VAR dev status results.csv", index=False)
-
 class BaseModelTuning:
     """Contains functionality to tune and compare different VAR countries using hyper parameter selection on development status, country, and fold basis"""
     def create_train_test_data(df: pd.DataFrame, folds: int)-> list[TrainTestData]: 
         """Takes data and splits it up in `folds` folds for training and testing sets"""
-        kf = KFold(n_splits=folds, random_state=None, shuffle= False)
-        train_test_list = [] 
-        for (train_index, test_index) in kf.split(df):
-            train_test_list.append(TrainTestData(
-                        train = df.take(train_index),
-                        test = df.take(test_index)))
-        return train_test_list
-
-    def get_fold_var_res(data: TrainTestData, maxlag: int, trend: str, countrycode: str, dependent_name: str, fold_ita: int, plot_res: bool) -> FoldVARResults:
-        """Using a train test split `data` creates a VAR model and calculates FoldVARResults"""
-
-        df_train_copy = data.train.copy()
-        df_train_stationary_res = Stationary.make_dataframe_stationary(df_train_copy)
-        baseline_res = VARPredictionResult(0, VARHyperParams("NA", -1))
-
-        if df_train_stationary_res.fully_stationary:
-            df_train_diff = df_train_stationary_res.df
-            var_model = VAR(df_train_diff, freq = df_train_diff.index.inferred_freq) 
-            #TODO: Call var_param_search with queue length of one, maybe even deprecate ability to get bigger result if not necessary
-            baseline_model = VARModel.fit_base_model(var_model, maxlag, trend)
-            baseline_res = VARModel.forecast_using_var_model(var_model=baseline_model,
-                                              undiff_train_data=data.train,
-                                              undiff_test_data=data.test,
-                                              diff_train_df=df_train_diff,
-                                              maxlag=maxlag,
-                                              stationary_itas=df_train_stationary_res.itas,
-                                              dependent_name=dependent_name)
+        return KFoldSplit(folds).split(df)
 
-            if plot_res and fold_ita == 4:
-                ExportVARResults.plot_country_results(
-                    df_train=data.train, 
-                    df_test=data.test,
-                    train_length=len(data.train),
-                    test_length=len(data.test),
-                    df_forecast=baseline_res.pred,
-                    gdp=dependent_name,
-                    rmse=baseline_res.rmse,
-                    country_name=countrycode
-                )
-
-        return FoldVARResults(
-            fold_ita,
-            df_train_stationary_res.fully_stationary, 
-            df_train_stationary_res.itas, 
-            len(data.train), 
-            len(data.test),
-            VARPredictionResult(baseline_res.rmse, VARHyperParams(trend, maxlag))
-        )
-
-    def get_var_res_by_country(ctry_df: pd.DataFrame, maxlag: int, trend: str, countrycode: str, dependent_name: str, plot_res: bool, folds: int) -> CountryVARResult:
-        """TODO: Docstring Using KFold cross validation"""
-
-        train_test_data = BaseModelTuning.create_train_test_data(ctry_df, folds)
-
-        fold_var_res = [BaseModelTuning.get_fold_var_res(data, maxlag, trend, countrycode, dependent_name, i, plot_res) for i, data in enumerate(train_test_data)]
-
-        fold_fully_stationary_list = [fr.is_fully_stationary for fr in fold_var_res]
-
-        stationary_fold_var_res = [fold_res for fold_res in fold_var_res if fold_res.is_fully_stationary]
-
-        fold_rmse_list = [fr.pred_res.rmse for fr in stationary_fold_var_res]
-        fold_stationary_itas_list= [fr.stationary_itas for fr in stationary_fold_var_res]
-        fold_train_length_list= [fr.train_length for fr in stationary_fold_var_res]
-        fold_test_length_list= [fr.test_length for fr in stationary_fold_var_res]
-
-        mean_rmse_folds = np.mean(fold_rmse_list)
-        mean_fully_stationary_folds = np.mean(fold_fully_stationary_list)
-        mean_stationary_itas_folds = np.mean(fold_stationary_itas_list)
-        mean_train_length_folds = np.mean(fold_train_length_list)
-        mean_test_length_folds = np.mean(fold_test_length_list)
-        mean_var_res = MeanVARResults(mean_rmse_folds, mean_stationary_itas_folds, mean_fully_stationary_folds, mean_train_length_folds, mean_test_length_folds)
-
-        return CountryVARResult(stationary_fold_var_res, mean_var_res) 
+    def create_country_var_res(fold_var_res: list[FoldVARResults]) -> CountryVARResult:
+        """Summarizes the fold results of a single country (and config) into a CountryVARResult"""
+        return VAREvaluation.create_country_var_res(fold_var_res)
 
     def calc_mean_from_country_var_res(country_var_res: CountryVARResult) -> MeanVARResults:
         """TODO: Docstring"""
@@ -280,131 +102,80 @@ class BaseModelTuning:
         return MeanVARResults(mean_rmse, mean_stationary_itas, mean_fully_stationary, mean_train_length, mean_test_length)
 
     def calculate_fold_var_res(country_var_res: CountryVARResult, folds: int) -> AggregatedFoldVARResults:
-        """TODO: Docstring"""
-        res_by_fold = []
-        for fold in range(folds):
-            fold_amt = 0
-            fold_lags = []
-            fold_trends = []
-            fold_rmses = []
-            for cr in country_var_res: 
-                for fold_res in cr.folds_res:
-                    if fold_res.fold_ita == fold:
-                        fold_amt += 1
-                        fold_lags.append(fold_res.pred_res.hyper_params.lag)
-                        fold_trends.append(fold_res.pred_res.hyper_params.trend)
-                        fold_rmses.append(fold_res.pred_res.rmse)
-
-            mode_trend = max(fold_trends, key = fold_trends.count) if len(fold_trends) > 0 else "No data"
-            mode_lag = max(fold_lags, key = fold_lags.count) if len(fold_lags) > 0 else "No data"
-            mean_rmse = np.mean(fold_rmses) if len(fold_rmses) > 0 else "No data"
-
-            res_by_fold.append(
-                AggregatedFoldVARResults(
-                    (fold + 1),
-                    fold_amt,
-                    mean_rmse,
-                    VARHyperParams(
-                        mode_trend,
-                        mode_lag
-                    )
-                )
-            )
-        return res_by_fold
-
-    def extract_country_and_generate_var_res(countrycode: str, df: pd.DataFrame, maxlag: int, trend: str, dependent_name: str, plot_res: bool, folds: int) -> CountryVARResult:
-        """Given a countrycode, dataframe containing multiple country data and var parameters creates CountryVARResult"""
-        ctry_df = df.loc[df['countrycode'] == countrycode]
-        ctry_df = ctry_df.drop(columns=["countrycode"])
+        """Aggregates the results of every fold over all countries"""
+        return VAREvaluation.calculate_fold_var_res(country_var_res, folds)
 
-        var_res_by_country = BaseModelTuning.get_var_res_by_country(ctry_df, maxlag, trend, countrycode, dependent_name, plot_res, folds)
-        return var_res_by_country
+    def get_var_res_by_dev_status(country_amount: int, dev_status: str, unique_countrycodes: list[str], panel: PWTPanel, maxlag: int, trend: str, dependent_name: str, plot_res: bool, workers: int = 1) -> DevStatusResult:
+        """Creates the DevStatusResult of a VAR with the fixed `maxlag` and `trend` on 4 folds of every country, evaluated in `workers` processes"""
+        config = BaseModelConfig(None, VARHyperParams(trend, maxlag))
+        return BaseModelTuning.get_var_res_by_dev_status_by_config(country_amount, dev_status, unique_countrycodes, panel, [config], dependent_name, plot_res, workers)[0]
 
-    def get_var_res_by_dev_status(country_amount: int, dev_status: str, unique_countrycodes: list[str], df: pd.DataFrame, maxlag: int, trend: str, dependent_name: str, plot_res: bool) -> DevStatusResult:
-        """TODO: Docstring"""
+    def get_var_res_by_dev_status_by_config(country_amount: int, dev_status: str, unique_countrycodes: list[str], panel: PWTPanel, configs: list[BaseModelConfig], dependent_name: str, plot_res: bool, workers: int = 1) -> list[DevStatusResult]:
+        """Creates a DevStatusResult for every config, the folds of every country are prepared once and shared by all configs"""
         folds = 4
-        countrys_res = [BaseModelTuning.extract_country_and_generate_var_res(code, df, maxlag, trend, dependent_name, plot_res, folds) for code in unique_countrycodes]
-
-        res_by_fold = BaseModelTuning.calculate_fold_var_res(countrys_res, folds)
-        
-        return DevStatusResult(dev_status, country_amount, res_by_fold) 
-
-    def VAR_pipeline(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], plot_res: bool, export_name: str, export_csv: bool, export_json: bool, maxlag: int, trend: str) -> None:
-        """TODO: Docstring"""
-        res_df: pd.DataFrame = pd.DataFrame(columns = ['Development status', "Country amount", 'Mean RMSE', "Mean stationary itas", "Mean fully stationary", "Mean train length", "Mean test length"]) 
-        dev_status_var_res_list = []
+        # With `plot_res` the forecasts of the last fold (fold 4 in the results) are plotted
+        plot_fold = folds - 1 if plot_res else None
+        strategies = [FixedParamsStrategy(config.export_name, config.hyper_params) for config in configs]
+        return VAREvaluation.get_var_res_by_dev_status(country_amount, dev_status, unique_countrycodes, panel, strategies, KFoldSplit(folds), dependent_name, workers, plot_fold=plot_fold)
+
+    def VAR_pipeline(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], plot_res: bool, export_name: str, export_csv: bool, export_json: bool, maxlag: int, trend: str, workers: int = 1) -> None:
+        """`export_csv` is deprecated and ignored, the development status summary it wrote was never filled. The results are in the JSON export"""
+        warn_export_csv(export_csv)
+        config = BaseModelConfig(export_name, VARHyperParams(trend, maxlag))
+        BaseModelTuning.VAR_pipeline_by_config(df_list, dependent_name, indep_names, plot_res, [config], export_json, workers)
+
+    def VAR_pipeline_by_config(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], plot_res: bool, configs: list[BaseModelConfig], export_json: bool, workers: int = 1) -> None:
+        """
+        Runs the baseline pipeline for every (lag, trend) config in one pass. 
+        The folds of every country are split and made stationary once and then shared by all configs, one result file is written per config (`<export_name>_VAR dev status results.json`).
+        With `plot_res` the forecasts of the last fold of every country are plotted.
+        """
+        dev_status_var_res_lists = [[] for _ in configs]
         for df in df_list:
             dev_status = df["economy"][0]
             df = df.drop(columns=["economy"])
             unique_countrycodes = df["countrycode"].unique()
             country_amt = len(unique_countrycodes)
+            panel = PWTPanel.create(df, dev_status)
             
-            dev_stat_var_res = BaseModelTuning.get_var_res_by_dev_status(country_amt, dev_status, unique_countrycodes, df, maxlag, trend, dependent_name, plot_res)
-            dev_status_var_res_list.append(dev_stat_var_res)
-
-            #res_df = pd.concat([res_df, pd.DataFrame([
-            #    {
-            #        "Development status" : dev_status, 
-            #        "Country amount": country_amt, 
-            #        "Mean RMSE": dev_stat_var_res.mean_var_results.mean_rmse,
-            #        "Mean stationary itas" : dev_stat_var_res.mean_var_results.mean_stationary_itas,
-            #        "Mean fully stationary": dev_stat_var_res.mean_var_results.mean_fully_stationary,
-            #        "Mean train length" : dev_stat_var_res.mean_var_results.mean_train_length,
-            #        "Mean test length" : dev_stat_var_res.mean_var_results.mean_test_length
-            #        }])], ignore_index=True)
+            with VARProfiler.dev_status(dev_status), VARProfiler.stage("dev_status_total"):
+                dev_stat_var_res_by_config = BaseModelTuning.get_var_res_by_dev_status_by_config(country_amt, dev_status, unique_countrycodes, panel, configs, dependent_name, plot_res, workers)
+            for dev_status_var_res_list, dev_stat_var_res in zip(dev_status_var_res_lists, dev_stat_var_res_by_config):
+                dev_status_var_res_list.append(dev_stat_var_res)
 
         if export_json:
-            ExportVARResults.save_json(asdict(VARExportClass(dependent_name, indep_names, dev_status_var_res_list)), f"./{export_str}_VAR dev status results.json")
-
-        if plot_res:
-            ExportVARResults.plot_dev_status_var_results(res_df)
-        
-        if export_csv:
-            res_df.to_csv("./Baseline_VAR dev status results.csv", index=False)
+            for config, dev_status_var_res_list in zip(configs, dev_status_var_res_lists):
+                ExportVARResults.save_json(asdict(VARExportClass(dependent_name, indep_names, dev_status_var_res_list)), f"./{config.export_name}_VAR dev status results.json")
 
 
 if __name__ == "__main__":
+    # Uncomment to time every pipeline stage (loading, ad fuller tests, VAR fits, forecasts, ...) per development status, the summary is printed and saved to "VAR profile.json"
+    #VARProfiler.configure("./.cache/profile")
     indep_vars =  ['rdana', 'rtfpna', 'emp', 'cda']
     pwt_by_dev_status_df_list = PWTDevStatusGenerator.subset_pwt_by_dev_stat(DevStatusLevel.MERGED_SUBSET, list(indep_vars))
-    #VARModelTuning.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, False, False, True)
+    # Countries are evaluated in parallel on every core
+    workers = os.cpu_count()
+    # ad fuller results are shared by the workers and reused by later runs
+    StationaryCache.configure("./.cache/adf_cache.sqlite")
+    # Country results are stored as they finish, an interrupted run continues where it stopped. Use resume=False (or delete the file) after changing the model code
+    VARCheckpoint.configure("./.cache/var_checkpoint.sqlite")
+    # VAR models of all countries and folds are estimated together with NumPy, VAREngine.STATSMODELS uses statsmodels instead
+    VARModel.configure_engine(VAREngine.NUMPY_BATCHED)
+    #VARModelTuning.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, False, False, True, workers)
     
     
-    #Baseline model
-    maxlag = 7
-    trend = 'c'
-    export_str = "Baseline"
-    BaseModelTuning.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, False, export_str, False, True, maxlag, trend)
-
+    #Baseline model and the best mode parameters of fold 4 per development status, all evaluated on the same folds in one pass
     #TODO: Dynamically load these parameters from results JSON file (instead of hardcoded)
-    #Best Mode parameters model fold 4 (Developing)
-    maxlag_developing = 5
-    trend_developing = 'ctt'
-    export_str = "Developing"
-    BaseModelTuning.VAR_pipeline(
-        pwt_by_dev_status_df_list,
-        "gdp_growth",
-        indep_vars,
-        False,
-        export_str,
-        False,
-        True,
-        maxlag_developing,
-        trend_developing)
-
-    #Best Mode parameters model fold 4 (Least developed)
-    maxlag_least_dev = 1
-    trend_least_dev = 'c'
-    export_str = "Least developed"
-    BaseModelTuning.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, False, export_str, False, True, maxlag_least_dev, trend_least_dev)
-
-    #Best Mode parameters model fold 4(Emerging)
-    maxlag_emerging = 2
-    trend_emerging = 'c'
-    export_str = "Emerging"
-    BaseModelTuning.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, False, export_str, False, True, maxlag_emerging, trend_emerging)
-    
-    #Best Mode parameters model fold 4 (Developed) 
-    maxlag_developed = 1
-    trend_developed = 'c'
-    export_str = "Developed"
-    BaseModelTuning.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, False, export_str, False, True, maxlag_developed, trend_developed)
\ No newline at end of file
+    strategies = [
+        FixedParamsStrategy("Baseline", VARHyperParams('c', 7)),
+        FixedParamsStrategy("Developing", VARHyperParams('ctt', 5)),
+        FixedParamsStrategy("Least developed", VARHyperParams('c', 1)),
+        FixedParamsStrategy("Emerging", VARHyperParams('c', 2)),
+        FixedParamsStrategy("Developed", VARHyperParams('c', 1))
+    ]
+    # Adding GridSearchStrategy(None, 8) evaluates the parameter search on the same folds in the same pass
+    # Every fold result is also stored in "VAR results.parquet", which VARImportResults and VARGeneralizedModel query
+    VAREvaluation.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, strategies, KFoldSplit(4), True, workers, "./VAR results.parquet")
+    if VARProfiler.is_enabled():
+        VARProfiler.print_summary()
+        VARProfiler.save_json("./VAR profile.json")
\ No newline at end of file
@@ -0,0 +1,100 @@
+import numpy as np
+from dataclasses import dataclass
+from scipy.linalg import solve_triangular
+from VARProfiler import VARProfiler
+
+TRENDS = ['n', 'c', 'ct', 'ctt']
+
+@dataclass
+class VAROLSResult:
+    """`params` follows the statsmodels layout: (k_trend + neqs * lag) x neqs, the trend rows followed by the rows of lag 1..lag"""
+    params: np.ndarray
+    lag: int
+    trend: str
+    n_totobs: int
+
+@dataclass
+class VAROLSModel:
+    """Unfitted VAR on the (observations x neqs) array `endog`, the counterpart of a statsmodels `VAR` model"""
+    endog: np.ndarray
+
+class VAROLS:
+    """
+    Ordinary least squares VAR estimation on raw arrays, giving the same estimates and forecasts as statsmodels `VAR.fit(method='ols')`.
+    The lagged design is built once for the maximum lag. Every lag is fitted from one QR decomposition of its columns, the trends of that lag from column prefixes of it.
+    A lag `p` fit drops the first `p` observations like statsmodels, so the lags differ in rows and do not share a single decomposition.
+    """
+    def get_trend_order(trend: str) -> int:
+        return len(trend) if trend != 'n' else 0
+
+    def build_design(endog: np.ndarray, maxlag: int) -> np.ndarray:
+        """
+        Returns the (observations x neqs * maxlag + 3) design holding lag 1..maxlag of every variable, followed by the constant, trend and squared trend.
+        Lags before the first observation are zero, a lag `p` fit only uses the rows from `p` on.
+        The trend is 1 at the first observation, like the JMulTi adjusted trend of statsmodels.
+        """
+        nobs, neqs = endog.shape
+        design = np.zeros((nobs, neqs * maxlag + 3))
+        for i in range(1, min(maxlag, nobs) + 1):
+            design[i:, neqs * (i - 1):neqs * i] = endog[:-i]
+
+        trend = np.arange(1, nobs + 1, dtype=np.float64)
+        design[:, -3] = 1
+        design[:, -2] = trend
+        design[:, -1] = trend ** 2
+        return design
+
+    def fit(model: VAROLSModel, lag: int, trend: str) -> VAROLSResult:
+        """Fits a VAR of order `lag` with deterministic terms `trend` ('n', 'c', 'ct' or 'ctt')"""
+        return VAROLS.fit_trends(model.endog, VAROLS.build_design(model.endog, lag), lag, [trend])[0]
+
+    @VARProfiler.timed("var_fit")
+    def fit_trends(endog: np.ndarray, design: np.ndarray, lag: int, trends: list[str] = TRENDS) -> list[VAROLSResult]:
+        """
+        Fits a VAR of order `lag` for every trend in `trends` using the design of `build_design`.
+        With the columns ordered [lags, constant, trend, squared trend] every trend is a column prefix, so one QR decomposition serves all of them.
+        Designs that are underdetermined or (nearly) collinear are solved by the minimum norm least squares statsmodels uses.
+        """
+        nobs, neqs = endog.shape
+        maxlag = (design.shape[1] - 3) // neqs
+        n_lag_cols = neqs * lag
+        k_trends = [VAROLS.get_trend_order(trend) for trend in trends]
+        columns = np.r_[0:n_lag_cols, neqs * maxlag:neqs * maxlag + max(k_trends)]
+        z = design[lag:, columns]
+        y = endog[lag:]
+
+        n_solvable = 0
+        if len(z) >= z.shape[1]:
+            q, r = np.linalg.qr(z)
+            qty = q.T @ y
+            r_diag = np.abs(np.diagonal(r))
+            # Number of leading columns that are clearly linearly independent
+            n_solvable = np.argmin(np.append(r_diag > 1e-10 * r_diag.max(), False))
+
+        results = []
+        for trend, k_trend in zip(trends, k_trends):
+            k = n_lag_cols + k_trend
+            if k <= n_solvable:
+                coefs = solve_triangular(r[:k, :k], qty[:k])
+            else:
+                coefs = np.linalg.lstsq(z[:, :k], y, rcond=1e-15)[0]
+            params = np.concatenate([coefs[n_lag_cols:], coefs[:n_lag_cols]])
+            results.append(VAROLSResult(params, lag, trend, nobs))
+        return results
+
+    @VARProfiler.timed("forecast")
+    def forecast(result: VAROLSResult, y: np.ndarray, steps: int) -> np.ndarray:
+        """Recursive `steps` ahead forecast (steps x neqs) continuing from the prior observations `y` (at least `lag` rows)"""
+        k_trend = VAROLS.get_trend_order(result.trend)
+        neqs = result.params.shape[1]
+        trend = np.arange(result.n_totobs + 1, result.n_totobs + 1 + steps, dtype=np.float64)
+        exog = np.column_stack([np.ones(steps), trend, trend ** 2])[:, :k_trend]
+        lag_params = result.params[k_trend:]
+
+        history = np.empty((result.lag + steps, neqs))
+        history[:result.lag] = y[len(y) - result.lag:]
+        history[result.lag:] = exog @ result.params[:k_trend]
+        for h in range(steps):
+            # The prior `lag` values with the most recent first, matching the lag order of the design
+            history[result.lag + h] += history[h:result.lag + h][::-1].ravel() @ lag_params
+        return history[result.lag:]
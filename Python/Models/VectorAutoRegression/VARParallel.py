@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import repeat
+
+class VARParallel:
+    """
+    Dispatches independent per country work to a process pool.
+    Run settings that the workers need (`PWTPanel.configure`, `StationaryCache.configure`, `VARCheckpoint.configure`, `VARModel.configure_engine`, `VARProfiler.configure`)
+    are stored in environment variables instead of module state, the worker processes inherit the environment and so use the settings made before the pool was created.
+    """
+    def map_countries(func, countrycodes: list[str], workers: int, *args) -> list:
+        """
+        Calls `func(countrycode, *args)` for every country and returns the results in the order of `countrycodes`.
+        Runs in the calling process when `workers` <= 1, otherwise in a pool of `workers` processes (None uses every core).
+        `func` and `args` have to be picklable, a PWTPanel is sent as its path and reopened by the workers.
+        """
+        if workers is not None and workers <= 1:
+            return [func(code, *args) for code in countrycodes]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, countrycodes, *[repeat(arg) for arg in args]))
+
+    def map_country_batches(func, countrycodes: list[str], workers: int, *args, max_batch_size: int = None) -> list:
+        """
+        Calls `func(batch, *args)` on consecutive batches of countries, one batch per worker, and returns the concatenated results in the order of `countrycodes`.
+        `func` has to return a list with one result per country of its batch. Batches hold at most `max_batch_size` countries when it is set.
+        """
+        batches = VARParallel.__create_batches(countrycodes, workers, max_batch_size)
+        batch_results = VARParallel.map_countries(func, batches, workers, *args)
+        return [res for batch_res in batch_results for res in batch_res]
+
+    def imap_country_batches(func, countrycodes: list[str], workers: int, *args, max_batch_size: int = None):
+        """Like `map_country_batches`, but yields (batch, results of the batch) as soon as a batch finishes, in completion order"""
+        batches = VARParallel.__create_batches(countrycodes, workers, max_batch_size)
+        if workers is not None and workers <= 1:
+            for batch in batches:
+                yield batch, func(batch, *args)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(func, batch, *args): batch for batch in batches}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def __create_batches(countrycodes: list[str], workers: int, max_batch_size: int) -> list[list[str]]:
+        n_batches = 1 if workers is not None and workers <= 1 else (workers or os.cpu_count())
+        batch_size = max(1, -(-len(countrycodes) // n_batches))
+        if max_batch_size is not None:
+            batch_size = min(batch_size, max_batch_size)
+        return [list(countrycodes[i:i + batch_size]) for i in range(0, len(countrycodes), batch_size)]
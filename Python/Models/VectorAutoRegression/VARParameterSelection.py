@@ -1,9 +1,15 @@
+import heapq
 import pandas as pd
+import numpy as np
 from statsmodels.tsa.api import VAR
 from VARDataClasses import VARPredictionResult, VARHyperParams
 from VARModel import VARModel
+from VAROLS import VAROLS, VAROLSModel, TRENDS
+from VARBatch import VARBatch
+from VARProfiler import VARProfiler
 
 class VARParameterSelection:
+    @VARProfiler.timed("parameter_search")
     def var_parameter_search(
             model: VAR, 
             target_column:str, 
@@ -13,53 +19,100 @@ class VARParameterSelection:
             stationary_itas: int,
             maxlag = 10, 
             max_queue_length: int = 10,
+            verbose: bool = False,
         ) -> list[tuple[VARPredictionResult, pd.DataFrame]]:
         #TODO: Proper docstring
         #TODO: Want to change the return tuple to a dataclass also? Or this creates too much indirection?
         """
-        Uses data to forecast on VAR models created with different hyperparameters. Returns a list with <= `maxlag` amount of results.
+        Uses data to forecast on VAR models created with different hyperparameters. Returns the <= `max_queue_length` results with the lowest rmse, best first.
         First element of tuple is hyperparams and rmse, second is the undifferenced forecast corresponding to the parameters
+        With `verbose` every candidate that improves on the best RMSE so far is printed.
+        Only VAROLSModel models (the NumPy engines) share one lagged design, statsmodels models (the default engine) are fitted with `VAR.fit` for every lag and trend.
         """
 
-        best_rmse = float('inf')
-        best_parameters = []
+        # With the NumPy engine the lagged design is built once, every lag fits all trends from a single QR decomposition of its columns
+        design = VAROLS.build_design(model.endog, maxlag) if isinstance(model, VAROLSModel) else None
+        candidates = list(VARParameterSelection.__forecast_candidates(model, design, df_diff, len(df_test), maxlag))
+
+        return VARParameterSelection.select_best_parameters(candidates, target_column, df_train, df_test, stationary_itas, max_queue_length, verbose)
+
+    @VARProfiler.timed("parameter_search")
+    def var_parameter_search_batch(
+            models: list[VAROLSModel],
+            target_column: str,
+            df_trains: list[pd.DataFrame],
+            df_diffs: list[pd.DataFrame],
+            df_tests: list[pd.DataFrame],
+            stationary_itas: list[int],
+            maxlag = 10,
+            max_queue_length: int = 10,
+            verbose: bool = False,
+        ) -> list[list[tuple[VARPredictionResult, pd.DataFrame]]]:
+        """
+        `var_parameter_search` for many folds (of many countries) at once, returns its result for every model in the order of `models`.
+        The candidates of every lag are fitted and forecast for all folds together by VARBatch.
+        """
+        endogs = [model.endog for model in models]
+        designs = [VAROLS.build_design(endog, maxlag) for endog in endogs]
+        prior_obs = [df_diff.values[-maxlag:] for df_diff in df_diffs]
+        steps = [len(df_test) for df_test in df_tests]
+
+        candidates = [[] for _ in models]
+        for lag in range(1, maxlag + 1):
+            fits = VARBatch.fit_trends(endogs, designs, lag, TRENDS)
+            fit_ids = [(model_i, trend_i) for model_i in range(len(models)) for trend_i in range(len(TRENDS))]
+            forecasts = VARBatch.forecast([fits[model_i][trend_i] for model_i, trend_i in fit_ids],
+                                          [prior_obs[model_i] for model_i, _ in fit_ids],
+                                          [steps[model_i] for model_i, _ in fit_ids])
+            for (model_i, trend_i), forecast in zip(fit_ids, forecasts):
+                candidates[model_i].append((lag, TRENDS[trend_i], forecast))
 
+        return [VARParameterSelection.select_best_parameters(candidates[i], target_column, df_trains[i], df_tests[i], stationary_itas[i], max_queue_length, verbose)
+                for i in range(len(models))]
+
+    def __forecast_candidates(model, design: np.ndarray, df_diff: pd.DataFrame, steps: int, maxlag: int):
+        """Yields (lag, trend, forecast) for every lag and trend, `design` is None for statsmodels models"""
         for lag in range(1,maxlag+1, 1):
-            for trend in ['n', 'c', 'ct', 'ctt']:
-                model_res = model.fit(
-                    maxlags=lag,
-                    method= 'ols',
-                    ic = None,
-                    trend=trend
-                )
+            if design is None:
+                for trend in TRENDS:
+                    model_res = VARModel.fit_base_model(model, lag, trend)
+                    yield lag, trend, VARModel.forecast(model_res, df_diff.values[-maxlag:], steps)
+            else:
+                for model_res in VAROLS.fit_trends(model.endog, design, lag, TRENDS):
+                    yield lag, model_res.trend, VAROLS.forecast(model_res, df_diff.values[-maxlag:], steps)
 
-                forecast_res = VARModel.forecast_using_var_model(model_res, df_train, df_test, df_diff, maxlag, stationary_itas, target_column)
-                if forecast_res.rmse < best_rmse:
-                    print(f"better params found with lag: {lag}, and trend: {trend}")
-                    best_rmse = forecast_res.rmse
-                    best_parameters =  VARParameterSelection.__append_parameters(best_params=best_parameters,
-                                        #TODO: Might be slow to create this many objects
-                                        params= [VARPredictionResult(best_rmse, VARHyperParams(trend, lag)), forecast_res.pred],
-                                        max_queue_length=max_queue_length)
-        
-        #TODO built-in reverse didn't work so this will have to do 
-        #best_params_copy = best_parameters.copy()
-        best_parameters = VARParameterSelection.__reverse(best_parameters)
-        #best_params_test = best_params_copy.reverse()
-        return best_parameters
+    @VARProfiler.timed("candidate_scoring")
+    def select_best_parameters(candidates, target_column: str, df_train: pd.DataFrame, df_test: pd.DataFrame, stationary_itas: int, max_queue_length: int, verbose: bool = False) -> list[tuple[VARPredictionResult, pd.DataFrame]]:
+        """
+        Scores the (lag, trend, forecast) candidates and returns the `max_queue_length` candidates with the lowest RMSE, best first.
+        Candidates are scored on raw arrays, the forecast dataframe is only created for the returned candidates.
+        """
+        best_rmse = float('inf')
+        # Max heap on (rmse, candidate order) holding the best candidates so far, equal RMSEs keep the earliest candidate
+        best_heap = []
+
+        # Every candidate is undifferenced and scored in one stacked call
+        candidates = list(candidates)
+        forecasts = np.stack([forecast for _, _, forecast in candidates])
+        undiff_forecasts, rmses = VARModel.evaluate_forecast_batch(forecasts, df_train, df_test, stationary_itas, target_column)
 
-    def __append_parameters(best_params: list[tuple[VARPredictionResult, pd.DataFrame]], params: tuple[VARPredictionResult, pd.DataFrame], max_queue_length: int) -> list[VARPredictionResult]:
-        best_params.append(params)
-        
-        #remove excess parameters from list
-        while len(best_params) > max_queue_length:
-            best_params.pop(0)
-        
-        return best_params
+        for i, ((lag, trend, _), rmse) in enumerate(zip(candidates, rmses)):
+            # NaN and infinite forecasts can not be compared
+            if not rmse < float('inf'):
+                continue
+            if verbose and rmse < best_rmse:
+                print(f"better params found with lag: {lag}, and trend: {trend}")
+                best_rmse = rmse
 
-    def __reverse(array):
-        new_array = []
-        for i in range(len(array)-1, -1, -1):
-            new_array.append(array[i])
+            entry = (-rmse, -i)
+            if len(best_heap) < max_queue_length:
+                heapq.heappush(best_heap, entry)
+            elif entry > best_heap[0]:
+                heapq.heapreplace(best_heap, entry)
 
-        return new_array
+        best_parameters = []
+        for neg_rmse, neg_i in sorted(best_heap, reverse=True):
+            lag, trend, _ = candidates[-neg_i]
+            best_parameters.append((VARPredictionResult(-neg_rmse, VARHyperParams(trend, lag)),
+                                    pd.DataFrame(undiff_forecasts[-neg_i], columns = df_train.columns, index = df_test.index)))
+        return best_parameters
@@ -0,0 +1,135 @@
+import os
+import glob
+import json
+import time
+import uuid
+import functools
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from contextlib import contextmanager
+from AtomicWrite import AtomicWrite
+
+PROFILE_DIR_ENV = "VAR_PROFILE_DIR"
+ALL_DEV_STATUSES = "All"
+# Samples are written as profile-<pid>-<token>.json, only these files are read and removed so the directory can be shared with other files
+SAMPLE_FILE_PATTERN = "profile-*.json"
+
+class VARProfiler:
+    """
+    Opt-in wall time instrumentation of the pipeline stages (loading, ad fuller tests, VAR fits, forecasts, inverse differencing, export, ...).
+    Stages are timed with the `stage` context manager or the `timed` decorator and recorded per development status, both are no-ops until `configure` is called.
+    Every process keeps its own samples and flushes them to a `profile-<pid>-<token>.json` file in the profile directory, `summarize` merges the files of all (worker) processes.
+    Stages can be nested, their times are inclusive.
+    """
+    __samples: dict = defaultdict(list)
+    __samples_pid: int = None
+    __samples_token: str = None
+    __dev_status: str = None
+
+    def configure(profile_dir: str = None) -> None:
+        """Enables profiling into `profile_dir` (None disables it), samples of an earlier run in the directory are removed"""
+        VARProfiler.__samples.clear()
+        if profile_dir is None:
+            os.environ.pop(PROFILE_DIR_ENV, None)
+            return
+        profile_dir = os.path.abspath(profile_dir)
+        os.makedirs(profile_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(profile_dir, SAMPLE_FILE_PATTERN)):
+            os.remove(path)
+        os.environ[PROFILE_DIR_ENV] = profile_dir
+
+    def is_enabled() -> bool:
+        return os.environ.get(PROFILE_DIR_ENV) is not None
+
+    @contextmanager
+    def stage(name: str):
+        """Records the wall time of the enclosed block as stage `name` of the current development status"""
+        if not VARProfiler.is_enabled():
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            VARProfiler.__record(name, time.perf_counter() - start)
+
+    def timed(name: str):
+        """Decorator recording every call of the decorated function as stage `name`"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not VARProfiler.is_enabled():
+                    return func(*args, **kwargs)
+                with VARProfiler.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def dev_status(dev_status: str):
+        """Stages recorded in the enclosed block are attributed to `dev_status`"""
+        previous = VARProfiler.__dev_status
+        VARProfiler.__dev_status = dev_status
+        try:
+            yield
+        finally:
+            VARProfiler.__dev_status = previous
+
+    def flush() -> None:
+        """Writes the samples of this process to the profile directory, called by worker processes at the end of every task"""
+        profile_dir = os.environ.get(PROFILE_DIR_ENV)
+        if profile_dir is None or VARProfiler.__samples_pid != os.getpid():
+            return
+        samples = [[stage, dev_status, durations] for (stage, dev_status), durations in VARProfiler.__samples.items()]
+        path = os.path.join(profile_dir, SAMPLE_FILE_PATTERN.replace("*", VARProfiler.__samples_token))
+        AtomicWrite.write_json(path, samples)
+
+    def summarize() -> pd.DataFrame:
+        """
+        Returns one row per (stage, development status) with the call count, total wall time and the mean, median, 90th, 99th percentile and maximum per call.
+        Samples without development status and the totals over all statuses are listed under "All".
+        """
+        VARProfiler.flush()
+        durations_by_key = defaultdict(list)
+        profile_dir = os.environ.get(PROFILE_DIR_ENV)
+        for path in glob.glob(os.path.join(profile_dir, SAMPLE_FILE_PATTERN)) if profile_dir is not None else []:
+            with open(path, "r") as f:
+                for stage, dev_status, durations in json.load(f):
+                    durations_by_key[(stage, dev_status or ALL_DEV_STATUSES)].extend(durations)
+                    if dev_status is not None:
+                        durations_by_key[(stage, ALL_DEV_STATUSES)].extend(durations)
+
+        rows = []
+        for (stage, dev_status), durations in durations_by_key.items():
+            durations = np.array(durations)
+            p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+            rows.append({
+                "stage": stage,
+                "dev_status": dev_status,
+                "calls": len(durations),
+                "total_s": durations.sum(),
+                "mean_ms": durations.mean() * 1000,
+                "p50_ms": p50 * 1000,
+                "p90_ms": p90 * 1000,
+                "p99_ms": p99 * 1000,
+                "max_ms": durations.max() * 1000,
+            })
+        columns = ["stage", "dev_status", "calls", "total_s", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+        return pd.DataFrame(rows, columns=columns).sort_values(["dev_status", "total_s"], ascending=[True, False], ignore_index=True)
+
+    def print_summary() -> None:
+        print(VARProfiler.summarize().to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+
+    def save_json(path: str) -> None:
+        """Writes the summary as a list of records"""
+        VARProfiler.summarize().to_json(path, orient="records", indent=2)
+
+    def __record(name: str, duration: float) -> None:
+        # Samples inherited from a forked parent process belong to the parent, every process records its own.
+        # The random token keeps the file of a process apart from an earlier process with the same (reused) pid
+        if VARProfiler.__samples_pid != os.getpid():
+            VARProfiler.__samples = defaultdict(list)
+            VARProfiler.__samples_pid = os.getpid()
+            VARProfiler.__samples_token = f"{os.getpid()}-{uuid.uuid4().hex}"
+        VARProfiler.__samples[(name, VARProfiler.__dev_status)].append(duration)
@@ -0,0 +1,101 @@
+import numpy as np
+from collections import defaultdict
+from dataclasses import dataclass
+from scipy.linalg import solve_triangular
+from VARDataClasses import PreparedFold
+from VAROLS import VAROLS, VAROLSResult, TRENDS
+from VARProfiler import VARProfiler
+
+@dataclass
+class RecursiveVARState:
+    """
+    Least squares state of one VAR lag order on a growing sample: the triangular factor of the augmented [design | endog] matrix.
+    The design columns are [lags, constant, trend, squared trend] so every trend is a column prefix.
+    `endog` refers to (is not a copy of) the latest observations, the rows of the minimum norm fallback are rebuilt from it.
+    """
+    lag: int
+    r_aug: np.ndarray
+    endog: np.ndarray
+    n_totobs: int
+
+class VARRecursive:
+    """
+    Recursive least squares for VAR models on an expanding window.
+    Appending observations updates the triangular factor with the new rows only, so refitting after every new origin costs about the same as one small QR.
+    """
+    def init(endog: np.ndarray, lag: int) -> RecursiveVARState:
+        """Creates the state of VAR order `lag` on the (observations x neqs) array `endog`"""
+        neqs = endog.shape[1]
+        state = RecursiveVARState(lag, np.empty((0, neqs * lag + 3 + neqs)), endog[:0], 0)
+        return VARRecursive.update(state, endog)
+
+    def update(state: RecursiveVARState, endog: np.ndarray) -> RecursiveVARState:
+        """
+        Extends the state with the observations of `endog` after the first `state.n_totobs`.
+        `endog` has to start with the observations the state was fitted on, as the differenced training data of an expanding window does.
+        """
+        if len(endog) <= state.n_totobs:
+            return state
+
+        first_row = max(state.n_totobs, state.lag)
+        design = VAROLS.build_design(endog, state.lag)[first_row:]
+        new_y = endog[first_row:]
+        if len(new_y) > 0:
+            # The R factor of [previous R; new rows] equals the R factor of all rows, its last columns hold Q'y
+            state.r_aug = np.linalg.qr(np.vstack([state.r_aug, np.hstack([design, new_y])]), mode='r')
+        state.endog = endog
+        state.n_totobs = len(endog)
+        return state
+
+    @VARProfiler.timed("var_fit")
+    def fit_trends(state: RecursiveVARState, trends: list[str] = TRENDS) -> list[VAROLSResult]:
+        """Solves the VAR of every trend in `trends` from the current state, equal to `VAROLS.fit_trends` on all observations so far"""
+        neqs = state.endog.shape[1]
+        n_lag_cols = neqs * state.lag
+        n_cols = n_lag_cols + 3
+
+        n_solvable = 0
+        if len(state.r_aug) >= n_cols:
+            r = state.r_aug[:n_cols, :n_cols]
+            qty = state.r_aug[:n_cols, n_cols:]
+            r_diag = np.abs(np.diagonal(r))
+            n_solvable = np.argmin(np.append(r_diag > 1e-10 * r_diag.max(), False))
+
+        z = None
+        results = []
+        for trend in trends:
+            k = n_lag_cols + VAROLS.get_trend_order(trend)
+            if k <= n_solvable:
+                coefs = solve_triangular(r[:k, :k], qty[:k])
+            else:
+                if z is None:
+                    z = VAROLS.build_design(state.endog, state.lag)[state.lag:]
+                coefs = np.linalg.lstsq(z[:, :k], state.endog[state.lag:], rcond=1e-15)[0]
+            params = np.concatenate([coefs[n_lag_cols:], coefs[:n_lag_cols]])
+            results.append(VAROLSResult(params, state.lag, trend, state.n_totobs))
+        return results
+
+    @VARProfiler.timed("var_update")
+    def update_states(states_by_itas: dict[int, dict[int, RecursiveVARState]], itas: int, endog: np.ndarray, lags: list[int]) -> dict[int, RecursiveVARState]:
+        """
+        Returns the state per lag for data differenced `itas` - 1 times, extended with the new observations of `endog`.
+        States are kept per differencing order, the differenced train window of a later origin always extends the one of an earlier origin.
+        """
+        states = states_by_itas.get(itas)
+        if states is None:
+            states = {lag: VARRecursive.init(endog, lag) for lag in lags}
+            states_by_itas[itas] = states
+        else:
+            for lag in lags:
+                VARRecursive.update(states[lag], endog)
+        return states
+
+    def iter_fold_states(folds: list[PreparedFold], lags: list[int]):
+        """
+        Yields (fold, endog, states per lag) with the states of the country of every fold updated to its train window.
+        `folds` holds the folds of an expanding split in origin order per country, see `update_states`.
+        """
+        states_by_country: dict[int, dict[int, dict[int, RecursiveVARState]]] = defaultdict(dict)
+        for fold in folds:
+            endog = fold.stationary_res.df.to_numpy(dtype=np.float64)
+            yield fold, endog, VARRecursive.update_states(states_by_country[fold.country_ita], fold.stationary_res.itas, endog, lags)
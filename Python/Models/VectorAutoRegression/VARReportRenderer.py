@@ -0,0 +1,56 @@
+import os
+import matplotlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from matplotlib.figure import Figure
+from VARImportResults import VARImportResults
+from VARDataClasses import VARExportClass
+
+@dataclass
+class PlotSpec:
+    """
+    One bar chart of `VARImportResults`, drawn from the results at `path` (a *.json* file or `config` of a *.parquet* VARResultStore).
+    The x labels are `xlab_format` formatted with the fields of every development status result, e.g. "{development_status}".
+    """
+    path: str
+    stat_to_plot: str
+    title: str
+    ylab: str
+    xlab_format: str
+    ylim: float
+    percentage: bool = False
+    log: bool = False
+    config: str = None
+
+class VARReportRenderer:
+    """
+    Renders a set of PlotSpecs on the headless Agg backend in a pool of worker processes.
+    Every results file is parsed once in the calling process and shared by all plots of it. Figures are created without pyplot and released after saving, so memory stays bounded by the figures in flight.
+    """
+    def render(specs: list[PlotSpec], workers: int = None) -> list[str]:
+        """Renders every spec and returns the paths of the saved images in the order of `specs`. `workers` <= 1 renders in this process, None uses every core"""
+        loaded_res = {}
+        for spec in specs:
+            if (spec.path, spec.config) not in loaded_res:
+                loaded_res[(spec.path, spec.config)] = VARImportResults.load_var_res(spec.path, spec.config)
+        spec_res = [loaded_res[(spec.path, spec.config)] for spec in specs]
+
+        if (workers is not None and workers <= 1) or len(specs) <= 1:
+            return [VARReportRenderer.render_spec(spec, res) for spec, res in zip(specs, spec_res)]
+
+        max_workers = min(workers or os.cpu_count(), len(specs))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=matplotlib.use, initargs=("Agg",)) as executor:
+            return list(executor.map(VARReportRenderer.render_spec, specs, spec_res))
+
+    def render_spec(spec: PlotSpec, loaded_res: tuple[VARExportClass, str]) -> str:
+        """Renders one spec from its parsed results (`VARImportResults.load_var_res`) and returns the path of the saved image"""
+        res, filename = loaded_res
+        # An Agg figure that is not registered with pyplot, it is released as soon as it goes out of scope
+        fig = Figure(layout='constrained', figsize=(10,6))
+        ax = fig.subplots()
+        VARImportResults.draw(ax, res, spec.stat_to_plot, spec.title, spec.ylab, lambda ds: spec.xlab_format.format(**ds), spec.ylim, spec.percentage, spec.log)
+
+        export_path = VARImportResults.get_export_path(filename, spec.stat_to_plot, spec.percentage)
+        fig.savefig(export_path, dpi=150)
+        fig.clear()
+        return export_path
@@ -0,0 +1,154 @@
+import os
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dataclasses import dataclass, field, asdict
+from VARDataClasses import CountryVARResult, FoldVARResults, VARPredictionResult, VARHyperParams, AggregatedFoldVARResults, DevStatusResult, VARExportClass
+from VARExportResults import ExportVARResults
+from VARAggregation import VARAggregation, RunningFoldStats
+from VARProfiler import VARProfiler
+from AtomicWrite import AtomicWrite
+
+RESULT_SCHEMA = pa.schema([
+    ("config", pa.string()),
+    ("dev_status", pa.string()),
+    ("country_ita", pa.int32()),
+    ("countrycode", pa.string()),
+    ("fold_ita", pa.int32()),
+    ("is_fully_stationary", pa.bool_()),
+    ("stationary_itas", pa.int32()),
+    ("train_length", pa.int32()),
+    ("test_length", pa.int32()),
+    ("rmse", pa.float64()),
+    ("trend", pa.string()),
+    ("lag", pa.int32()),
+])
+
+@dataclass
+class ResultStoreWriter:
+    """
+    Open results store, rows are written to `tmp_path` which replaces `path` when the writer is closed (and is removed when it is discarded).
+    The rows of the current development status are kept in `pending_tables` until the next status is added or the writer is closed.
+    """
+    path: str
+    tmp_path: str
+    parquet_writer: pq.ParquetWriter
+    meta: dict
+    pending_tables: list[pa.Table] = field(default_factory=list)
+
+class VARResultStore:
+    """
+    Columnar store of VAR evaluation results: a Parquet table with one typed row per (config, development status, country, fold).
+    The development statuses with their country amounts and fold amounts are kept in a `.meta.json` file next to it.
+    Every row group holds the rows of a single (development status, config, fold), ordered by country.
+    Queries push their filters down to the Parquet reader, so only the row groups of the requested status, fold or config are read.
+    The legacy `VARExportClass` JSON of a config is aggregated from the rows.
+    """
+    def open(path: str, dependent_name: str, indep_names: list[str]) -> ResultStoreWriter:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = AtomicWrite.create_tmp_path(path)
+        meta = {"dependent_variable": dependent_name, "independent_variables": list(indep_names), "dev_statuses": []}
+        return ResultStoreWriter(path, tmp_path, pq.ParquetWriter(tmp_path, RESULT_SCHEMA), meta)
+
+    def add_dev_status(writer: ResultStoreWriter, dev_status: str, country_amount: int, folds: int) -> None:
+        VARResultStore.__write_pending(writer)
+        writer.meta["dev_statuses"].append({"development_status": dev_status, "country_amount": int(country_amount), "folds": int(folds)})
+
+    @VARProfiler.timed("results_store")
+    def write_country_results(writer: ResultStoreWriter, dev_status: str, country_results: list[tuple[int, str, str, CountryVARResult]]) -> None:
+        """Adds the fold results of (country position, countrycode, config, CountryVARResult) tuples of the current development status"""
+        rows = [{
+                    "config": config,
+                    "dev_status": dev_status,
+                    "country_ita": country_ita,
+                    "countrycode": str(countrycode),
+                    "fold_ita": fold_res.fold_ita,
+                    "is_fully_stationary": bool(fold_res.is_fully_stationary),
+                    "stationary_itas": fold_res.stationary_itas,
+                    "train_length": fold_res.train_length,
+                    "test_length": fold_res.test_length,
+                    "rmse": float(fold_res.pred_res.rmse),
+                    "trend": fold_res.pred_res.hyper_params.trend,
+                    "lag": fold_res.pred_res.hyper_params.lag,
+                }
+                for country_ita, countrycode, config, country_res in country_results for fold_res in country_res.folds_res]
+        if len(rows) > 0:
+            writer.pending_tables.append(pa.Table.from_pylist(rows, schema=RESULT_SCHEMA))
+
+    def close(writer: ResultStoreWriter) -> None:
+        """Writes the remaining rows and moves the table to `path`, the temporary files are removed when this fails"""
+        try:
+            VARResultStore.__write_pending(writer)
+            writer.parquet_writer.close()
+            # The meta is replaced first, so a table is never next to the meta of an earlier run
+            AtomicWrite.write_json(VARResultStore.__get_meta_path(writer.path), writer.meta)
+            os.replace(writer.tmp_path, writer.path)
+        finally:
+            VARResultStore.discard(writer)
+
+    def discard(writer: ResultStoreWriter) -> None:
+        """Closes the writer without storing its rows, the temporary table is removed and a store at `path` is left as it was. Does nothing after `close`"""
+        try:
+            writer.parquet_writer.close()
+        finally:
+            if os.path.exists(writer.tmp_path):
+                os.remove(writer.tmp_path)
+
+    def query(path: str, dev_status: str = None, fold_ita: int = None, config: str = None, columns: list[str] = None) -> pd.DataFrame:
+        """Returns the rows matching every given filter, `fold_ita` counts from 0 like FoldVARResults"""
+        filters = [(column, "=", value) for column, value in (("dev_status", dev_status), ("fold_ita", fold_ita), ("config", config)) if value is not None]
+        return pd.read_parquet(path, columns=columns, filters=filters if len(filters) > 0 else None)
+
+    def get_configs(path: str) -> list[str]:
+        return pd.read_parquet(path, columns=["config"])["config"].unique().tolist()
+
+    def get_aggregated_fold(path: str, config: str, dev_status: str, fold_ita: int) -> AggregatedFoldVARResults:
+        """AggregatedFoldVARResults of a single fold of a single development status, only its rows are read"""
+        stats = VARAggregation.create(fold_ita + 1)
+        VARResultStore.__add_rows(stats, VARResultStore.query(path, dev_status, fold_ita, config))
+        return VARAggregation.get_results(stats)[fold_ita]
+
+    def load_export(path: str, config: str) -> VARExportClass:
+        """Aggregates the rows of `config` into the VARExportClass that VAR_pipeline exports as JSON"""
+        with open(VARResultStore.__get_meta_path(path), "r") as f:
+            meta = json.load(f)
+        rows_by_status = dict(tuple(VARResultStore.query(path, config=config).groupby("dev_status", sort=False)))
+
+        dev_status_results = []
+        for dev_status_meta in meta["dev_statuses"]:
+            dev_status = dev_status_meta["development_status"]
+            stats = VARAggregation.create(dev_status_meta["folds"])
+            if dev_status in rows_by_status:
+                VARResultStore.__add_rows(stats, rows_by_status[dev_status])
+            dev_status_results.append(DevStatusResult(dev_status, dev_status_meta["country_amount"], VARAggregation.get_results(stats)))
+        return VARExportClass(meta["dependent_variable"], meta["independent_variables"], dev_status_results)
+
+    def export_json(path: str, config: str, export_path: str) -> None:
+        """Writes the legacy `<export_name>_VAR dev status results.json` of `config`"""
+        ExportVARResults.save_json(asdict(VARResultStore.load_export(path, config)), export_path)
+
+    @VARProfiler.timed("results_store")
+    def __write_pending(writer: ResultStoreWriter) -> None:
+        """Writes the rows of the current development status as one row group per (config, fold), batches finish in any order"""
+        if len(writer.pending_tables) == 0:
+            return
+        table = pa.concat_tables(writer.pending_tables).sort_by([("config", "ascending"), ("fold_ita", "ascending"), ("country_ita", "ascending")])
+        writer.pending_tables = []
+        configs = table["config"].to_pylist()
+        fold_itas = table["fold_ita"].to_pylist()
+        starts = [i for i in range(len(configs)) if i == 0 or (configs[i], fold_itas[i]) != (configs[i - 1], fold_itas[i - 1])]
+        for start, end in zip(starts, starts[1:] + [len(configs)]):
+            writer.parquet_writer.write_table(table.slice(start, end - start))
+
+    def __add_rows(stats: list[RunningFoldStats], rows: pd.DataFrame) -> None:
+        rows = rows.sort_values(["country_ita", "fold_ita"], kind="stable")
+        for row in rows.itertuples(index=False):
+            # Back to Python scalars, the aggregated results are exported as JSON
+            fold_res = FoldVARResults(int(row.fold_ita), bool(row.is_fully_stationary), int(row.stationary_itas), int(row.train_length), int(row.test_length),
+                                      VARPredictionResult(float(row.rmse), VARHyperParams(row.trend, int(row.lag))))
+            VARAggregation.add_fold_res(stats, fold_res, int(row.country_ita))
+
+    def __get_meta_path(path: str) -> str:
+        """`results.parquet` -> `results.meta.json`, paths without an extension get the suffix appended"""
+        return os.path.splitext(path)[0] + ".meta.json"
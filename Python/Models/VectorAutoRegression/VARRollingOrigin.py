@@ -0,0 +1,39 @@
+# This makes sure Pandas keeps it mouth shut
+import warnings
+warnings.simplefilter(action = 'ignore', category = FutureWarning)
+import os
+import pandas as pd
+from VARDataClasses import TrainTestData, VARHyperParams, BaseModelConfig
+from PWTDevStatus import PWTDevStatusGenerator, DevStatusLevel
+from VAREvaluation import VAREvaluation, RollingOriginSplit, GridSearchStrategy, FixedParamsStrategy
+
+class VARRollingOrigin:
+    """
+    Rolling origin evaluation on expanding windows, an alternative to the KFold splits of VARModelTuning and BaseModelTuning.
+    Every origin trains on all years before it and tests on the `horizon` years after it, so no model is trained on data after its test period.
+    The VAR fits of consecutive origins are updated recursively with the new years (VARRecursive) instead of refitted.
+    """
+    def create_rolling_origin_data(df: pd.DataFrame, min_train_length: int, horizon: int, step: int = 1) -> list[TrainTestData]:
+        """Splits `df` in expanding train windows of at least `min_train_length` years, each followed by a test window of `horizon` years. The origin moves `step` years at a time"""
+        return RollingOriginSplit(min_train_length, horizon, step).split(df)
+
+    def VAR_pipeline(df_list: list[pd.DataFrame], dependent_name: str, indep_names: list[str], export_json: bool, maxlag: int = 8, configs: list[BaseModelConfig] = None, min_train_length: int = 30, horizon: int = 5, step: int = 1, workers: int = 1) -> None:
+        """
+        Runs the rolling origin evaluation of the parameter search (skipped when `maxlag` is None) and of every config in one pass.
+        Writes `Rolling origin_VAR dev status results.json` for the parameter search and `Rolling origin_<export_name>_VAR dev status results.json` per config.
+        """
+        if configs is None:
+            configs = []
+        strategies = [GridSearchStrategy("Rolling origin", maxlag)] if maxlag is not None else []
+        strategies += [FixedParamsStrategy(f"Rolling origin_{config.export_name}", config.hyper_params) for config in configs]
+        VAREvaluation.VAR_pipeline(df_list, dependent_name, indep_names, strategies, RollingOriginSplit(min_train_length, horizon, step), export_json, workers)
+
+
+if __name__ == "__main__":
+    indep_vars =  ['rdana', 'rtfpna', 'emp', 'cda']
+    pwt_by_dev_status_df_list = PWTDevStatusGenerator.subset_pwt_by_dev_stat(DevStatusLevel.MERGED_SUBSET, list(indep_vars))
+    workers = os.cpu_count()
+
+    # Parameter search and baseline evaluated on 5 year horizons after every origin from 30 years of training data onwards
+    base_model_configs = [BaseModelConfig("Baseline", VARHyperParams('c', 7))]
+    VARRollingOrigin.VAR_pipeline(pwt_by_dev_status_df_list, "gdp_growth", indep_vars, True, 8, base_model_configs, 30, 5, 1, workers)
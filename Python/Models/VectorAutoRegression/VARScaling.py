@@ -0,0 +1,310 @@
+import io
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import warnings
+import contextlib
+import multiprocessing
+import psutil
+from dataclasses import dataclass, asdict, replace
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from PWTSynthetic import PWTSynthetic
+from PWTDevStatus import PWTDevStatusGenerator, DevStatusLevel
+from PWTPanel import PWTPanel
+from StationaryCache import StationaryCache
+from VARCheckpoint import VARCheckpoint
+from VAROLS import TRENDS
+from VARModel import VARModel, VAREngine
+from VAREvaluation import VAREvaluation, KFoldSplit, GridSearchStrategy
+from VARBenchmark import VARBenchmark
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import RidgeRegression
+import LassoRegression
+
+# Size of the PWT the sweeps are relative to, one dimension is swept at a time while the others stay at this size
+BASE_COUNTRIES = 183
+BASE_YEARS = 70
+BASE_VARIABLES = 4
+DEFAULT_SWEEPS = {
+    "countries": [183, 1_830, 18_300, 183_000],
+    "years": [70, 140, 280, 560],
+    "variables": [2, 4, 8, 16],
+}
+
+# Variables of every workload in its __main__, further variables are synthetic indicators
+VAR_VARIABLES = ['rdana', 'rtfpna', 'emp', 'cda']
+RIDGE_PREDICTORS = ["pop", "emp", "avh", "rnna"]
+LASSO_PREDICTORS = ["pop", "cn", "ccon", "rdana"]
+RIDGE_ALPHAS = np.arange(0, 1000, 10)
+VAR_MAXLAG = 8
+WORKLOADS = ["VAR_pipeline", "ridge", "lasso"]
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+@dataclass
+class ScalingPoint:
+    """
+    Measurement of one workload on one synthetic panel. `status` is "ok", "timeout", "error" or "skipped" (a smaller point of the sweep did not finish).
+    `peak_rss_mb` is the peak of the summed resident memory of the point process and its (VAR worker) child processes, including generating the panel.
+    `data_rss_mb` is the resident memory once the panel is generated.
+    `scaling_exponent` is the slope of the wall time against the swept size from the previous point on a log-log scale, 1 is linear.
+    """
+    workload: str
+    dimension: str
+    value: int
+    countries: int
+    years: int
+    variables: int
+    status: str
+    rows: int = None
+    data_s: float = None
+    wall_s: float = None
+    data_rss_mb: float = None
+    peak_rss_mb: float = None
+    fits: int = None
+    fits_per_s: float = None
+    rows_per_s: float = None
+    scaling_exponent: float = None
+    error: str = None
+
+class PeakRSSSampler:
+    """
+    Samples the summed resident memory of this process and all its child processes every `interval` seconds in a background thread and keeps the maximum.
+    Unlike the peak RSS the OS reports per process, this is the memory of the whole run when workers are used at the same time.
+    Peaks shorter than `interval` can be missed, pages shared between processes (e.g. the memory mapped panel) are counted once per process.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self.__stop_event = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self) -> None:
+        self.sample()
+        self.__thread.start()
+
+    def stop(self) -> float:
+        """Stops sampling (once) and returns the peak in MB"""
+        if not self.__stop_event.is_set():
+            self.__stop_event.set()
+            if self.__thread.is_alive():
+                self.__thread.join()
+            self.sample()
+        return self.peak_rss_mb
+
+    def sample(self) -> None:
+        process = psutil.Process()
+        rss = 0
+        for p in [process, *process.children(recursive=True)]:
+            try:
+                rss += p.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                # A worker that exited between listing and reading its memory
+                pass
+        self.peak_rss_mb = max(self.peak_rss_mb, rss / 2**20)
+
+    def __run(self) -> None:
+        while not self.__stop_event.wait(self.interval):
+            self.sample()
+
+class VARScaling:
+    """
+    Sweeps the VAR pipeline and the Ridge and Lasso regressions over synthetic panels (see `PWTSynthetic`) of growing country count, series length and variable count.
+    Every point runs in a fresh process, so the resident memory sampled over it and its child processes is its own, and is stopped after `max_seconds`. Once a point does not finish the larger points of that sweep are skipped.
+    The points are written to `scaling.csv` and `scaling.json` and plotted per swept dimension.
+    """
+    def run(directory: str = "./.cache/scaling", workloads: list[str] = WORKLOADS, sweeps: dict[str, list[int]] = DEFAULT_SWEEPS, seed: int = 0, max_seconds: float = 1800, workers: int = 1) -> list[ScalingPoint]:
+        """Measures every workload at every point of `sweeps` ({dimension: sizes}), `workers` is passed to the VAR pipeline"""
+        for workload in workloads:
+            if workload not in WORKLOADS:
+                raise ValueError(f"unsupported workload: {workload!r}")
+        for dimension in sweeps:
+            if dimension not in ("countries", "years", "variables"):
+                raise ValueError(f"unsupported sweep dimension: {dimension!r}")
+        points = []
+        # The base size is part of every sweep, it is measured once per workload
+        measured = {}
+        for workload in workloads:
+            for dimension, values in sweeps.items():
+                finished = True
+                for value in sorted(values):
+                    sizes = {"countries": BASE_COUNTRIES, "years": BASE_YEARS, "variables": BASE_VARIABLES, dimension: value}
+                    point = ScalingPoint(workload, dimension, value, sizes["countries"], sizes["years"], sizes["variables"], "skipped")
+                    key = (workload, sizes["countries"], sizes["years"], sizes["variables"])
+                    if finished and key in measured:
+                        point = replace(measured[key], dimension=dimension, value=value)
+                    elif finished:
+                        print(f"{workload}: {sizes['countries']} countries x {sizes['years']} years x {sizes['variables']} variables...")
+                        point = VARScaling.measure(point, directory, seed, max_seconds, workers)
+                        print(f"  {point.status}" + (f" in {point.wall_s:.2f}s, peak RSS {point.peak_rss_mb:.0f} MB" if point.status == "ok" else ""))
+                        measured[key] = point
+                    finished = point.status == "ok"
+                    points.append(point)
+        VARScaling.__add_scaling_exponents(points)
+        return points
+
+    def measure(point: ScalingPoint, directory: str, seed: int, max_seconds: float, workers: int) -> ScalingPoint:
+        """
+        Runs the point in a new process and fills in its measurements.
+        A point that times out or dies is stopped together with its (VAR worker) child processes, orphaned workers would slow down every later point.
+        """
+        context = multiprocessing.get_context("spawn")
+        result_queue = context.Queue()
+        process = context.Process(target=VARScaling.run_point, args=(result_queue, point, os.path.abspath(directory), seed, workers))
+        process.start()
+        deadline = time.monotonic() + max_seconds
+        # The children of a process that died can no longer be listed, so they are remembered while it runs
+        children = {}
+        try:
+            while True:
+                try:
+                    return result_queue.get(timeout=1)
+                except queue.Empty:
+                    children.update((child.pid, child) for child in VARScaling.__get_children(process.pid))
+                    # Killed before reporting, e.g. by running out of memory
+                    if not process.is_alive():
+                        VARScaling.__kill(list(children.values()))
+                        point.status = "error"
+                        point.error = f"Process exited with code {process.exitcode}"
+                        return point
+                    if time.monotonic() > deadline:
+                        children.update((child.pid, child) for child in VARScaling.__get_children(process.pid))
+                        VARScaling.__kill(list(children.values()))
+                        process.terminate()
+                        process.join(10)
+                        if process.is_alive():
+                            process.kill()
+                        point.status = "timeout"
+                        return point
+        finally:
+            process.join()
+
+    def run_point(result_queue: multiprocessing.Queue, point: ScalingPoint, directory: str, seed: int, workers: int) -> None:
+        """Process target: generates the panel, runs the workload and puts the measured point on `result_queue`"""
+        rss_sampler = PeakRSSSampler(RSS_SAMPLE_INTERVAL_S)
+        try:
+            rss_sampler.start()
+            PWTPanel.configure(os.path.join(directory, "panels"))
+            StationaryCache.configure(None)
+            VARCheckpoint.configure(None)
+
+            start = time.perf_counter()
+            variables = VARScaling.__get_variables(point.workload, point.variables)
+            indicators = len([variable for variable in variables if variable.startswith("indicator_")])
+            # Long series start earlier, so their years still fit in a pandas Timestamp
+            start_year = min(1950, pd.Timestamp.max.year - point.years)
+            pwt, dev_status = PWTSynthetic.generate(point.countries, point.years, seed, start_year, indicators, [*variables, "rgdpna"])
+            point.rows = len(pwt)
+            point.data_s = time.perf_counter() - start
+            point.data_rss_mb = VARScaling.__get_rss_mb()
+
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter(action = 'ignore')
+                start = time.perf_counter()
+                point.fits = VARScaling.__run_workload(point.workload, pwt, dev_status, variables, workers)
+                point.wall_s = time.perf_counter() - start
+
+            point.peak_rss_mb = rss_sampler.stop()
+            point.fits_per_s = point.fits / point.wall_s
+            point.rows_per_s = point.rows / point.wall_s
+            point.status = "ok"
+        except Exception as e:
+            point.status = "error"
+            point.error = repr(e)
+        finally:
+            rss_sampler.stop()
+        result_queue.put(point)
+
+    def save(points: list[ScalingPoint], directory: str = "./.cache/scaling") -> None:
+        """Writes the points to `scaling.csv` and `scaling.json` (with the commit and versions) and plots them to `scaling_<dimension>.png`"""
+        os.makedirs(directory, exist_ok=True)
+        df = pd.DataFrame([asdict(point) for point in points])
+        df.to_csv(os.path.join(directory, "scaling.csv"), index=False)
+        with open(os.path.join(directory, "scaling.json"), "w") as f:
+            json.dump({"meta": VARBenchmark.get_meta(), "points": [asdict(point) for point in points]}, f, indent=2)
+        for dimension, dimension_df in df.groupby("dimension", sort=False):
+            VARScaling.plot(dimension, dimension_df, os.path.join(directory, f"scaling_{dimension}.png"))
+
+    def plot(dimension: str, df: pd.DataFrame, export_path: str) -> None:
+        """Wall time and peak RSS against the swept size per workload on log-log axes, the dashed lines are linear scaling from the first point"""
+        fig = Figure(layout='constrained', figsize=(12, 5))
+        time_ax, rss_ax = fig.subplots(1, 2)
+        for workload, workload_df in df[df["status"] == "ok"].groupby("workload", sort=False):
+            line, = time_ax.plot(workload_df["value"], workload_df["wall_s"], marker="o", label=workload)
+            first = workload_df.iloc[0]
+            time_ax.plot(workload_df["value"], first["wall_s"] * workload_df["value"] / first["value"], linestyle="--", color=line.get_color(), alpha=0.5)
+            rss_ax.plot(workload_df["value"], workload_df["peak_rss_mb"], marker="o", label=workload)
+        for ax, ylab in ((time_ax, "Wall time (s)"), (rss_ax, "Peak RSS (MB)")):
+            ax.set_xscale("log")
+            ax.set_yscale("log")
+            ax.set_xlabel(dimension.capitalize())
+            ax.set_ylabel(ylab)
+            ax.legend()
+        fig.suptitle(f"Scaling over {dimension}")
+        fig.savefig(export_path, dpi=150)
+        fig.clear()
+
+    def __run_workload(workload: str, pwt: pd.DataFrame, dev_status: pd.DataFrame, variables: list[str], workers: int) -> int:
+        """Runs the workload as its __main__ does and returns the amount of models it fitted"""
+        match workload:
+            case "VAR_pipeline":
+                pwt["year"] = pd.to_datetime(pwt["year"].astype(str), format="%Y")
+                pwt = pwt.set_index("year")
+                dev_status_dfs = PWTDevStatusGenerator.subset_df_by_dev_stat(pwt, dev_status, DevStatusLevel.MERGED_SUBSET, list(variables))
+                export_res = VAREvaluation.VAR_pipeline(dev_status_dfs, "gdp_growth", variables, [GridSearchStrategy(None, VAR_MAXLAG)], KFoldSplit(4), False, workers)[0]
+                # Every stationary fold fits every lag and trend
+                stationary_folds = sum(fold_res.data_amount for dev_status_res in export_res.dev_status_results for fold_res in dev_status_res.fold_results)
+                return stationary_folds * VAR_MAXLAG * len(TRENDS)
+            case "ridge":
+                (X_train, y_train), (X_test, y_test) = RidgeRegression.generate_train_test_data(pwt, variables)
+                for alpha in RIDGE_ALPHAS:
+                    RidgeRegression.ridge_regression(X_train, y_train, X_test, y_test, alpha)
+                return len(RIDGE_ALPHAS)
+            case "lasso":
+                (X_train, y_train), (X_test, y_test) = LassoRegression.generate_train_test_data(pwt, variables)
+                LassoRegression.lasso_regression(X_train, y_train, X_test, y_test)
+                return 1
+            case _:
+                raise ValueError(f"unsupported workload: {workload!r}")
+
+    def __get_variables(workload: str, amount: int) -> list[str]:
+        base = {"VAR_pipeline": VAR_VARIABLES, "ridge": RIDGE_PREDICTORS, "lasso": LASSO_PREDICTORS}[workload]
+        return base[:amount] + [f"indicator_{i}" for i in range(1, amount - len(base) + 1)]
+
+    def __add_scaling_exponents(points: list[ScalingPoint]) -> None:
+        previous = None
+        for point in points:
+            if previous is not None and point.status == "ok" and previous.status == "ok" and (previous.workload, previous.dimension) == (point.workload, point.dimension):
+                point.scaling_exponent = np.log(point.wall_s / previous.wall_s) / np.log(point.value / previous.value)
+            previous = point
+
+    def __get_children(pid: int) -> list[psutil.Process]:
+        try:
+            return psutil.Process(pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            return []
+
+    def __kill(processes: list[psutil.Process]) -> None:
+        """Kills the processes that are still running, psutil checks the creation time so a reused pid is never killed"""
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(processes, timeout=10)
+
+    def __get_rss_mb() -> float:
+        return psutil.Process().memory_info().rss / 2**20
+
+if __name__ == "__main__":
+    # The engine VARModelTuning runs with, VAREngine.STATSMODELS measures statsmodels instead
+    VARModel.configure_engine(VAREngine.NUMPY_BATCHED)
+    # The largest points take hours with a single worker, points that run longer than max_seconds are stopped and the larger points of their sweep are skipped
+    points = VARScaling.run(max_seconds=1800, workers=os.cpu_count())
+    VARScaling.save(points)
+    print(pd.DataFrame([asdict(point) for point in points])[["workload", "dimension", "value", "status", "wall_s", "peak_rss_mb", "fits_per_s", "scaling_exponent"]].to_string(index=False))
@@ -0,0 +1,26 @@
+import json
+import pytest
+from AtomicWrite import AtomicWrite
+
+def test_write_json_replaces_the_file(tmp_path):
+    path = tmp_path / "meta.json"
+    path.write_text("old")
+    AtomicWrite.write_json(str(path), {"a": 1})
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["meta.json"]
+
+def test_failed_block_keeps_the_file_and_removes_the_temporary_file(tmp_path):
+    path = tmp_path / "table.parquet"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with AtomicWrite.replacing(str(path)) as tmp_path_str:
+            with open(tmp_path_str, "w") as f:
+                f.write("partial")
+            raise RuntimeError("interrupted")
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["table.parquet"]
+
+def test_temporary_paths_are_unique(tmp_path):
+    path = str(tmp_path / "panel")
+    first, second = AtomicWrite.create_tmp_path(path), AtomicWrite.create_tmp_path(path)
+    assert first != second and first.startswith(f"{path}.")
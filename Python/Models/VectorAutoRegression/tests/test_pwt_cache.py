@@ -0,0 +1,80 @@
+import json
+import os
+import pandas as pd
+import pytest
+from PWTCache import PWTCache
+
+BUILD_MESSAGE = "Building Penn World Table cache"
+
+def create_pwt(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({
+        "countrycode": ["AAA"] * rows,
+        "country": ["Aaa"] * rows,
+        "currency_unit": ["Dollar"] * rows,
+        "year": list(range(1990, 1990 + rows)),
+        "rgdpna": [float(i) for i in range(rows)],
+    })
+
+@pytest.fixture
+def xlsx_path(tmp_path) -> str:
+    path = str(tmp_path / "pwt.xlsx")
+    create_pwt().to_excel(path, index=False)
+    return path
+
+def load(xlsx_path: str, capsys) -> tuple[pd.DataFrame, bool]:
+    """The loaded table and whether the cache was (re)built"""
+    pwt = PWTCache.load_pwt(xlsx_path=xlsx_path)
+    return pwt, BUILD_MESSAGE in capsys.readouterr().out
+
+def get_meta_path(xlsx_path: str) -> str:
+    return os.path.splitext(PWTCache.get_cache_path(xlsx_path))[0] + ".meta.json"
+
+def test_cache_matches_workbook(xlsx_path, capsys):
+    pwt, built = load(xlsx_path, capsys)
+    assert built
+    pd.testing.assert_frame_equal(pwt, pd.read_excel(xlsx_path))
+    assert not load(xlsx_path, capsys)[1]
+
+def test_parquet_in_directory_name(tmp_path, capsys):
+    # Only the extension of the cache path is replaced by the meta path, not ".parquet" in the directories above it
+    directory = tmp_path / "run.parquet" / "Data"
+    directory.mkdir(parents=True)
+    path = str(directory / "pwt.xlsx")
+    create_pwt().to_excel(path, index=False)
+    assert load(path, capsys)[1]
+    assert os.path.exists(get_meta_path(path))
+    assert not load(path, capsys)[1]
+
+def test_changed_size_rebuilds(xlsx_path, capsys):
+    load(xlsx_path, capsys)
+    create_pwt(rows=5).to_excel(xlsx_path, index=False)
+    pwt, built = load(xlsx_path, capsys)
+    assert built and len(pwt) == 5
+
+def test_changed_mtime_with_other_content_rebuilds(xlsx_path, capsys):
+    load(xlsx_path, capsys)
+    pwt = create_pwt()
+    pwt.loc[0, "rgdpna"] = 100.0
+    pwt.to_excel(xlsx_path, index=False)
+    stat = os.stat(xlsx_path)
+    os.utime(xlsx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    # Give the stored key the size of the new workbook, so only the mtime and hash tell the workbooks apart
+    meta_path = get_meta_path(xlsx_path)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["size"] = os.stat(xlsx_path).st_size
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    pwt, built = load(xlsx_path, capsys)
+    assert built and pwt.loc[0, "rgdpna"] == 100.0
+
+def test_touch_with_same_content_keeps_cache(xlsx_path, capsys, monkeypatch):
+    load(xlsx_path, capsys)
+    stat = os.stat(xlsx_path)
+    os.utime(xlsx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not load(xlsx_path, capsys)[1]
+    # The touch refreshed the stored mtime, so the next load does not hash the workbook again
+    def fail(path):
+        raise AssertionError("workbook was hashed")
+    monkeypatch.setattr(PWTCache, "_PWTCache__hash_file", fail)
+    assert not load(xlsx_path, capsys)[1]
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from PWTFeatures import PWTFeatures, FeatureSpec, FeatureKind
+
+def create_panel(rng: np.random.Generator, gaps: bool = True) -> pd.DataFrame:
+    """Shuffled (country, year) rows of three countries, with missing years and a NaN value when `gaps` is set"""
+    frames = []
+    for code, first_year in (("AAA", 1950), ("BBB", 1960), ("CCC", 1955)):
+        years = np.arange(first_year, 1990)
+        if gaps:
+            years = np.delete(years, rng.choice(len(years), 4, replace=False))
+        frames.append(pd.DataFrame({"countrycode": code, "year": years, "x": rng.uniform(1, 2, len(years)) * np.exp(0.02 * (years - 1950))}))
+    df = pd.concat(frames, ignore_index=True)
+    if gaps:
+        df.loc[5, "x"] = np.nan
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+def lookup(df: pd.DataFrame, offset: int) -> np.ndarray:
+    """Value of the same country `offset` years later (earlier when negative), NaN when that year has no row"""
+    values = df.set_index(["countrycode", "year"])["x"]
+    return np.array([values.get((code, year + offset), np.nan) for code, year in zip(df["countrycode"], df["year"])])
+
+def test_growth_is_nan_after_a_missing_year():
+    df = create_panel(np.random.default_rng(0))
+    res = PWTFeatures.derive(df.copy(), [
+        FeatureSpec("growth", FeatureKind.GROWTH, "x"),
+        FeatureSpec("growth_2", FeatureKind.GROWTH, "x", periods = 2),
+        FeatureSpec("log_diff", FeatureKind.LOG_DIFF, "x", scale = 100),
+    ])
+    prev, prev_2 = lookup(df, -1), lookup(df, -2)
+    np.testing.assert_allclose(res["growth"], (df["x"] - prev) / prev)
+    np.testing.assert_allclose(res["growth_2"], (df["x"] - prev_2) / prev_2)
+    np.testing.assert_allclose(res["log_diff"], 100 * (np.log(df["x"]) - np.log(prev)))
+    # The year after a gap is not treated as a one year step from the year before the gap
+    after_gap = np.isnan(prev) & ~np.isnan(prev_2)
+    assert after_gap.any() and res["growth"][after_gap].isna().all()
+
+def test_lag_lead_and_ratio():
+    df = create_panel(np.random.default_rng(1))
+    df["y"] = df["x"] * 2
+    res = PWTFeatures.derive(df.copy(), [
+        FeatureSpec("lag_3", FeatureKind.LAG, "x", periods = 3),
+        FeatureSpec("lead_1", FeatureKind.LEAD, "x"),
+        FeatureSpec("ratio", FeatureKind.RATIO, "x", other = "y"),
+    ])
+    np.testing.assert_array_equal(res["lag_3"], lookup(df, -3))
+    np.testing.assert_array_equal(res["lead_1"], lookup(df, 1))
+    np.testing.assert_allclose(res["ratio"], df["x"] / df["y"])
+
+def test_matches_groupby_pct_change_without_gaps():
+    # Without missing years the features equal the groupby shift they replace
+    df = create_panel(np.random.default_rng(2), gaps = False)
+    df.index = pd.to_datetime(df.pop("year").astype(str), format="%Y")
+    res = PWTFeatures.derive(df.copy(), [FeatureSpec("growth", FeatureKind.GROWTH, "x")])
+    expected = df.sort_index().groupby("countrycode")["x"].pct_change()
+    np.testing.assert_allclose(res.sort_index()["growth"], expected)
+
+def test_unsupported_kind_raises():
+    df = create_panel(np.random.default_rng(3))
+    with pytest.raises(ValueError, match="unsupported feature kind"):
+        PWTFeatures.derive(df, [FeatureSpec("bad", "GROWTH", "x")])
+
+def calc5(df: pd.DataFrame, row: pd.Series) -> list:
+    """The row wise targets of the KNN notebook that the forward kinds replace: the summed growth of year + 1..6 and the growth to year + 1, 2 and 5"""
+    tally, y1, y2, y5 = 0, 1, 1, 1
+    future = row["year"]
+    while future <= row["year"] + 5:
+        future += 1
+        future_x = df.loc[(df["countrycode"] == row["countrycode"]) & (df["year"] == future), "x"]
+        if future_x.empty:
+            return [None, None, None, None]
+        growth = future_x.iloc[0] / row["x"] - 1
+        tally += growth
+        if future == row["year"] + 1:
+            y1 = growth
+        elif future == row["year"] + 2:
+            y2 = growth
+        elif future == row["year"] + 5:
+            y5 = growth
+    return [tally, y1, y2, y5]
+
+def test_forward_kinds_match_calc5():
+    df = create_panel(np.random.default_rng(4)).dropna(subset=["x"]).reset_index(drop=True)
+    res = PWTFeatures.derive(df.copy(), [
+        FeatureSpec("calc5", FeatureKind.FORWARD_GROWTH_SUM, "x", periods = 6),
+        FeatureSpec("y1", FeatureKind.FORWARD_GROWTH, "x", periods = 1),
+        FeatureSpec("y2", FeatureKind.FORWARD_GROWTH, "x", periods = 2),
+        FeatureSpec("y5", FeatureKind.FORWARD_GROWTH, "x", periods = 5),
+    ])
+    # As in the notebook, the other targets are only kept where the whole calc5 window is available
+    res.loc[res["calc5"].isna(), ["y1", "y2", "y5"]] = np.nan
+    expected = pd.DataFrame([calc5(df, row) for _, row in df.iterrows()], columns=["calc5", "y1", "y2", "y5"], dtype=np.float64)
+    assert res["calc5"].notna().any()
+    np.testing.assert_allclose(res[["calc5", "y1", "y2", "y5"]].to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+def test_forward_window_is_nan_across_a_missing_year():
+    df = create_panel(np.random.default_rng(5))
+    res = PWTFeatures.derive(df.copy(), [
+        FeatureSpec("forward", FeatureKind.FORWARD_GROWTH, "x", periods = 3),
+        FeatureSpec("cumulative", FeatureKind.CUMULATIVE_GROWTH, "x", periods = 3),
+    ])
+    window = np.column_stack([lookup(df, offset) for offset in range(4)])
+    complete = ~np.isnan(window).any(axis=1)
+    np.testing.assert_array_equal(res["forward"].notna(), complete)
+    np.testing.assert_allclose(res["forward"][complete], window[complete, 3] / window[complete, 0] - 1)
+    np.testing.assert_allclose(res["cumulative"][complete], (window[complete, 1:] / window[complete, :-1] - 1).sum(axis=1))
@@ -0,0 +1,79 @@
+import os
+import json
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from PWTPanel import PWTPanel, PANEL_DIR_ENV
+from VARParallel import VARParallel
+
+@pytest.fixture(autouse=True)
+def panel_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv(PANEL_DIR_ENV, raising=False)
+    PWTPanel.configure(str(tmp_path / "panels"))
+    return tmp_path / "panels"
+
+def create_df(seed: int = 0) -> pd.DataFrame:
+    """Long dataframe of three countries, BBB starts later and CCC has a year without data"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for code, first_year in (("AAA", 1950), ("BBB", 1970), ("CCC", 1950)):
+        years = pd.DatetimeIndex(pd.to_datetime([str(year) for year in range(first_year, 2000)], format="%Y"), name="year")
+        frames.append(pd.DataFrame(rng.normal(size=(len(years), 2)), index=years, columns=["gdp_growth", "rdana"]).assign(countrycode=code))
+    df = pd.concat(frames)
+    df.loc[(df["countrycode"] == "CCC") & (df.index.year == 1960), "rdana"] = np.nan
+    return df
+
+def get_expected_country_df(df: pd.DataFrame, countrycode: str) -> pd.DataFrame:
+    return df.loc[df["countrycode"] == countrycode].drop(columns=["countrycode"]).dropna()
+
+def sum_country(countrycode: str, panel: PWTPanel) -> float:
+    return float(panel.get_country_df(countrycode).to_numpy().sum())
+
+def test_get_country_df_matches_dataframe():
+    df = create_df()
+    panel = PWTPanel.create(df, "Developed region: G7")
+    for code in ("AAA", "BBB", "CCC"):
+        pd.testing.assert_frame_equal(panel.get_country_df(code), get_expected_country_df(df, code), check_freq=False)
+    # Consecutive years are a view on the memory mapped file, a year without data makes a copy
+    assert np.shares_memory(panel.get_country_df("BBB").to_numpy(), panel.data)
+    assert not np.shares_memory(panel.get_country_df("CCC").to_numpy(), panel.data)
+
+def test_pickles_as_its_path():
+    panel = PWTPanel.create(create_df(), "Developed region: G7")
+    pickled = pickle.dumps(panel)
+    # The tensor itself is not part of the pickle
+    assert len(pickled) < panel.data.nbytes
+    unpickled = pickle.loads(pickled)
+    assert unpickled.path == panel.path
+    assert isinstance(unpickled.data, np.memmap) and not unpickled.data.flags.writeable
+    np.testing.assert_array_equal(unpickled.data, panel.data)
+    assert unpickled.get_content_hash() == panel.get_content_hash()
+
+def test_content_hash_is_stored_with_the_indexes():
+    panel = PWTPanel.create(create_df(), "Developed region: G7")
+    with open(f"{panel.path}.json") as f:
+        content_hash = json.load(f)["content_hash"]
+    assert os.path.basename(panel.path).endswith(f"-{content_hash[:16]}.panel")
+    assert PWTPanel.open(panel.path).get_content_hash() == panel.get_content_hash() == content_hash
+
+def test_worker_processes_reopen_the_panel():
+    df = create_df()
+    panel = PWTPanel.create(df, "Developed region: G7")
+    codes = ["AAA", "BBB", "CCC"]
+    sums = VARParallel.map_countries(sum_country, codes, 2, panel)
+    assert sums == pytest.approx([get_expected_country_df(df, code).to_numpy().sum() for code in codes])
+
+def test_create_reuses_a_panel_of_the_same_data(panel_dir):
+    panel = PWTPanel.create(create_df(), "Developed region: G7")
+    assert os.path.dirname(panel.path) == str(panel_dir)
+    assert os.path.basename(panel.path).startswith("Developed_region_G7-")
+    modified = os.path.getmtime(panel.path)
+    assert PWTPanel.create(create_df(), "Developed region: G7").path == panel.path
+    assert os.path.getmtime(panel.path) == modified
+
+    other = PWTPanel.create(create_df(1), "Developed region: G7")
+    assert other.path != panel.path
+    assert other.get_content_hash() != panel.get_content_hash()
+    # Only the panels and their indexes are left, no temporary files
+    assert sorted(os.listdir(panel_dir)) == sorted(os.path.basename(path) + suffix for path in (panel.path, other.path) for suffix in ("", ".json"))
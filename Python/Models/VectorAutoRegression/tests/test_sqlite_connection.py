@@ -0,0 +1,27 @@
+import os
+import pytest
+from SQLiteConnection import SQLiteConnection
+
+PATH_ENV = "TEST_SQLITE_CONNECTION_PATH"
+
+@pytest.fixture
+def database(monkeypatch) -> SQLiteConnection:
+    monkeypatch.delenv(PATH_ENV, raising=False)
+    return SQLiteConnection(PATH_ENV, "CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY)")
+
+def test_no_connection_without_path(database):
+    assert database.get() is None
+
+def test_connection_is_reused_until_the_path_changes(database, tmp_path, monkeypatch):
+    monkeypatch.setenv(PATH_ENV, str(tmp_path / "first" / "items.sqlite"))
+    connection = database.get()
+    assert connection.execute("SELECT COUNT(*) FROM items").fetchone() == (0,)
+    assert database.get() is connection
+    monkeypatch.setenv(PATH_ENV, str(tmp_path / "second.sqlite"))
+    assert database.get() is not connection
+
+def test_forked_process_opens_its_own_connection(database, tmp_path, monkeypatch):
+    monkeypatch.setenv(PATH_ENV, str(tmp_path / "items.sqlite"))
+    connection = database.get()
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert database.get() is not connection
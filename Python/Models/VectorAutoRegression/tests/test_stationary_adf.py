@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller
+from StationaryADF import StationaryADF
+
+REGRESSIONS = ['n', 'c', 'ct', 'ctt']
+AUTOLAGS = ['AIC', 'BIC', None]
+
+def get_maxlag(nobs: int, regression: str) -> int:
+    """The lag order of Stationary.adf_test, capped at the largest order adfuller accepts"""
+    ntrend = len(regression) if regression != 'n' else 0
+    return min(round(12 * pow(nobs / 100, 1/4)), nobs // 2 - ntrend - 1)
+
+def create_series(rng: np.random.Generator, nobs: int, amount: int) -> np.ndarray:
+    """(nobs x amount) mix of random walks, white noise and trending noise"""
+    columns = []
+    for i in range(amount):
+        match i % 3:
+            case 0:
+                columns.append(rng.normal(size=nobs).cumsum())
+            case 1:
+                columns.append(rng.normal(size=nobs))
+            case 2:
+                columns.append(rng.normal(size=nobs) + 0.3 * np.arange(nobs))
+    return np.column_stack(columns)
+
+def assert_matches_adfuller(values: np.ndarray, maxlag: int, regression: str, autolag: str) -> None:
+    res = StationaryADF.adfuller_batch(values, maxlag, regression, autolag)
+    for i in range(values.shape[1]):
+        adf_stat, p_value, used_lag = adfuller(values[:, i], maxlag=maxlag, regression=regression, autolag=autolag)[:3]
+        assert res.used_lags[i] == used_lag
+        assert res.adf_stats[i] == pytest.approx(adf_stat, rel=1e-8)
+        assert res.p_values[i] == pytest.approx(p_value, rel=1e-8, abs=1e-12)
+
+@pytest.mark.parametrize("regression", REGRESSIONS)
+@pytest.mark.parametrize("autolag", AUTOLAGS)
+@pytest.mark.parametrize("nobs", [33, 48, 70])
+def test_random_series_match_adfuller(nobs: int, regression: str, autolag: str):
+    rng = np.random.default_rng(nobs)
+    assert_matches_adfuller(create_series(rng, nobs, 12), get_maxlag(nobs, regression), regression, autolag)
+
+@pytest.mark.parametrize("regression", REGRESSIONS)
+@pytest.mark.parametrize("autolag", AUTOLAGS)
+@pytest.mark.parametrize("nobs", [10, 14, 20])
+# Short series with regression 'n' include exact fits, which must not leak a warning
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+def test_short_series_match_adfuller(nobs: int, regression: str, autolag: str):
+    rng = np.random.default_rng(nobs)
+    assert_matches_adfuller(create_series(rng, nobs, 9), get_maxlag(nobs, regression), regression, autolag)
+
+def test_single_series():
+    values = np.random.default_rng(0).normal(size=40).cumsum()
+    res = StationaryADF.adfuller_batch(values, 4)
+    adf_stat, p_value, used_lag = adfuller(values, maxlag=4)[:3]
+    assert res.used_lags[0] == used_lag
+    assert res.p_values[0] == pytest.approx(p_value, rel=1e-8)
+
+@pytest.mark.parametrize("regression", REGRESSIONS)
+def test_constant_series_raises_like_adfuller(regression: str):
+    values = create_series(np.random.default_rng(0), 30, 3)
+    values[:, 1] = 5.0
+    with pytest.raises(ValueError, match="constant"):
+        adfuller(values[:, 1], maxlag=2, regression=regression)
+    with pytest.raises(ValueError, match="constant"):
+        StationaryADF.adfuller_batch(values, 2, regression)
+
+def test_too_large_maxlag_raises_like_adfuller():
+    values = create_series(np.random.default_rng(0), 12, 2)
+    with pytest.raises(ValueError, match="maxlag"):
+        adfuller(values[:, 0], maxlag=5, regression='c')
+    with pytest.raises(ValueError, match="maxlag"):
+        StationaryADF.adfuller_batch(values, 5, 'c')
+
+def test_rank_deficient_series_match_adfuller():
+    # Exactly linear series give a collinear test regression, which is handed to statsmodels
+    rng = np.random.default_rng(0)
+    values = create_series(rng, 40, 3)
+    values[:, 0] = np.arange(40, dtype=np.float64)
+    assert_matches_adfuller(values, 4, 'ct', 'AIC')
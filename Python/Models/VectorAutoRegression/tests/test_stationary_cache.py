@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller
+from StationaryADF import StationaryADF
+from StationaryCache import StationaryCache, PERSIST_PATH_ENV
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.delenv(PERSIST_PATH_ENV, raising=False)
+    # Restored after every test, configure sets it
+    monkeypatch.setattr(StationaryCache, "max_size", StationaryCache.max_size)
+    StationaryCache.clear()
+    yield
+    StationaryCache.clear()
+
+def create_series(seed: int, nobs: int = 40) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=nobs).cumsum()
+
+def fail_on_test(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("ad fuller test was run")
+    monkeypatch.setattr(StationaryADF, "adfuller_batch", fail)
+
+def count_tests(monkeypatch) -> list[int]:
+    """Counts the columns tested by StationaryADF, the results are still computed"""
+    adfuller_batch = StationaryADF.adfuller_batch
+    tested = []
+    def counting(values, *args, **kwargs):
+        tested.append(np.asarray(values).shape[1])
+        return adfuller_batch(values, *args, **kwargs)
+    monkeypatch.setattr(StationaryADF, "adfuller_batch", counting)
+    return tested
+
+@pytest.mark.parametrize("regression", ['n', 'c', 'ct'])
+def test_result_matches_adfuller(regression: str):
+    series = create_series(0)
+    p_value, used_lag = StationaryCache.get_adf_result(series, 4, regression=regression)
+    expected = adfuller(series, maxlag=4, regression=regression, autolag='AIC')
+    assert used_lag == expected[2]
+    assert p_value == pytest.approx(expected[1], rel=1e-8)
+
+def test_lru_hit_skips_the_test(monkeypatch):
+    series = create_series(1)
+    result = StationaryCache.get_adf_result(series, 4)
+    fail_on_test(monkeypatch)
+    assert StationaryCache.get_adf_result(series.copy(), 4) == result
+    assert (StationaryCache.hits, StationaryCache.misses) == (1, 1)
+
+def test_max_size_evicts_the_least_recently_used(monkeypatch):
+    StationaryCache.configure(None, max_size=2)
+    first, second, third = create_series(2), create_series(3), create_series(4)
+    results = [StationaryCache.get_adf_result(series, 4) for series in (first, second)]
+    # Using the first series again makes the second the least recently used
+    StationaryCache.get_adf_result(first, 4)
+    StationaryCache.get_adf_result(third, 4)
+    fail_on_test(monkeypatch)
+    assert StationaryCache.get_adf_result(first, 4) == results[0]
+    StationaryCache.get_adf_result(third, 4)
+    with pytest.raises(AssertionError, match="was run"):
+        StationaryCache.get_adf_result(second, 4)
+
+def test_results_persist_after_clear(tmp_path, monkeypatch):
+    path = tmp_path / "adf.sqlite"
+    StationaryCache.configure(str(path))
+    series = create_series(5)
+    result = StationaryCache.get_adf_result(series, 4)
+    assert path.exists()
+    StationaryCache.clear()
+    fail_on_test(monkeypatch)
+    assert StationaryCache.get_adf_result(series, 4) == pytest.approx(result)
+    assert StationaryCache.hits == 1
+
+def test_key_separates_the_test_settings(monkeypatch):
+    tested = count_tests(monkeypatch)
+    series = create_series(6)
+    StationaryCache.get_adf_result(series, 4, diff_order=0, regression='c')
+    StationaryCache.get_adf_result(series, 3, diff_order=0, regression='c')
+    StationaryCache.get_adf_result(series, 4, diff_order=1, regression='c')
+    StationaryCache.get_adf_result(series, 4, diff_order=0, regression='ct')
+    assert len(tested) == 4
+    StationaryCache.get_adf_result(series, 4, diff_order=1, regression='c')
+    assert len(tested) == 4 and StationaryCache.hits == 1
@@ -0,0 +1,67 @@
+import random
+import numpy as np
+import pytest
+from VARAggregation import VARAggregation
+from VARDataClasses import CountryVARResult, FoldVARResults, VARPredictionResult, VARHyperParams
+
+FOLDS = 4
+
+def calculate_fold_var_res_lists(country_var_res: list[CountryVARResult], folds: int) -> list[tuple]:
+    """The list based aggregation that VARAggregation replaced, as (fold, data amount, mean RMSE, mode trend, mode lag) per fold"""
+    res_by_fold = []
+    for fold in range(folds):
+        fold_res_list = [fold_res for cr in country_var_res for fold_res in cr.folds_res if fold_res.fold_ita == fold]
+        fold_trends = [fold_res.pred_res.hyper_params.trend for fold_res in fold_res_list]
+        fold_lags = [fold_res.pred_res.hyper_params.lag for fold_res in fold_res_list]
+        mode_trend = max(fold_trends, key = fold_trends.count) if len(fold_trends) > 0 else "No data"
+        mode_lag = max(fold_lags, key = fold_lags.count) if len(fold_lags) > 0 else "No data"
+        mean_rmse = np.mean([fold_res.pred_res.rmse for fold_res in fold_res_list]) if len(fold_res_list) > 0 else "No data"
+        res_by_fold.append((fold + 1, len(fold_res_list), mean_rmse, mode_trend, mode_lag))
+    return res_by_fold
+
+def create_country_var_res(rng: random.Random, countries: int) -> list[CountryVARResult]:
+    """Countries with results for a random subset of the folds, RMSEs of very different magnitudes and few lags and trends so modes tie"""
+    return [CountryVARResult([FoldVARResults(fold, True, 1, 30, 10, VARPredictionResult(rng.random() * rng.choice([1e-3, 1, 1e3]), VARHyperParams(rng.choice(["n", "c"]), rng.randint(1, 3))))
+                              for fold in range(FOLDS) if rng.random() < 0.7], None)
+            for _ in range(countries)]
+
+def aggregate(country_var_res: list[CountryVARResult], order) -> list:
+    stats = VARAggregation.create(FOLDS)
+    for country_ita in order:
+        VARAggregation.add_country_res(stats, country_var_res[country_ita], country_ita)
+    return VARAggregation.get_results(stats)
+
+@pytest.mark.parametrize("countries", [1, 2, 7, 50])
+def test_matches_list_aggregation(countries: int):
+    country_var_res = create_country_var_res(random.Random(countries), countries)
+    expected = calculate_fold_var_res_lists(country_var_res, FOLDS)
+    for res, (fold, data_amount, mean_rmse, mode_trend, mode_lag) in zip(aggregate(country_var_res, range(countries)), expected):
+        assert (res.fold_ita, res.data_amount, res.mode_var_params.trend, res.mode_var_params.lag) == (fold, data_amount, mode_trend, mode_lag)
+        assert res.mean_rmse == (pytest.approx(mean_rmse, rel=1e-12) if data_amount > 0 else "No data")
+
+def test_does_not_depend_on_the_order_countries_finish_in():
+    # Batches of a pool or a resumed run add countries out of order, the results have to equal a sequential run bit for bit
+    rng = random.Random(0)
+    country_var_res = create_country_var_res(rng, 200)
+    sequential = aggregate(country_var_res, range(200))
+    for _ in range(10):
+        assert aggregate(country_var_res, rng.sample(range(200), 200)) == sequential
+
+def test_rmse_variance():
+    country_var_res = create_country_var_res(random.Random(1), 30)
+    stats = VARAggregation.create(FOLDS)
+    for country_ita in reversed(range(30)):
+        VARAggregation.add_country_res(stats, country_var_res[country_ita], country_ita)
+    for fold, fold_stats in enumerate(stats):
+        rmses = [fold_res.pred_res.rmse for cr in country_var_res for fold_res in cr.folds_res if fold_res.fold_ita == fold]
+        assert VARAggregation.get_rmse_variance(fold_stats) == pytest.approx(np.var(rmses, ddof=1), rel=1e-10)
+
+def test_folds_without_results():
+    stats = VARAggregation.create(2)
+    VARAggregation.add_country_res(stats, CountryVARResult([FoldVARResults(0, True, 1, 30, 10, VARPredictionResult(0.5, VARHyperParams("c", 2)))], None), 0)
+    # Results of folds beyond the aggregated folds are ignored
+    VARAggregation.add_country_res(stats, CountryVARResult([FoldVARResults(2, True, 1, 30, 10, VARPredictionResult(0.7, VARHyperParams("c", 2)))], None), 1)
+    first, second = VARAggregation.get_results(stats)
+    assert (first.data_amount, first.mean_rmse) == (1, 0.5)
+    assert (second.data_amount, second.mean_rmse, second.mode_var_params) == (0, "No data", VARHyperParams("No data", "No data"))
+    assert np.isnan(VARAggregation.get_rmse_variance(stats[0]))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import asdict
+from PWTPanel import PWTPanel, PANEL_DIR_ENV
+from VARCheckpoint import VARCheckpoint, CHECKPOINT_PATH_ENV
+from VARModel import VARModel, VAREngine, ENGINE_ENV
+from VARDataClasses import CountryVARResult, FoldVARResults, MeanVARResults, VARPredictionResult, VARHyperParams
+from VAREvaluation import VAREvaluation, KFoldSplit, FixedParamsStrategy
+
+DEV_STATUS = "Developing region"
+STRATEGIES = [FixedParamsStrategy("Baseline", VARHyperParams('c', 1)), FixedParamsStrategy("Lag 2", VARHyperParams('n', 2))]
+
+@pytest.fixture(autouse=True)
+def checkpoint(tmp_path, monkeypatch):
+    # The settings are environment variables, monkeypatch restores them after every test
+    for env in (CHECKPOINT_PATH_ENV, PANEL_DIR_ENV, ENGINE_ENV):
+        monkeypatch.delenv(env, raising=False)
+    monkeypatch.setattr(VARCheckpoint, "resume", True)
+    monkeypatch.setattr(VARCheckpoint, "batch_size", 2)
+    VARCheckpoint.configure(str(tmp_path / "checkpoint.sqlite"), batch_size=2)
+    PWTPanel.configure(str(tmp_path / "panels"))
+
+def create_df(seed: int = 0, variables: tuple[str] = ("gdp_growth", "rdana", "emp")) -> pd.DataFrame:
+    """Development status dataframe of 5 countries with 40 years of trending series each"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for code in ["AAA", "BBB", "CCC", "DDD", "EEE"]:
+        years = pd.DatetimeIndex(pd.to_datetime([str(year) for year in range(1970, 2010)], format="%Y"), name="year")
+        values = rng.normal(0.02, 0.01, (len(years), len(variables))).cumsum(axis=0) + rng.normal(0, 0.05, (len(years), len(variables)))
+        frames.append(pd.DataFrame(values, index=years, columns=list(variables)).assign(countrycode=code))
+    return pd.concat(frames)
+
+def evaluate(df: pd.DataFrame, capsys) -> tuple[list[dict], bool]:
+    """Results of every strategy and whether stored results were reused"""
+    panel = PWTPanel.create(df, DEV_STATUS)
+    codes = df["countrycode"].unique()
+    res = VAREvaluation.get_var_res_by_dev_status(len(codes), DEV_STATUS, codes, panel, STRATEGIES, KFoldSplit(4), "gdp_growth")
+    return [asdict(dev_status_res) for dev_status_res in res], "Resuming" in capsys.readouterr().out
+
+def test_store_and_load_round_trip():
+    country_res = CountryVARResult([FoldVARResults(1, True, 2, 30, 10, VARPredictionResult(0.25, VARHyperParams("ct", 3)))], MeanVARResults(0.25, 2.0, 1.0, 30.0, 10.0))
+    VARCheckpoint.store(DEV_STATUS, ["AAA"], ["key"], [[country_res]])
+    assert VARCheckpoint.load(DEV_STATUS, ["AAA", "BBB"], ["key", "other key"]) == {("AAA", "key"): country_res}
+    assert VARCheckpoint.load("Other region", ["AAA"], ["key"]) == {}
+
+def test_rerun_resumes_with_the_same_results(capsys):
+    fresh, resumed = evaluate(create_df(), capsys)
+    assert not resumed
+    assert all(fold_res["data_amount"] > 0 for dev_status_res in fresh for fold_res in dev_status_res["fold_results"])
+    rerun, resumed = evaluate(create_df(), capsys)
+    assert resumed and rerun == fresh
+
+def test_resume_is_disabled_by_resume_false(capsys, tmp_path):
+    evaluate(create_df(), capsys)
+    VARCheckpoint.configure(str(tmp_path / "checkpoint.sqlite"), resume=False)
+    assert not evaluate(create_df(), capsys)[1]
+
+def test_other_variables_are_evaluated_again(capsys):
+    evaluate(create_df(), capsys)
+    res, resumed = evaluate(create_df().drop(columns=["emp"]), capsys)
+    assert not resumed
+    VARCheckpoint.configure(None)
+    assert res == evaluate(create_df().drop(columns=["emp"]), capsys)[0]
+
+def test_other_data_is_evaluated_again(capsys):
+    evaluate(create_df(0), capsys)
+    assert not evaluate(create_df(1), capsys)[1]
+
+def test_other_engine_is_evaluated_again(capsys):
+    evaluate(create_df(), capsys)
+    VARModel.configure_engine(VAREngine.NUMPY)
+    assert not evaluate(create_df(), capsys)[1]
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.api import VAR
+from VAROLS import VAROLS, VAROLSModel, TRENDS
+from VARBatch import VARBatch
+from VARRecursive import VARRecursive
+from VARModel import VARModel, VAREngine, ENGINE_ENV
+
+STEPS = 8
+
+def create_endog(rng: np.random.Generator, nobs: int, neqs: int) -> np.ndarray:
+    """Stationary VAR(1) sample, like the differenced training data of a fold"""
+    coefs = rng.uniform(-0.4, 0.4, (neqs, neqs))
+    endog = np.zeros((nobs, neqs))
+    for t in range(1, nobs):
+        endog[t] = endog[t - 1] @ coefs + rng.normal(size=neqs)
+    return endog
+
+def fit_statsmodels(endog: np.ndarray, lag: int, trend: str):
+    return VAR(endog).fit(maxlags=lag, method='ols', ic=None, trend=trend)
+
+def assert_matches_statsmodels(result, endog: np.ndarray, steps: int = STEPS) -> None:
+    """Compares the coefficients and a forecast from the end of `endog` with statsmodels"""
+    expected = fit_statsmodels(endog, result.lag, result.trend)
+    np.testing.assert_allclose(result.params, expected.params, rtol=1e-8, atol=1e-10)
+    prior = endog[-result.lag:]
+    np.testing.assert_allclose(VAROLS.forecast(result, prior, steps), expected.forecast(prior, steps), rtol=1e-8, atol=1e-10)
+
+@pytest.fixture
+def statsmodels_engine(monkeypatch):
+    monkeypatch.delenv(ENGINE_ENV, raising=False)
+
+def test_statsmodels_is_the_default_engine(statsmodels_engine):
+    assert VARModel.get_engine() == VAREngine.STATSMODELS
+
+@pytest.mark.parametrize("nobs, neqs", [(20, 2), (35, 4), (60, 5)])
+@pytest.mark.parametrize("trend", TRENDS)
+def test_varols_matches_statsmodels(nobs: int, neqs: int, trend: str):
+    endog = create_endog(np.random.default_rng(nobs), nobs, neqs)
+    for lag in range(1, 5):
+        assert_matches_statsmodels(VAROLS.fit(VAROLSModel(endog), lag, trend), endog)
+
+@pytest.mark.parametrize("nobs, neqs", [(20, 2), (35, 4)])
+def test_varols_fit_trends_from_maxlag_design(nobs: int, neqs: int):
+    # The parameter search fits every lag and trend from the design of the maximum lag
+    endog = create_endog(np.random.default_rng(nobs), nobs, neqs)
+    maxlag = 6
+    design = VAROLS.build_design(endog, maxlag)
+    for lag in range(1, maxlag + 1):
+        for result in VAROLS.fit_trends(endog, design, lag, TRENDS):
+            assert_matches_statsmodels(result, endog)
+
+@pytest.mark.parametrize("trend", TRENDS)
+def test_varbatch_matches_statsmodels(trend: str):
+    rng = np.random.default_rng(1)
+    # Problems of different lengths and widths end up in different stacked groups
+    endogs = [create_endog(rng, nobs, neqs) for nobs, neqs in [(30, 3), (30, 3), (45, 3), (30, 4), (45, 3)]]
+    lag = 3
+    results = VARBatch.fit(endogs, lag, trend)
+    steps = [STEPS, 3, STEPS, 5, 1]
+    forecasts = VARBatch.forecast(results, [endog[-lag:] for endog in endogs], steps)
+    for endog, result, forecast, n_steps in zip(endogs, results, forecasts, steps):
+        expected = fit_statsmodels(endog, lag, trend)
+        np.testing.assert_allclose(result.params, expected.params, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(forecast, expected.forecast(endog[-lag:], n_steps), rtol=1e-8, atol=1e-10)
+
+def test_varbatch_fit_trends_matches_statsmodels():
+    rng = np.random.default_rng(2)
+    endogs = [create_endog(rng, nobs, 3) for nobs in [25, 25, 40]]
+    maxlag = 5
+    designs = [VAROLS.build_design(endog, maxlag) for endog in endogs]
+    for lag in range(1, maxlag + 1):
+        for endog, results in zip(endogs, VARBatch.fit_trends(endogs, designs, lag, TRENDS)):
+            for result in results:
+                assert_matches_statsmodels(result, endog)
+
+@pytest.mark.parametrize("lag", [1, 2, 4])
+def test_varrecursive_matches_statsmodels_on_every_window(lag: int):
+    endog = create_endog(np.random.default_rng(lag), 60, 3)
+    state = VARRecursive.init(endog[:30], lag)
+    for end in range(30, 61, 5):
+        state = VARRecursive.update(state, endog[:end])
+        for result in VARRecursive.fit_trends(state, TRENDS):
+            assert_matches_statsmodels(result, endog[:end])
+
+@pytest.mark.parametrize("engine", [VAREngine.NUMPY, VAREngine.NUMPY_BATCHED])
+def test_numpy_engines_forecast_like_statsmodels(engine: VAREngine):
+    rng = np.random.default_rng(3)
+    index = pd.date_range("1960", periods=50, freq="YS", name="year")
+    df = pd.DataFrame(create_endog(rng, 50, 3).cumsum(axis=0), index=index, columns=["gdp_growth", "emp", "rdana"])
+    train, test = df.iloc[:42], df.iloc[42:]
+    train_diff = train.diff().dropna()
+    lag, trend = 3, 'ct'
+
+    results = []
+    for var_engine in (VAREngine.STATSMODELS, engine):
+        model = VARModel.fit_base_model(VARModel.create_var_model(train_diff, var_engine), lag, trend)
+        results.append(VARModel.forecast_using_var_model(model, train, test, train_diff, lag, 1, "gdp_growth"))
+    expected, result = results
+    assert result.rmse == pytest.approx(expected.rmse, rel=1e-8)
+    pd.testing.assert_frame_equal(result.pred, expected.pred, rtol=1e-8)
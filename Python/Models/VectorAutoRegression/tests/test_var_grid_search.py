@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import asdict
+from PWTPanel import PWTPanel, PANEL_DIR_ENV
+from StationaryCache import PERSIST_PATH_ENV
+from VARCheckpoint import CHECKPOINT_PATH_ENV
+from VARModel import VARModel, VAREngine, ENGINE_ENV
+from VAREvaluation import VAREvaluation, KFoldSplit, GridSearchStrategy
+
+DEV_STATUS = "Developing region"
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path, monkeypatch):
+    # The settings are environment variables, monkeypatch restores them after every test
+    for env in (CHECKPOINT_PATH_ENV, PANEL_DIR_ENV, PERSIST_PATH_ENV, ENGINE_ENV):
+        monkeypatch.delenv(env, raising=False)
+    PWTPanel.configure(str(tmp_path / "panels"))
+
+def create_df(seed: int = 0, variables: tuple[str] = ("gdp_growth", "rdana", "emp")) -> pd.DataFrame:
+    """Development status dataframe of 6 countries with 60 years of trending series each"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for code in ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]:
+        years = pd.DatetimeIndex(pd.to_datetime([str(year) for year in range(1950, 2010)], format="%Y"), name="year")
+        values = rng.normal(0.02, 0.01, (len(years), len(variables))).cumsum(axis=0) + rng.normal(0, 0.05, (len(years), len(variables)))
+        frames.append(pd.DataFrame(values, index=years, columns=list(variables)).assign(countrycode=code))
+    return pd.concat(frames)
+
+def grid_search(df: pd.DataFrame, engine: VAREngine, workers: int) -> dict:
+    VARModel.configure_engine(engine)
+    codes = df["countrycode"].unique()
+    res = VAREvaluation.get_var_res_by_dev_status(len(codes), DEV_STATUS, codes, PWTPanel.create(df, DEV_STATUS), [GridSearchStrategy(None, 8)], KFoldSplit(4), "gdp_growth", workers)
+    return asdict(res[0])
+
+def assert_same_results(actual, expected, path: str = "") -> None:
+    """Compares the selected hyperparameters and counts exactly and the RMSEs up to floating point noise of the engines"""
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_same_results(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected), path
+        for i, (actual_item, expected_item) in enumerate(zip(actual, expected)):
+            assert_same_results(actual_item, expected_item, f"{path}[{i}]")
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-8, abs=1e-10), path
+    else:
+        assert actual == expected, path
+
+def test_grid_search_matches_on_every_engine_and_worker_amount():
+    df = create_df()
+    expected = grid_search(df, VAREngine.STATSMODELS, 1)
+    assert any(fold_res["data_amount"] > 0 for fold_res in expected["fold_results"])
+    for engine in VAREngine:
+        for workers in (1, 2):
+            assert_same_results(grid_search(df, engine, workers), expected, f"{engine.name} workers={workers}")
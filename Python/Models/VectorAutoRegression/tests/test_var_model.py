@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import mean_squared_error
+from VARModel import VARModel
+
+def diff_inv_loop(forecast_diff: pd.DataFrame, original: pd.DataFrame, passes: int) -> pd.DataFrame:
+    """The pass by pass inverse differencing that `diff_inv_batch` replaced"""
+    df_temp = forecast_diff.copy()
+    for i in range(passes, 0, -1):
+        df_orig = original.iloc[-1]
+        for j in range(2, i + 1):
+            df_orig = df_orig - original.iloc[-j]
+        df_temp = df_orig + df_temp.cumsum()
+    return df_temp
+
+def create_data(rng: np.random.Generator, nobs: int, steps: int, neqs: int = 3) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Trending training levels and a differenced forecast continuing them"""
+    columns = ["gdp_growth", *[f"x{i}" for i in range(1, neqs)]]
+    original = pd.DataFrame(rng.normal(1, 0.5, (nobs, neqs)).cumsum(axis=0) + 100, columns=columns)
+    forecast_diff = pd.DataFrame(rng.normal(0, 0.5, (steps, neqs)), columns=columns, index=range(nobs, nobs + steps))
+    return original, forecast_diff
+
+@pytest.mark.parametrize("passes", [0, 1, 2, 3, 5])
+@pytest.mark.parametrize("steps", [1, 4, 17])
+def test_diff_inv_matches_loop(passes: int, steps: int):
+    original, forecast_diff = create_data(np.random.default_rng(passes * 100 + steps), 30, steps)
+    res = VARModel.diff_inv(forecast_diff, original, passes)
+    expected = diff_inv_loop(forecast_diff, original, passes)
+    pd.testing.assert_index_equal(res.index, expected.index)
+    np.testing.assert_allclose(res.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+@pytest.mark.parametrize("passes", [1, 2, 3])
+def test_diff_inv_batch_matches_loop_per_candidate(passes: int):
+    rng = np.random.default_rng(passes)
+    original, _ = create_data(rng, 25, 6)
+    candidates = rng.normal(0, 0.5, (2, 5, 6, 3))
+    res = VARModel.diff_inv_batch(candidates, original.to_numpy(), passes)
+    assert res.shape == candidates.shape
+    for index in np.ndindex(candidates.shape[:2]):
+        expected = diff_inv_loop(pd.DataFrame(candidates[index], columns=original.columns), original, passes)
+        np.testing.assert_allclose(res[index], expected.to_numpy(), rtol=1e-12)
+
+def test_evaluate_forecast_batch_matches_sklearn_rmse():
+    rng = np.random.default_rng(7)
+    original, _ = create_data(rng, 30, 5)
+    test = original.iloc[-5:] + rng.normal(0, 1, (5, 3))
+    candidates = rng.normal(0, 0.5, (4, 5, 3))
+    forecasts, rmses = VARModel.evaluate_forecast_batch(candidates, original, test, 2, "gdp_growth")
+    for candidate, forecast, rmse in zip(candidates, forecasts, rmses):
+        expected = diff_inv_loop(pd.DataFrame(candidate, columns=original.columns), original, 2)
+        np.testing.assert_allclose(forecast, expected.to_numpy(), rtol=1e-12)
+        assert rmse == pytest.approx(np.sqrt(mean_squared_error(expected["gdp_growth"], test["gdp_growth"])), rel=1e-12)
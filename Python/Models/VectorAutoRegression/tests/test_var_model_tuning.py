@@ -0,0 +1,20 @@
+import pytest
+from VARModelTuning import BaseModelTuning
+from VARDataClasses import BaseModelConfig, VARHyperParams
+
+@pytest.fixture
+def pipeline_calls(monkeypatch) -> list[tuple]:
+    calls = []
+    monkeypatch.setattr(BaseModelTuning, "VAR_pipeline_by_config", lambda *args: calls.append(args))
+    return calls
+
+def test_positional_call_binds_like_before(pipeline_calls):
+    BaseModelTuning.VAR_pipeline([], "gdp_growth", ["rdana"], False, "Baseline", False, True, 7, 'c')
+    (_, _, _, plot_res, configs, export_json, workers), = pipeline_calls
+    assert (plot_res, export_json, workers) == (False, True, 1)
+    assert configs == [BaseModelConfig("Baseline", VARHyperParams('c', 7))]
+
+def test_export_csv_is_deprecated(pipeline_calls):
+    with pytest.warns(DeprecationWarning, match="export_csv"):
+        BaseModelTuning.VAR_pipeline([], "gdp_growth", ["rdana"], False, "Baseline", True, True, 7, 'c')
+    assert len(pipeline_calls) == 1
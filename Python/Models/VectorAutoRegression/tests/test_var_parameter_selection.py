@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from VARParameterSelection import VARParameterSelection
+
+STEPS = 4
+
+@pytest.fixture
+def data() -> tuple[pd.DataFrame, pd.DataFrame]:
+    train = pd.DataFrame({"gdp_growth": np.arange(10.0), "x": np.ones(10)})
+    test = pd.DataFrame({"gdp_growth": np.zeros(STEPS), "x": np.ones(STEPS)}, index=range(10, 10 + STEPS))
+    return train, test
+
+def create_candidate(lag: int, trend: str, error: float) -> tuple[int, str, np.ndarray]:
+    """Candidate of which the forecast of gdp_growth is off by `error` at every step, its RMSE on undifferenced data is abs(error)"""
+    forecast = np.column_stack([np.full(STEPS, error), np.ones(STEPS)])
+    return lag, trend, forecast
+
+def select(candidates, data, max_queue_length: int, verbose: bool = False):
+    train, test = data
+    return VARParameterSelection.select_best_parameters(candidates, "gdp_growth", train, test, 0, max_queue_length, verbose)
+
+def get_params(best_parameters) -> list[tuple[int, str, float]]:
+    return [(pred_res.hyper_params.lag, pred_res.hyper_params.trend, pred_res.rmse) for pred_res, _ in best_parameters]
+
+def test_returns_the_lowest_rmses_best_first(data):
+    candidates = [create_candidate(lag, "c", error) for lag, error in enumerate([5.0, 3.0, 4.0, 1.0, 2.0], start=1)]
+    assert get_params(select(candidates, data, 3)) == [(4, "c", 1.0), (5, "c", 2.0), (2, "c", 3.0)]
+    assert get_params(select(candidates, data, 10)) == [(4, "c", 1.0), (5, "c", 2.0), (2, "c", 3.0), (3, "c", 4.0), (1, "c", 5.0)]
+
+def test_equal_rmses_keep_the_earliest_candidate(data):
+    candidates = [create_candidate(1, "n", 2.0), create_candidate(1, "c", 1.0), create_candidate(2, "n", 1.0), create_candidate(2, "c", 1.0)]
+    assert get_params(select(candidates, data, 1)) == [(1, "c", 1.0)]
+    assert get_params(select(candidates, data, 2)) == [(1, "c", 1.0), (2, "n", 1.0)]
+
+def test_skips_nan_and_infinite_forecasts(data):
+    candidates = [create_candidate(1, "n", np.nan), create_candidate(1, "c", np.inf), create_candidate(2, "n", 3.0), create_candidate(2, "c", 2.0)]
+    assert get_params(select(candidates, data, 10)) == [(2, "c", 2.0), (2, "n", 3.0)]
+    assert select([create_candidate(1, "n", np.nan)], data, 1) == []
+
+def test_returns_the_undifferenced_forecast(data):
+    _, test = data
+    (_, forecast), = select([create_candidate(3, "ct", 1.5)], data, 1)
+    pd.testing.assert_index_equal(forecast.index, test.index)
+    np.testing.assert_array_equal(forecast["gdp_growth"], np.full(STEPS, 1.5))
+
+def test_prints_improvements_only_with_verbose(data, capsys):
+    candidates = [create_candidate(1, "n", 2.0), create_candidate(2, "n", 3.0), create_candidate(3, "n", 1.0)]
+    select(candidates, data, 1)
+    assert capsys.readouterr().out == ""
+    select(candidates, data, 1, verbose=True)
+    assert capsys.readouterr().out.splitlines() == ["better params found with lag: 1, and trend: n", "better params found with lag: 3, and trend: n"]
@@ -0,0 +1,47 @@
+import os
+import pytest
+from VARProfiler import VARProfiler, PROFILE_DIR_ENV
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_DIR_ENV, raising=False)
+    yield tmp_path
+    VARProfiler.configure(None)
+
+def test_stages_are_summarized_per_dev_status(profile_dir):
+    VARProfiler.configure(str(profile_dir))
+    with VARProfiler.dev_status("Developed region: G7"):
+        for _ in range(3):
+            with VARProfiler.stage("fit"):
+                pass
+    summary = VARProfiler.summarize().set_index(["stage", "dev_status"])
+    assert summary.loc[("fit", "Developed region: G7"), "calls"] == 3
+    assert summary.loc[("fit", "All"), "calls"] == 3
+    [sample_file] = os.listdir(profile_dir)
+    assert sample_file.startswith(f"profile-{os.getpid()}-") and sample_file.endswith(".json")
+
+def test_process_with_a_reused_pid_keeps_the_earlier_samples(profile_dir):
+    VARProfiler.configure(str(profile_dir))
+    with VARProfiler.stage("fit"):
+        pass
+    VARProfiler.flush()
+    # A new process that got the pid of the earlier one starts without samples
+    VARProfiler._VARProfiler__samples_pid = None
+    with VARProfiler.stage("fit"):
+        pass
+    VARProfiler.flush()
+    assert len(os.listdir(profile_dir)) == 2
+    assert VARProfiler.summarize().set_index(["stage", "dev_status"]).loc[("fit", "All"), "calls"] == 2
+
+def test_configure_only_removes_sample_files(profile_dir):
+    other_json = profile_dir / "VAR profile.json"
+    other_json.write_text("[]")
+    VARProfiler.configure(str(profile_dir))
+    with VARProfiler.stage("fit"):
+        pass
+    VARProfiler.flush()
+    # A new run starts without the samples of the earlier run, files that are not samples are kept and never read as samples
+    VARProfiler.configure(str(profile_dir))
+    assert sorted(os.listdir(profile_dir)) == ["VAR profile.json"]
+    assert VARProfiler.summarize().empty
+    assert other_json.read_text() == "[]"
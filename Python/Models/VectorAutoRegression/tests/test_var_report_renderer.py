@@ -0,0 +1,32 @@
+import os
+from dataclasses import asdict
+from VARDataClasses import VARExportClass, DevStatusResult, AggregatedFoldVARResults, VARHyperParams
+from VARExportResults import ExportVARResults
+from VARImportResults import VARImportResults
+from VARReportRenderer import VARReportRenderer, PlotSpec
+
+def create_results_file(tmp_path) -> str:
+    """VAR dev status results of two development statuses with two folds each"""
+    dev_status_results = [DevStatusResult(dev_status, 4, [AggregatedFoldVARResults(fold_ita, 3, 0.1 * fold_ita, VARHyperParams('c', 2)) for fold_ita in (1, 2)])
+                          for dev_status in ("Developed region: G7", "Developing region")]
+    path = str(tmp_path / "VAR dev status results.json")
+    ExportVARResults.save_json(asdict(VARExportClass("gdp_growth", ["rdana", "emp"], dev_status_results)), path)
+    return path
+
+def test_specs_of_one_file_are_rendered_in_parallel_from_one_load(tmp_path, monkeypatch):
+    path = create_results_file(tmp_path)
+    loaded_paths = []
+    load_var_res = VARImportResults.load_var_res
+    def counting_load_var_res(path: str, config: str = None):
+        loaded_paths.append(path)
+        return load_var_res(path, config)
+    monkeypatch.setattr(VARImportResults, "load_var_res", counting_load_var_res)
+
+    export_paths = VARReportRenderer.render([
+        PlotSpec(path, "mean_rmse", "VAR RMSE by fold per development status", "RMSE", "{development_status}", 0.5),
+        PlotSpec(path, "data_amount", "% VAR country amount by fold per development status", "% Data amount", "{development_status}\n({country_amount})", 100, percentage=True),
+    ], workers=2)
+
+    assert loaded_paths == [path]
+    assert len(set(export_paths)) == 2
+    assert all(os.path.exists(export_path) for export_path in export_paths)
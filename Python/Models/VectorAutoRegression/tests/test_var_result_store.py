@@ -0,0 +1,105 @@
+import os
+import json
+import random
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from PWTPanel import PWTPanel
+from VARResultStore import VARResultStore
+from VAREvaluation import VAREvaluation, KFoldSplit
+from VARAggregation import VARAggregation
+from VARDataClasses import CountryVARResult, FoldVARResults, VARPredictionResult, VARHyperParams, DevStatusResult, VARExportClass
+
+FOLDS = 4
+DEV_STATUSES = {"Developed region: G7": 5, "Least developed region": 8}
+CONFIGS = ["", "Baseline"]
+
+def create_results(seed: int) -> dict:
+    """CountryVARResult per (dev status, config) and country position, with results for a random subset of the folds"""
+    rng = random.Random(seed)
+    return {(dev_status, config): [CountryVARResult([FoldVARResults(fold, True, rng.randint(1, 2), 30, 10, VARPredictionResult(rng.random(), VARHyperParams(rng.choice(["n", "c"]), rng.randint(1, 8))))
+                                                     for fold in range(FOLDS) if rng.random() < 0.8], None)
+                                    for _ in range(countries)]
+            for dev_status, countries in DEV_STATUSES.items() for config in CONFIGS}
+
+def write_store(path: str, results: dict, batch_size: int = 3) -> list[VARExportClass]:
+    """Writes the results in shuffled batches, as the pool delivers them, and returns the export every config should load back"""
+    rng = random.Random(0)
+    writer = VARResultStore.open(path, "gdp_growth", ["rdana", "emp"])
+    exports = {config: [] for config in CONFIGS}
+    for dev_status, countries in DEV_STATUSES.items():
+        VARResultStore.add_dev_status(writer, dev_status, countries, FOLDS)
+        batches = [list(range(first, min(first + batch_size, countries))) for first in range(0, countries, batch_size)]
+        for batch in rng.sample(batches, len(batches)):
+            VARResultStore.write_country_results(writer, dev_status, [(country_ita, f"C{country_ita}", config, results[(dev_status, config)][country_ita])
+                                                                      for country_ita in batch for config in CONFIGS])
+        for config in CONFIGS:
+            stats = VARAggregation.create(FOLDS)
+            for country_ita, country_res in enumerate(results[(dev_status, config)]):
+                VARAggregation.add_country_res(stats, country_res, country_ita)
+            exports[config].append(DevStatusResult(dev_status, countries, VARAggregation.get_results(stats)))
+    VARResultStore.close(writer)
+    return {config: VARExportClass("gdp_growth", ["rdana", "emp"], dev_status_results) for config, dev_status_results in exports.items()}
+
+@pytest.mark.parametrize("file_name", ["VAR results.parquet", "results", "store.parquet.d/results.parquet"])
+def test_round_trip(tmp_path, file_name: str):
+    path = str(tmp_path / file_name)
+    results = create_results(0)
+    exports = write_store(path, results)
+    assert sorted(VARResultStore.get_configs(path)) == CONFIGS
+    for config in CONFIGS:
+        assert VARResultStore.load_export(path, config) == exports[config]
+
+    dev_status = "Least developed region"
+    rows = VARResultStore.query(path, dev_status, 2, "Baseline")
+    expected = [(country_ita, fold_res.pred_res.rmse) for country_ita, country_res in enumerate(results[(dev_status, "Baseline")]) for fold_res in country_res.folds_res if fold_res.fold_ita == 2]
+    assert list(zip(rows["country_ita"], rows["rmse"])) == expected
+    assert VARResultStore.get_aggregated_fold(path, "Baseline", dev_status, 2) == exports["Baseline"].dev_status_results[1].fold_results[2]
+
+@pytest.mark.parametrize("file_name, meta_name", [("results.parquet", "results.meta.json"), ("results", "results.meta.json"), ("a.parquet.d/results.parquet", "a.parquet.d/results.meta.json")])
+def test_meta_is_written_next_to_the_table(tmp_path, file_name: str, meta_name: str):
+    path = str(tmp_path / file_name)
+    write_store(path, create_results(1))
+    # The table is not overwritten by the meta, whatever the name of the store
+    assert pq.ParquetFile(path).metadata.num_rows > 0
+    with open(tmp_path / meta_name) as f:
+        assert [meta["development_status"] for meta in json.load(f)["dev_statuses"]] == list(DEV_STATUSES)
+    assert sorted(os.listdir(os.path.dirname(path))) == sorted([os.path.basename(path), os.path.basename(meta_name)])
+
+def test_row_groups_hold_a_single_status_config_and_fold(tmp_path):
+    path = str(tmp_path / "results.parquet")
+    write_store(path, create_results(2))
+    metadata = pq.ParquetFile(path).metadata
+    keys = []
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        stats = {row_group.column(j).path_in_schema: row_group.column(j).statistics for j in range(row_group.num_columns)}
+        for column in ("dev_status", "config", "fold_ita"):
+            assert stats[column].min == stats[column].max
+        keys.append((stats["dev_status"].min, stats["config"].min, stats["fold_ita"].min))
+    assert len(keys) == len(set(keys)) == len(DEV_STATUSES) * len(CONFIGS) * FOLDS
+
+def test_discard_keeps_the_earlier_store(tmp_path):
+    path = str(tmp_path / "results.parquet")
+    exports = write_store(path, create_results(3))
+    writer = VARResultStore.open(path, "gdp_growth", ["rdana", "emp"])
+    VARResultStore.add_dev_status(writer, "Developed region: G7", 5, FOLDS)
+    VARResultStore.write_country_results(writer, "Developed region: G7", [(0, "C0", "", create_results(4)[("Developed region: G7", "")][0])])
+    VARResultStore.discard(writer)
+    assert sorted(os.listdir(tmp_path)) == ["results.meta.json", "results.parquet"]
+    for config in CONFIGS:
+        assert VARResultStore.load_export(path, config) == exports[config]
+
+def test_interrupted_pipeline_leaves_no_temporary_files(tmp_path, monkeypatch):
+    path = str(tmp_path / "VAR results.parquet")
+    exports = write_store(path, create_results(5))
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(PWTPanel, "create", lambda df, name: None)
+    monkeypatch.setattr(VAREvaluation, "get_var_res_by_dev_status", interrupt)
+    df = pd.DataFrame({"economy": ["Developed region: G7"], "countrycode": ["AAA"], "gdp_growth": [0.1]})
+    with pytest.raises(KeyboardInterrupt):
+        VAREvaluation.VAR_pipeline([df], "gdp_growth", ["rdana", "emp"], [], KFoldSplit(FOLDS), False, results_path=path)
+    assert sorted(os.listdir(tmp_path)) == ["VAR results.meta.json", "VAR results.parquet"]
+    for config in CONFIGS:
+        assert VARResultStore.load_export(path, config) == exports[config]
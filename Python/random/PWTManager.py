@@ -1,11 +1,17 @@
+import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models", "VectorAutoRegression"))
+from PWTCache import PWTCache, PWT_SHEET_NAME
+
 class PWTManager():
     """Stores and manages transformations for DataFrames containing Penn World Table"""
-    __slots__ = ["PWT_df", "PWT_is_modified", "PWT_loc"]
+    __slots__ = ["PWT_df", "PWT_indexed_df", "PWT_is_modified", "PWT_loc"]
 
     def __init__(self):
         self.PWT_df = pd.DataFrame()
+        self.PWT_indexed_df = None
         self.PWT_is_modified = False
         self.PWT_loc= "../../Data/pwt1001.xlsx"
 
@@ -17,13 +23,40 @@ class PWTManager():
     def get_clean_pwt(self) -> pd.DataFrame:
         """Lazy initializes the Penn World Table, returns empty `pd.DataFrame` if cannot open PWT file"""
         if not self.PWT_df.empty and not self.PWT_is_modified:
-            return self.clean_PWT
+            return self.PWT_df
         print("Loading PWT")
         pwt = self.__load_penn_world_table()
         if not pwt.empty:
             self.PWT_df = pwt
+            self.PWT_indexed_df = None
             self.PWT_is_modified = False
         return pwt
+
+    def query(self, country_names: list[str] = None, start_year: int = None, end_year: int = None, columns: list[str] = None) -> pd.DataFrame:
+        """
+        returns the rows of the given countries and years, indexed and sorted on (country, year).\n
+        when the PWT is loaded the selection is resolved by slicing its sorted (country, year) index,
+        otherwise the predicates are pushed down to the PWT cache so rows and columns outside of the selection are never loaded.
+
+        args:
+            country_names ( [string] ): the countries to return in the given order, every country when None
+            start_year (int): the year from which the data starts (inclusive), no lower bound when None
+            end_year (int): the year at which the data ends (inclusive), no upper bound when None
+            columns ( [string] ): the columns to return, every column when None
+
+        returns:
+            pd.Dataframe: the selected data with a ("country", "year") MultiIndex
+        """
+        if self.PWT_df.empty:
+            return self.__query_pwt_cache(country_names, start_year, end_year, columns)
+
+        indexed_df = self.__get_indexed_pwt()
+        if country_names is None:
+            country_names = slice(None)
+        else:
+            country_names = self.__get_known_countries(country_names, indexed_df.index.levels[0])
+
+        return indexed_df.loc[(country_names, slice(start_year, end_year)), columns if columns is not None else slice(None)]
         
     def get_subset_on_country(self, country_names: list[str] = [""], start_year: int = 1950, end_year: int = 2019) -> pd.DataFrame:
         """
@@ -38,27 +71,18 @@ class PWTManager():
         returns:
             pd.Dataframe: one dataframe containing the data of a list of countries between start_year and end_year
         """
-        
-        df = pd.DataFrame(columns=self.PWT_df.columns)
-
-        for c_name in country_names:
-            try:
-                selection = self.PWT_df["country"]==c_name
-                df = pd.concat([df, self.PWT_df[selection]], ignore_index=True)
-            except:
-                print(f"country: {c_name} was not found")
-
-        if(start_year <= end_year):
-            selection = df["year"]>= start_year
-            df = df[selection]
 
-            selection = df["year"]<=end_year
-            df = df[selection]
+        if(start_year > end_year):
+            start_year, end_year = None, None
 
-        return df
+        df = self.query(country_names=country_names, start_year=start_year, end_year=end_year)
+        if self.PWT_df.empty:
+            # Read from the PWT cache, there are no loaded columns to keep the order of
+            return df.reset_index()
+        return df.reset_index()[self.PWT_df.columns]
     
 
-    def get_rates(self, columns: list[str] = [""]) -> [pd.DataFrame]:
+    def get_rates(self, columns: list[str] = [""], long_frame: bool = False) -> [pd.DataFrame]:
         """
         splits the dataframe, creating a dataframe for each country with extra column(s) for the rates to be stored in.\n
         the column with "country" needs to be present within the data
@@ -66,15 +90,19 @@ class PWTManager():
         args:
             data (pd.Dataframe): the PWT data or a subset of the PWT data\n
             columns ( [string] ): the columns for which the rates must be calculated, columns must contain numerical values
+            long_frame (bool): when True all rates are calculated at once with a grouped shift and returned in one long dataframe
 
         returns:
-            [pd.Dataframe]: an array containing a dataframe for each country with the added columns
+            [pd.Dataframe]: an array containing a dataframe for each country with the added columns | pd.Dataframe: the long dataframe with the added columns if `long_frame`
         """
 
         #length must be at least 2 or a %change cannot be calculated
         if(len(self.PWT_df) < 2):
-            print(f"data of insufficient length, must at least be of length 2. current length {len(data)}")
+            print(f"data of insufficient length, must at least be of length 2. current length {len(self.PWT_df)}")
             return 
+
+        if long_frame:
+            return self.__get_rates_long_frame(columns)
         
         #split the dataframe into multiple with each country a seperate dataframe
         df_country_split = self.__split_on_country()
@@ -101,11 +129,59 @@ class PWTManager():
         return dfs
     
 
+    def __get_rates_long_frame(self, columns: list[str]) -> pd.DataFrame:
+        """
+        vectorized variant of get_rates, calculates the %change of every column with one grouped shift instead of a per cell loop.\n
+        rows keep their order, the last row of every country has no "new" value and gets NaN.
+
+        args:
+            columns ( [string] ): the columns for which the rates must be calculated, columns must contain numerical values
+
+        returns:
+            pd.Dataframe: the PWT data with a "<column>_rate" column added for each column
+        """
+        values = self.PWT_df[columns]
+        new_values = values.groupby(self.PWT_df["country"], sort=False).shift(-1)
+
+        rates = self.__calculate_percentage_difference(values, new_values)
+        rates.columns = [f"{column}_rate" for column in columns]
+        return pd.concat([self.PWT_df, rates], axis=1)
+
+    def __get_indexed_pwt(self) -> pd.DataFrame:
+        """lazy builds the PWT indexed and sorted on (country, year), rebuilt after the PWT is reloaded"""
+        if self.PWT_indexed_df is None:
+            self.PWT_indexed_df = self.PWT_df.set_index(["country", "year"]).sort_index()
+        return self.PWT_indexed_df
+
+    def __query_pwt_cache(self, country_names: list[str], start_year: int, end_year: int, columns: list[str]) -> pd.DataFrame:
+        """reads only the selected rows and columns from the PWT cache"""
+        filters = []
+        if country_names is not None:
+            filters.append(("country", "in", country_names))
+        if start_year is not None:
+            filters.append(("year", ">=", start_year))
+        if end_year is not None:
+            filters.append(("year", "<=", end_year))
+        read_columns = None if columns is None else list(dict.fromkeys(["country", "year", *columns]))
+
+        df = PWTCache.load_pwt(columns=read_columns, xlsx_path=self.PWT_loc, filters=filters if filters else None, sheet_name=PWT_SHEET_NAME)
+        df = df.set_index(["country", "year"]).sort_index()
+        if country_names is not None:
+            df = df.loc[self.__get_known_countries(country_names, df.index.levels[0])]
+        return df if columns is None else df[columns]
+
+    def __get_known_countries(self, country_names: list[str], known_countries: pd.Index) -> list[str]:
+        """returns the countries of `country_names` (in order) that are in `known_countries`, the other countries are reported as not found"""
+        for c_name in country_names:
+            if c_name not in known_countries:
+                print(f"country: {c_name} was not found")
+        return [c_name for c_name in country_names if c_name in known_countries]
+
     def __load_penn_world_table(self) -> pd.DataFrame:
         """
         MAKE SURE YOU HAVE "openpyxl" INSTALLED, took me a solid hour to figure that one out.. smh
 
-        function for loading in the PWT dataset.
+        function for loading in the PWT dataset. The workbook is only parsed once, later loads read the Parquet cache next to it.
 
         args:
             path_work_dir (string): the string to your directory, this is absolute path because working directory changes based on where you run it, which is very annoying.
@@ -116,7 +192,7 @@ class PWTManager():
 
         print(f"searching for file at location: /{self.PWT_loc}")
         try:
-            d = pd.read_excel(f"{self.PWT_loc}", sheet_name="Data")
+            d = PWTCache.load_pwt(xlsx_path=self.PWT_loc, sheet_name=PWT_SHEET_NAME)
             print("succesfully loaded PWT dataset")
             return d
         except:
@@ -150,12 +226,7 @@ class PWTManager():
             [pd.Dataframe]: an array of dataframes with each dataframe containing all data related to one country.
         """
 
-        country_selection = self.PWT_df.country.unique()
-        df = []
-
-        for country in country_selection:
-            df.append(self.get_subset_on_country(country_names=[country]))
-        return df
+        return [df_country.reset_index(drop=True) for _, df_country in self.PWT_df.groupby("country", sort=False)]
 
 
 
@@ -174,6 +245,9 @@ if __name__ == "__main__":
     print(df.shape)
     print(df.head())
 
+    df = PWT_manager.query(country_names=countries, start_year=1995, end_year=2000, columns=["rgdpo", "pop"])
+    print(df.head())
+
 
     dfr = PWT_manager.get_rates(columns=["rgdpo"])
     print(dfr[0])
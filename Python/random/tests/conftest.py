@@ -0,0 +1,27 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# PWTManager and utils are imported as top level modules, like the notebooks next to them do
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+@pytest.fixture
+def pwt() -> pd.DataFrame:
+    """PWT shaped data of four countries sorted on (country, year) like the workbook, Chad starts later"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for country, code, first_year in (("Aruba", "ABW", 1990), ("Chad", "TCD", 1994), ("Netherlands", "NLD", 1990), ("Zimbabwe", "ZWE", 1990)):
+        years = np.arange(first_year, 2000)
+        frames.append(pd.DataFrame({
+            "countrycode": code,
+            "country": country,
+            "year": years,
+            "rgdpo": rng.uniform(100, 200, len(years)),
+            "pop": rng.uniform(1, 20, len(years)),
+            "cgdpo": rng.uniform(100, 200, len(years)),
+            "csh_x": rng.uniform(-0.5, 0.5, len(years)),
+            "csh_m": rng.uniform(-0.5, 0.5, len(years)),
+        }))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,57 @@
+"""The loop implementations that the vectorized functions of PWTManager and utils replaced, the reference of the parity tests"""
+import pandas as pd
+
+def get_data_on_country(data: pd.DataFrame, country_name: list[str] = [""], start_year: int = 1950, end_year: int = 2019) -> pd.DataFrame:
+    df = pd.DataFrame(columns=data.columns)
+
+    for c_name in country_name:
+        try:
+            selection = data["country"]==c_name
+            df = pd.concat([df, data[selection]], ignore_index=True)
+        except:
+            print(f"country: {c_name} was not found")
+
+    if(start_year <= end_year):
+        selection = df["year"]>= start_year
+        df = df[selection]
+
+        selection = df["year"]<=end_year
+        df = df[selection]
+
+    return df
+
+def calculate_percentage_difference(old: int, new: int) -> pd.DataFrame:
+    return ((new-old)/old)*100
+
+def get_rates(data: pd.DataFrame, columns: list[str] = [""]) -> list[pd.DataFrame]:
+    df_country_split = [get_data_on_country(data=data, country_name=[country]) for country in data.country.unique()]
+    dfs = []
+
+    for df_country in df_country_split:
+        for column in columns:
+            col_i = df_country.columns.get_loc(column)
+            values = []
+
+            for index_i in range(1, len(df_country)):
+                index_old = index_i-1
+                values.append(calculate_percentage_difference(df_country.iloc[index_old, col_i], df_country.iloc[index_i, col_i]))
+
+            values.append(None)
+            df_country[f"{column}_rate"] = values
+        dfs.append(df_country)
+
+    return dfs
+
+def get_import_export_numerics(cgdpo_dataframe: pd.DataFrame, import_share_dataframe: pd.DataFrame, export_share_dataframe: pd.DataFrame) -> pd.DataFrame:
+    import_export_df = pd.DataFrame(columns=["import-value", "export-value"])
+
+    for i in range(len(cgdpo_dataframe)):
+        cgdpo_value = cgdpo_dataframe.iloc[i,0]
+        import_value = abs(import_share_dataframe.iloc[i,0] * cgdpo_value)
+        export_value = abs(export_share_dataframe.iloc[i,0] * cgdpo_value)
+
+        ndf = pd.DataFrame(data={"import-value" : [import_value], "export-value": [export_value]})
+        ndf.index = [f"{i}"]
+        import_export_df = pd.concat([import_export_df, ndf])
+
+    return import_export_df
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from PWTManager import PWTManager
+from PWTCache import PWT_SHEET_NAME
+import legacy
+
+COUNTRIES = ["Zimbabwe", "Unknown", "Chad", "Aruba"]
+
+def create_manager(pwt: pd.DataFrame) -> PWTManager:
+    """Manager with the PWT loaded"""
+    manager = PWTManager()
+    manager.PWT_df = pwt
+    return manager
+
+def create_cache_manager(pwt: pd.DataFrame, tmp_path) -> PWTManager:
+    """Manager without the PWT loaded, its queries are pushed down to the PWT cache of a workbook of `pwt`"""
+    manager = PWTManager()
+    manager.PWT_loc = str(tmp_path / "pwt1001.xlsx")
+    pwt.to_excel(manager.PWT_loc, sheet_name=PWT_SHEET_NAME, index=False)
+    return manager
+
+def test_long_frame_rates_match_loop(pwt):
+    rates = create_manager(pwt).get_rates(columns=["rgdpo", "pop"], long_frame=True)
+    expected = pd.concat(legacy.get_rates(pwt, columns=["rgdpo", "pop"]), ignore_index=True)
+    pd.testing.assert_frame_equal(rates, expected, check_dtype=False)
+
+def test_rates_are_placed_forward(pwt):
+    rates = create_manager(pwt).get_rates(columns=["rgdpo"], long_frame=True)
+    for _, country_df in rates.groupby("country"):
+        values, country_rates = country_df["rgdpo"].to_numpy(), country_df["rgdpo_rate"].to_numpy()
+        # The rate of a year is the change to the next year, the last year of every country has no next year
+        np.testing.assert_allclose(country_rates[:-1], (values[1:] - values[:-1]) / values[:-1] * 100)
+        assert np.isnan(country_rates[-1])
+
+def test_query_keeps_the_country_order(pwt, capsys):
+    df = create_manager(pwt).query(country_names=COUNTRIES, start_year=1995, end_year=1997, columns=["rgdpo"])
+    assert list(df.index.get_level_values("country").unique()) == ["Zimbabwe", "Chad", "Aruba"]
+    assert list(df.loc["Chad"].index) == [1995, 1996, 1997]
+    assert list(df.columns) == ["rgdpo"]
+    assert "country: Unknown was not found" in capsys.readouterr().out
+
+@pytest.mark.parametrize("start_year, end_year", [(1992, 1996), (2000, 1990)])
+def test_get_subset_on_country_matches_loop(pwt, start_year: int, end_year: int):
+    subset = create_manager(pwt).get_subset_on_country(country_names=COUNTRIES, start_year=start_year, end_year=end_year)
+    expected = legacy.get_data_on_country(pwt, COUNTRIES, start_year, end_year).reset_index(drop=True)
+    pd.testing.assert_frame_equal(subset, expected, check_dtype=False)
+
+@pytest.mark.parametrize("start_year, end_year", [(1992, 1996), (2000, 1990)])
+def test_cache_pushdown_matches_loaded(pwt, tmp_path, capsys, start_year: int, end_year: int):
+    cache_manager = create_cache_manager(pwt, tmp_path)
+    loaded_manager = PWTManager()
+    loaded_manager.PWT_loc = cache_manager.PWT_loc
+    loaded_manager.get_clean_pwt()
+    capsys.readouterr()
+
+    expected = loaded_manager.get_subset_on_country(country_names=COUNTRIES, start_year=start_year, end_year=end_year)
+    assert "country: Unknown was not found" in capsys.readouterr().out
+    subset = cache_manager.get_subset_on_country(country_names=COUNTRIES, start_year=start_year, end_year=end_year)
+    assert "country: Unknown was not found" in capsys.readouterr().out
+    assert cache_manager.PWT_df.empty
+    pd.testing.assert_frame_equal(subset[expected.columns], expected)
+
+    pd.testing.assert_frame_equal(cache_manager.query(country_names=COUNTRIES, start_year=1995, columns=["pop"]),
+                                  loaded_manager.query(country_names=COUNTRIES, start_year=1995, columns=["pop"]))
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import utils
+import legacy
+
+def test_long_frame_rates_match_loop(pwt):
+    rates = utils.get_rates(pwt, columns=["rgdpo", "pop"], long_frame=True)
+    expected = pd.concat(legacy.get_rates(pwt, columns=["rgdpo", "pop"]), ignore_index=True)
+    pd.testing.assert_frame_equal(rates, expected, check_dtype=False)
+
+def test_rates_are_placed_forward(pwt):
+    rates = utils.get_rates_long_frame(pwt, columns=["pop"])
+    for _, country_df in rates.groupby("country"):
+        values, country_rates = country_df["pop"].to_numpy(), country_df["pop_rate"].to_numpy()
+        np.testing.assert_allclose(country_rates[:-1], (values[1:] - values[:-1]) / values[:-1] * 100)
+        assert np.isnan(country_rates[-1])
+
+def test_import_export_numerics_match_loop(pwt):
+    country_df = pwt[pwt["country"] == "Chad"]
+    args = (country_df[["cgdpo"]], country_df[["csh_x"]], country_df[["csh_m"]])
+    pd.testing.assert_frame_equal(utils.get_import_export_numerics(*args), legacy.get_import_export_numerics(*args), check_dtype=False)
+
+def test_share_numerics_keep_the_index(pwt):
+    subset = pwt[pwt["year"] >= 1995]
+    numerics = utils.get_share_numerics(subset)
+    assert numerics.index.equals(subset.index)
+    assert list(numerics.columns) == ["csh_x-value", "csh_m-value"]
+    expected = legacy.get_import_export_numerics(subset[["cgdpo"]], subset[["csh_x"]], subset[["csh_m"]])
+    np.testing.assert_allclose(numerics.to_numpy(), expected.to_numpy(dtype=float))
@@ -1,5 +1,10 @@
 import pandas as pd
+import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models", "VectorAutoRegression"))
+from PWTCache import PWTCache, PWT_SHEET_NAME
 
 def get_directory() -> str:
     """return current working directory"""
@@ -10,7 +15,7 @@ def load_penn_world_table(path_to_working_directory: str) -> pd.DataFrame:
     """
     MAKE SURE YOU HAVE "openpyxl" INSTALLED, took me a solid hour to figure that one out.. smh
 
-    function for loading in the PWT dataset.
+    function for loading in the PWT dataset. The workbook is only parsed once, later loads read the Parquet cache next to it.
 
     args:
         path_to_working_directory (string): the string to your directory, this is absolute path because working directory changes based on where you run it, which is very annoying.
@@ -24,7 +29,7 @@ def load_penn_world_table(path_to_working_directory: str) -> pd.DataFrame:
     file_location = "Data/pwt1001.xlsx"
     print(f"searching for file at location: {path_to_working_directory}/{file_location}")
     try:
-        d = pd.read_excel(f"{path_to_working_directory}/{file_location}", sheet_name="Data")
+        d = PWTCache.load_pwt(xlsx_path=f"{path_to_working_directory}/{file_location}", sheet_name=PWT_SHEET_NAME)
         print("succesfully loaded PWT dataset")
         return d
     except:
@@ -102,7 +107,7 @@ def split_on_country(data:pd.DataFrame) -> [pd.DataFrame]:
     return df
 
 
-def get_rates(data:pd.DataFrame, columns: [str] = [""]) -> [pd.DataFrame]:
+def get_rates(data:pd.DataFrame, columns: [str] = [""], long_frame: bool = False) -> [pd.DataFrame]:
     """
     splits the dataframe, creating a dataframe for each country with extra column(s) for the rates to be stored in.\n
     the column with "country" needs to be present within the data
@@ -110,9 +115,10 @@ def get_rates(data:pd.DataFrame, columns: [str] = [""]) -> [pd.DataFrame]:
     args:
         data (pd.Dataframe): the PWT data or a subset of the PWT data\n
         columns ( [string] ): the columns for which the rates must be calculated, columns must contain numerical values
+        long_frame (bool): when True all rates are calculated at once with a grouped shift and returned in one long dataframe
 
     returns:
-        [pd.Dataframe]: an array containing a dataframe for each country with the added columns
+        [pd.Dataframe]: an array containing a dataframe for each country with the added columns | pd.Dataframe: the long dataframe with the added columns if `long_frame`
     """
 
 
@@ -120,6 +126,9 @@ def get_rates(data:pd.DataFrame, columns: [str] = [""]) -> [pd.DataFrame]:
     if(len(data) < 2):
         print(f"data of insufficient length, must at least be of length 2. current length {len(data)}")
         return 
+
+    if long_frame:
+        return get_rates_long_frame(data=data, columns=columns)
     
     #split the dataframe into multiple with each country a seperate dataframe
     df_country_split = split_on_country(data=data)
@@ -145,6 +154,26 @@ def get_rates(data:pd.DataFrame, columns: [str] = [""]) -> [pd.DataFrame]:
     return dfs
 
 
+def get_rates_long_frame(data:pd.DataFrame, columns: [str] = [""]) -> pd.DataFrame:
+    """
+    vectorized variant of get_rates, calculates the %change of every column with one grouped shift instead of a per cell loop.\n
+    rows keep their order, the last row of every country has no "new" value and gets NaN.
+
+    args:
+        data (pd.Dataframe): the PWT data or a subset of the PWT data, provided the column "country" is present\n
+        columns ( [string] ): the columns for which the rates must be calculated, columns must contain numerical values
+
+    returns:
+        pd.Dataframe: the data with a "<column>_rate" column added for each column
+    """
+    values = data[columns]
+    new_values = values.groupby(data["country"], sort=False).shift(-1)
+
+    rates = calculate_percentage_difference(values, new_values)
+    rates.columns = [f"{column}_rate" for column in columns]
+    return pd.concat([data, rates], axis=1)
+
+
 def get_import_export_numerics(cgdpo_dataframe: pd.DataFrame, import_share_dataframe: pd.DataFrame, export_share_dataframe:pd.DataFrame) -> pd.DataFrame :
     '''
     gets the numerical values from the share values that are in the PWT dataset for import and export.
@@ -157,17 +186,28 @@ def get_import_export_numerics(cgdpo_dataframe: pd.DataFrame, import_share_dataf
     returns:
         pd.Dataframe: a dataframe containing two columns ['import-value', 'export-value'] with the numerical values for the import and the export
     '''
-    
-    import_export_df = pd.DataFrame(columns=["import-value", "export-value"])
 
-    for i in range(len(cgdpo_dataframe)):
-        cgdpo_value = cgdpo_dataframe.iloc[i,0]
-        import_value = abs(import_share_dataframe.iloc[i,0] * cgdpo_value)
-        export_value = abs(export_share_dataframe.iloc[i,0] * cgdpo_value)
-        
+    cgdpo_values = cgdpo_dataframe.iloc[:, 0].to_numpy(dtype=float)
+    share_values = np.column_stack([import_share_dataframe.iloc[:, 0].to_numpy(dtype=float), export_share_dataframe.iloc[:, 0].to_numpy(dtype=float)])
+    import_export_values = np.abs(share_values * cgdpo_values[:, None])
+
+    return pd.DataFrame(import_export_values, columns=["import-value", "export-value"], index=[f"{i}" for i in range(len(cgdpo_values))])
+
+
+def get_share_numerics(data: pd.DataFrame, share_columns: [str] = ["csh_x", "csh_m"], value_column: str = "cgdpo") -> pd.DataFrame:
+    '''
+    gets the numerical values for any amount of share columns of the PWT dataset at once, for all countries and years in `data`.
+
+    args:
+        data (pd.Dataframe): the PWT data or a subset of the PWT data containing `value_column` and `share_columns`
+        share_columns ( [string] ): the share columns to convert, e.g. csh_x, csh_m, csh_c
+        value_column (string): the column the shares are a share of
+
+    returns:
+        pd.Dataframe: a dataframe with the index of `data` and a "<share column>-value" column for every share column
+    '''
 
-        ndf = pd.DataFrame(data={"import-value" : [import_value], "export-value": [export_value]})
-        ndf.index = [f"{i}"]
-        import_export_df = pd.concat([import_export_df, ndf])
+    share_values = data[share_columns].to_numpy(dtype=float)
+    numeric_values = np.abs(share_values * data[value_column].to_numpy(dtype=float)[:, None])
 
-    return import_export_df
\ No newline at end of file
+    return pd.DataFrame(numeric_values, index=data.index, columns=[f"{column}-value" for column in share_columns])